@@ -11,18 +11,152 @@ import pytest
 from appium import webdriver
 from appium.options.android import UiAutomator2Options
 from appium.webdriver.common.appiumby import AppiumBy
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
 
-APPIUM_URL = "http://127.0.0.1:4723"
+from framework.devices import DEFAULT_APPIUM_URL, DeviceRegistry, worker_index
+from framework.driver_pool import DriverPool
+from framework.fake_appium import FakeAppiumServer
+from framework.hierarchy import fingerprint, parse_hierarchy
+from framework.http_tuning import HTTP
+from framework.navigation import EDGES, HOME, ONBOARDING, Edge, NavigationError, Navigator
+from framework.prewarm import SessionPrewarmer
+from framework.readiness import wait_for_app_ready
+from framework.replay import connection_for
+from framework.scheduling import can_reset_lightly, record_reset, start_of
+from framework.seeding import TaskSeeder
+from framework.timeouts import HISTORY_PATH, LATENCIES
+from framework.waits import adopt_new_session, set_implicit_wait, wait_for_settled
+from pages.base_page import BasePage
+from pages.home_page import HomePage
+
+pytest_plugins = ["framework.command_timing", "framework.scheduling", "framework.replay",
+                  "framework.sharding", "framework.impact"]
+
+APPIUM_URL = os.environ.get("APPIUM_URL", DEFAULT_APPIUM_URL)
 # Detect CI environment (set by GitHub Actions automatically)
 IS_CI = os.environ.get("CI", "").lower() == "true"
 
+# Signals that the relaunched app is usable: the home screen is rendered.
+HOME_READY_MARKERS = [
+    HomePage.FAB,
+    (AppiumBy.ANDROID_UIAUTOMATOR,
+     f'new UiSelector().text("{HomePage.TOOLBAR_TITLE_TEXT}")'),
+]
+# First onboarding button on a fresh install — also counts as "rendered".
+ONBOARDING_MARKER = (AppiumBy.ANDROID_UIAUTOMATOR,
+                     'new UiSelector().text("Continue without sync")')
+# Upper bound for the app to become ready after a relaunch.
+READY_TIMEOUT = 30 if IS_CI else 15
+
+# Seconds each app reset actually needed to reach readiness (in run order).
+_READY_TIMES = []
+# Closing stats of this process's session pool / prewarmer, for the summary
+_POOL_STATS = {}
+
+
+def pytest_addoption(parser):
+    """Register the framework's command-line options."""
+    group = parser.getgroup("appium", "Appium session management")
+    group.addoption(
+        "--driver-pool", action="store_true", default=False,
+        help="Reuse Appium sessions across tests (app is reset between tests) "
+             "instead of opening a new session per test.",
+    )
+    group.addoption(
+        "--pool-size", type=int, default=1,
+        help="Maximum live sessions kept per device in --driver-pool mode.",
+    )
+    group.addoption(
+        "--prewarm", action="store_true", default=False,
+        help="Lease two devices per worker and ready the next test's session "
+             "on one while the current test runs on the other.",
+    )
+    group.addoption(
+        "--devices", default=os.environ.get("APPIUM_DEVICES"),
+        help="JSON device registry (udid, appium_url, system_port, "
+             "mjpeg_server_port).  Each worker process (pytest -n N) leases "
+             "one device from it.  Default: emulator-5554 at APPIUM_URL.",
+    )
+    group.addoption(
+        "--fake-appium", action="store_true", default=False,
+        help="Run against an in-process FakeAppiumServer (pages/xml dumps) "
+             "instead of a real Appium server and emulator.",
+    )
+    group.addoption(
+        "--fake-latency", type=float, default=0.0,
+        help="Seconds of latency the fake server adds to every command.",
+    )
+    group.addoption(
+        "--cold-reset", action="store_true", default=False,
+        help="Terminate and relaunch the app before every test instead of "
+             "navigating back to the home screen.",
+    )
+    group.addoption(
+        "--timing-history", default=str(HISTORY_PATH),
+        help="Locator latency history used to learn per-locator timeouts.",
+    )
+    group.addoption(
+        "--text-input", choices=("keys", "replace"), default="keys",
+        help="How page objects fill text fields: clear and type through the "
+             "keyboard (keys, default) or set the value directly (replace, "
+             "faster; skips the IME).",
+    )
+    group.addoption(
+        "--http-pool-size", type=int, default=HTTP.pool_size,
+        help="Keep-alive connections kept per Appium server and session.",
+    )
+    group.addoption(
+        "--http-timeout", type=float, default=HTTP.read_timeout,
+        help="Seconds to wait for an Appium response before failing the "
+             "command (new sessions get longer).",
+    )
+    group.addoption(
+        "--no-gzip", action="store_true", default=False,
+        help="Do not ask Appium for gzip-compressed responses.",
+    )
+    group.addoption(
+        "--no-learned-timeouts", action="store_true", default=False,
+        help="Always use the page objects' default timeouts (latencies are "
+             "still recorded).",
+    )
+
+
+def pytest_configure(config):
+    """Apply the input and HTTP options and load the locator latency history
+    for this environment (CI or local); learned timeouts are only used
+    against a real device."""
+    BasePage.TEXT_INPUT = config.getoption("--text-input")
+    HTTP.pool_size = config.getoption("--http-pool-size")
+    HTTP.read_timeout = config.getoption("--http-timeout")
+    HTTP.gzip = not config.getoption("--no-gzip")
+    # Replayed or fake-server latencies say nothing about the device, so
+    # those runs neither learn timeouts nor use the history.
+    offline = config.getoption("--replay") or config.getoption("--fake-appium")
+    LATENCIES.enabled = not (offline or config.getoption("--no-learned-timeouts"))
+    if offline:
+        return
+    LATENCIES.load(config.getoption("--timing-history"), env="ci" if IS_CI else "local")
+
+
+def pytest_sessionfinish(session):
+    """Merge this process's latency samples into the history file."""
+    LATENCIES.save()
+
 
-def get_options() -> UiAutomator2Options:
-    """Return configured UiAutomator2Options for the Tasks.org app."""
+def get_options(device=None) -> UiAutomator2Options:
+    """Return configured UiAutomator2Options for the Tasks.org app.
+
+    With a *device* from the registry, the session is pinned to that udid
+    and uses its own systemPort/mjpegServerPort so several devices can be
+    driven from one host at the same time.
+    """
     options = UiAutomator2Options()
     options.platform_name = "Android"
     options.device_name = "emulator-5554"
+    if device is not None:
+        options.device_name = device.name
+        options.udid = device.udid
+        options.system_port = device.system_port
+        options.mjpeg_server_port = device.mjpeg_server_port
     options.app_package = "org.tasks"
     options.app_activity = "com.todoroo.astrid.activity.MainActivity"
     options.automation_name = "UiAutomator2"
@@ -34,60 +168,108 @@ def get_options() -> UiAutomator2Options:
     return options
 
 
+# Ordered by likelihood for Tasks.org — "Continue without sync" is
+# the very first onboarding button shown on a fresh install.
+ONBOARDING_DISMISS_TEXTS = [
+    "Continue without sync",
+    "OK", "Ok",
+    "SKIP", "Skip",
+    "GET STARTED", "Get started",
+    "GET IT", "Get it",
+    "CONTINUE", "Continue",
+    "DONE", "Done",
+    "ALLOW", "Allow",
+    "AGREE", "Agree",
+    "NEXT", "Next",
+    "ACCEPT", "Accept",
+    "BEGIN", "Begin",
+    "START", "Start",
+    "CLOSE", "Close",
+]
+_DISMISS_RANK = {label: rank for rank, label in enumerate(ONBOARDING_DISMISS_TEXTS)}
+
+
 def _dismiss_onboarding(driver) -> None:
     """
     Attempt to dismiss any first-run dialogs / onboarding screens that
     Tasks.org shows on a fresh install.
 
-    Sets implicit_wait(0) so that each failed element search is instant
-    instead of waiting the full timeout.  This makes scanning through
-    ~20 labels take seconds, not minutes.
-    """
-    # Save current implicit wait and set to 0 for fast scanning
-    driver.implicitly_wait(0)
-
-    # Ordered by likelihood for Tasks.org — "Continue without sync" is
-    # the very first onboarding button shown on a fresh install.
-    dismiss_texts = [
-        "Continue without sync",
-        "OK", "Ok",
-        "SKIP", "Skip",
-        "GET STARTED", "Get started",
-        "GET IT", "Get it",
-        "CONTINUE", "Continue",
-        "DONE", "Done",
-        "ALLOW", "Allow",
-        "AGREE", "Agree",
-        "NEXT", "Next",
-        "ACCEPT", "Accept",
-        "BEGIN", "Begin",
-        "START", "Start",
-        "CLOSE", "Close",
-    ]
+    Each pass fetches the hierarchy once and matches every candidate label
+    locally, so a pass costs one page_source call instead of one
+    find_element round-trip per label.  The best-ranked match is tapped by
+    its bounds and we only wait until the hierarchy has changed and settled.
+    """
+    set_implicit_wait(driver, 0)
+    source = driver.page_source
     for pass_num in range(5):      # up to 5 passes to clear stacked dialogs
-        dismissed = False
-        for label in dismiss_texts:
-            try:
-                btn = driver.find_element(
-                    AppiumBy.ANDROID_UIAUTOMATOR,
-                    f'new UiSelector().text("{label}")'
-                )
-                btn.click()
-                time.sleep(2)
-                dismissed = True
-                print(f"[onboarding] dismissed via text: '{label}' (pass {pass_num})")
-                break
-            except (NoSuchElementException, Exception):
-                continue
-        if not dismissed:
+        nodes = parse_hierarchy(source)
+        candidates = [
+            node for node in nodes
+            if node.text in _DISMISS_RANK and node.is_true("enabled")
+        ]
+        if not candidates:
             break   # nothing left to dismiss
-    time.sleep(1)
-    # Restore a reasonable implicit wait for the caller
-    driver.implicitly_wait(20 if IS_CI else 10)
+        btn = min(candidates, key=lambda node: _DISMISS_RANK[node.text])
+        if btn.center is not None:
+            driver.tap([btn.center])
+        else:
+            driver.find_element(
+                AppiumBy.ANDROID_UIAUTOMATOR,
+                f'new UiSelector().text("{btn.text}")'
+            ).click()
+        print(f"[onboarding] dismissed via text: '{btn.text}' (pass {pass_num})")
+        source = wait_for_settled(driver, fingerprint(nodes)) or driver.page_source
+
+
+@pytest.fixture(scope="session")
+def devices(request):
+    """
+    Session-scoped device leases for this worker process.
+
+    Without --devices this is the single local emulator.  With a registry,
+    each pytest-xdist worker leases a different device (starting from its
+    worker number) and releases it when the session ends; with --prewarm
+    it leases two, if the registry has them.  With --fake-appium every
+    worker gets its own in-process fake devices.
+    """
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    wanted = 2 if request.config.getoption("--prewarm") else 1
+    fakes = []
+    path = request.config.getoption("--devices")
+    if request.config.getoption("--fake-appium"):
+        latency = request.config.getoption("--fake-latency")
+        fakes = [FakeAppiumServer(port=0, latency=latency).start() for _ in range(wanted)]
+        registry = DeviceRegistry.from_entries([
+            {"udid": f"fake-{worker}-{os.getpid()}-{i}", "appium_url": fake.url}
+            for i, fake in enumerate(fakes)
+        ])
+    elif path:
+        registry = DeviceRegistry.from_file(path)
+    else:
+        registry = DeviceRegistry.single(APPIUM_URL)
+    if len(registry.devices) < wanted:
+        print(f"[device] --prewarm needs two devices, the registry has "
+              f"{len(registry.devices)}; running without it")
+        wanted = len(registry.devices)
+    leased = []
+    for i in range(wanted):
+        leased.append(registry.lease(preferred=worker_index() * wanted + i))
+        print(f"[device] {worker} leased {leased[-1].udid} via {leased[-1].appium_url}")
+    yield leased
+    for d in leased:
+        registry.release(d)
+    for fake in fakes:
+        fake.stop()
+
+
+@pytest.fixture(scope="session")
+def device(devices):
+    """The device this worker runs its tests on (the first one leased)."""
+    return devices[0]
 
 
 @pytest.fixture(scope="session", autouse=True)
-def setup_app_once():
+def setup_app_once(device):
     """
     Session-scoped fixture that runs exactly once per test session.
 
@@ -104,9 +286,10 @@ def setup_app_once():
     print("[setup_app_once] Dismissing onboarding on fresh CI emulator...")
     d = None
     try:
-        d = webdriver.Remote(APPIUM_URL, options=get_options())
-        print("[setup_app_once] Session opened. Waiting 10s for app to fully render...")
-        time.sleep(10)
+        d = _new_driver(device)
+        print("[setup_app_once] Session opened. Waiting for the app to render...")
+        set_implicit_wait(d, 0)
+        wait_for_app_ready(d, HOME_READY_MARKERS + [ONBOARDING_MARKER], READY_TIMEOUT)
         print(f"[setup_app_once] Current activity: {d.current_activity}")
         # Dump page source for diagnosis (visible in CI pytest output with -s)
         try:
@@ -116,7 +299,6 @@ def setup_app_once():
             pass
         _dismiss_onboarding(d)
         print("[setup_app_once] Onboarding dismissal complete.")
-        time.sleep(3)
         print(f"[setup_app_once] Post-dismissal activity: {d.current_activity}")
     except Exception as exc:
         print(f"[setup_app_once] WARNING: {exc}")
@@ -131,29 +313,224 @@ def setup_app_once():
     yield
 
 
-@pytest.fixture
-def driver():
-    """
-    Function-scoped Appium WebDriver fixture.
-    Each test gets a fresh driver instance → full independence guaranteed.
+def _new_driver(device):
+    """Open a new Appium session for the Tasks.org app on *device*.
+
+    Commands go through InstrumentedConnection so each one is timed into
+    the per-test WebDriver breakdown of the HTML report; with --record or
+    --replay the connection also records or replays them.
     """
-    d = webdriver.Remote(APPIUM_URL, options=get_options())
-    # CI emulators are slower — give more time to find elements.
-    d.implicitly_wait(20 if IS_CI else 10)
+    connection = connection_for(device.appium_url, keep_alive=True)
+    d = webdriver.Remote(connection, options=get_options(device))
+    adopt_new_session(d)
+    return d
+
+
+def _reset_app(d) -> None:
+    """Bring the app back to a clean home screen within an existing session."""
     # Guarantee a clean home screen regardless of previous session state.
     # force_app_launch alone can't clear Android's saved Activity state,
-    # so we terminate and relaunch the app explicitly.
-    time.sleep(1)
+    # so we terminate and relaunch the app explicitly.  terminate_app only
+    # returns once the process is gone, so no settling sleep is needed.
+    start = time.monotonic()
+    # wait_for_app_ready() polls from the client: no implicit wait.
+    set_implicit_wait(d, 0)
     d.terminate_app("org.tasks")
-    time.sleep(2)
     d.activate_app("org.tasks")
-    # CI needs more time after activation for the app to fully render.
-    time.sleep(6 if IS_CI else 2)
-    # In CI every cold-start of the app can land back on the onboarding
-    # screen (the SharedPreferences bypass is not 100% reliable across
-    # terminate→activate cycles).  Dismiss it here so every test starts
-    # from the home screen.  Local runs are unaffected (IS_CI is False).
-    if IS_CI:
+    # Poll for the home screen instead of sleeping a fixed amount.  In CI
+    # every cold-start of the app can land back on the onboarding screen
+    # (the SharedPreferences bypass is not 100% reliable across
+    # terminate→activate cycles), so that also counts as rendered and is
+    # dismissed here so every test starts from the home screen.
+    markers = HOME_READY_MARKERS + ([ONBOARDING_MARKER] if IS_CI else [])
+    matched = wait_for_app_ready(d, markers, READY_TIMEOUT)
+    if matched == ONBOARDING_MARKER:
         _dismiss_onboarding(d)
+        matched = wait_for_app_ready(
+            d, HOME_READY_MARKERS,
+            max(READY_TIMEOUT - (time.monotonic() - start), 1))
+    elapsed = time.monotonic() - start
+    if matched is None:
+        print(f"[reset_app] WARNING: home screen not ready after {elapsed:.1f}s")
+    _READY_TIMES.append(elapsed)
+
+
+def _navigator(d) -> Navigator:
+    """Navigator over the app's screen graph, plus the onboarding exit."""
+    dismiss = Edge(ONBOARDING, HOME, 3.0, "dismiss onboarding", _dismiss_onboarding)
+    return Navigator(d, edges=EDGES + (dismiss,))
+
+
+def _return_home(d) -> None:
+    """
+    Bring the app to the home screen along the cheapest path.
+
+    From the sidebar or the task editor that is a tap or a Back; the app
+    is only terminated and relaunched when the current screen is unknown.
+    """
+    start = time.monotonic()
+    try:
+        taken = _navigator(d).go_to(HOME, READY_TIMEOUT)
+    except NavigationError as exc:
+        print(f"[reset_app] WARNING: {exc}")
+        taken = None
+    elapsed = time.monotonic() - start
+    if taken:
+        print(f"[reset_app] home via {' → '.join(taken)} in {elapsed:.1f}s")
+    _READY_TIMES.append(elapsed)
+
+
+def _reset_function(config):
+    return _reset_app if config.getoption("--cold-reset") else _return_home
+
+
+def _prepare_for(item, warmed: bool = False):
+    """
+    Return the reset that puts the app where *item* starts (its
+    start_screen marker, home by default).
+
+    After a passing test in the same app state (framework.scheduling), or
+    on a session that was *warmed* up in the background, it only navigates
+    from the current screen; otherwise the app is fully reset first.  If
+    navigating fails, the app is relaunched and navigated once more.
+    """
+    start = start_of(item)
+    light = warmed or can_reset_lightly(item)
+    full_reset = _reset_function(item.config)
+
+    def prepare(d) -> None:
+        begin = time.monotonic()
+        kind = "warm" if warmed else "light" if light else "full"
+        if not light:
+            full_reset(d)
+        if light or start.screen != HOME:
+            try:
+                _navigator(d).go_to(start.screen, READY_TIMEOUT)
+            except NavigationError as exc:
+                # Relaunch and try once more from the home screen
+                print(f"[reset_app] WARNING: {exc}; relaunching the app")
+                kind = "full"
+                _reset_app(d)
+                if start.screen != HOME:
+                    _navigator(d).go_to(start.screen, READY_TIMEOUT)
+        elapsed = time.monotonic() - begin
+        if kind != "full":      # full resets record their own readiness time
+            _READY_TIMES.append(elapsed)
+        item.user_properties.append(("app_ready_s", round(elapsed, 3)))
+        record_reset(item, kind, elapsed)
+
+    return prepare
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Expose each phase's report on the item (item.rep_setup / rep_call)."""
+    outcome = yield
+    rep = outcome.get_result()
+    setattr(item, f"rep_{rep.when}", rep)
+
+
+@pytest.fixture(scope="session")
+def driver_pool(request, devices):
+    """
+    Session-scoped source of reusable sessions, or None for a new session
+    per test: a SessionPrewarmer over this worker's devices with --prewarm,
+    a DriverPool for its device with --driver-pool.
+    """
+    reset = _reset_function(request.config)
+    if request.config.getoption("--prewarm") and len(devices) > 1:
+        pool = SessionPrewarmer(
+            [lambda dev=dev: _new_driver(dev) for dev in devices], reset)
+        yield pool
+        pool.close()
+        _POOL_STATS["prewarm"] = pool.stats
+        return
+    if not request.config.getoption("--driver-pool"):
+        yield None
+        return
+    pool = DriverPool(lambda: _new_driver(devices[0]), reset,
+                      size=request.config.getoption("--pool-size"))
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def driver(request, device, driver_pool):
+    """
+    Function-scoped Appium WebDriver fixture.
+
+    By default each test gets a fresh driver instance → full independence
+    guaranteed.  With --driver-pool the session is borrowed from the pool
+    instead, and with --prewarm it was readied on a spare device while the
+    previous test ran; a session whose test failed is thrown away rather
+    than returned.  Either way the test starts on its declared start screen
+    (home by default), reached by navigation or, with --cold-reset, after
+    a relaunch.
+    """
+    if driver_pool is None:
+        d = _new_driver(device)
+        try:
+            _prepare_for(request.node)(d)
+        except BaseException:
+            d.quit()
+            raise
+        yield d
+        d.quit()
+        return
+
+    warmed = isinstance(driver_pool, SessionPrewarmer)
+    d = driver_pool.acquire(reset=_prepare_for(request.node, warmed))
     yield d
-    d.quit()
+    rep = getattr(request.node, "rep_call", None)
+    driver_pool.release(d, reusable=rep is not None and rep.passed)
+
+
+@pytest.fixture
+def navigator(driver):
+    """Navigator for this test's session: navigator.go_to(SIDEBAR) etc."""
+    return _navigator(driver)
+
+
+@pytest.fixture
+def seed_tasks(driver):
+    """
+    Bulk-create tasks without going through the add-task UI.
+
+        titles = seed_tasks(300)                  # generated titles
+        titles = seed_tasks(["Buy milk", ...])    # or titles / SeedTask objects
+
+    The app is relaunched to the home screen after each call, and every
+    seeded task is deleted again when the test ends.
+    """
+    seeder = TaskSeeder(driver)
+    seeded = []
+
+    def seed(tasks):
+        titles = seeder.seed(tasks)
+        seeded.extend(titles)
+        _reset_app(driver)
+        return titles
+
+    yield seed
+    if seeded:
+        seeder.clear()
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Report how long app resets actually waited for readiness."""
+    if not _READY_TIMES:
+        return
+    total = sum(_READY_TIMES)
+    terminalreporter.write_sep("-", "app readiness")
+    terminalreporter.write_line(
+        f"{len(_READY_TIMES)} resets: total {total:.1f}s, "
+        f"mean {total / len(_READY_TIMES):.2f}s, max {max(_READY_TIMES):.2f}s"
+    )
+    stats = _POOL_STATS.get("prewarm")
+    if stats:
+        handed = stats["warm_hits"] + stats["waits"]
+        terminalreporter.write_line(
+            f"prewarm: {stats['warm_hits']}/{handed} sessions ready on hand-off, "
+            f"tests waited {stats['wait_s']:.1f}s in total, background prepare "
+            f"{stats['prepare_s']:.1f}s, {stats['created']} created, "
+            f"{stats['unused']} unused at teardown")
@@ -0,0 +1,2 @@
+# framework/__init__.py
+# Makes `framework` a Python package.
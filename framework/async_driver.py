@@ -0,0 +1,327 @@
+"""
+framework/async_driver.py
+
+AsyncDriver — an asyncio facade over the WebDriver HTTP protocol.
+
+The Appium client (and so BasePage and the fixtures) blocks on every
+command; driving several devices from one process means one thread per
+device.  AsyncDriver speaks the same W3C endpoints with coroutines over a
+shared keep-alive connection pool, so one event loop can drive many
+sessions at once and fire independent queries of one session in parallel:
+
+    async def sidebar_rows(driver):
+        await (await driver.find_element(*HomePage.HAMBURGER_BUTTON)).click()
+        return await driver.visible_texts(SidebarPage.NAVIGATION_TEXTS)
+
+    results = asyncio.run(run_on_devices(registry.devices, sidebar_rows,
+                                         capabilities=capabilities_for))
+
+Errors are raised as the selenium exceptions the blocking client raises
+(NoSuchElementException, StaleElementReferenceException, ...), decoded by
+Appium's own error handler.  Commands are not recorded in COMMAND_LOG and
+do not touch the element cache; the facade is for runners and tools, page
+objects keep the blocking driver.
+
+The pool is plain asyncio streams (HTTP/1.1, Content-Length or chunked
+bodies, gzip accepted), so no extra dependency is needed.  framework/benchmark.py
+compares it with the threaded approach (async.* metrics).
+"""
+
+import asyncio
+import gzip
+import json
+from collections import deque
+from urllib.parse import urlsplit
+
+from appium.webdriver.common.appiumby import AppiumBy
+from appium.webdriver.errorhandler import MobileErrorHandler
+
+W3C_ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+MAX_PER_HOST = 8        # concurrent connections per Appium server
+TIMEOUT = 120.0         # seconds per request, like the blocking client's default
+POLL = 0.25             # seconds between find_elements polls in wait_for()
+
+_ERRORS = MobileErrorHandler()
+
+
+class _NoResponse(ConnectionResetError):
+    """The connection closed before any of the response arrived."""
+
+
+class _Connection:
+    __slots__ = ("reader", "writer", "reused")
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class AsyncConnectionPool:
+    """
+    Keep-alive HTTP/1.1 connections, at most *max_per_host* per server.
+
+    Idle connections are reused by the next request to the same server; a
+    reused connection the server has closed in the meantime is replaced
+    and the request sent again once.  That only happens when none of the
+    response arrived: a request the server may have acted on (a click, a
+    new session) is never sent twice.
+    """
+
+    def __init__(self, max_per_host: int = MAX_PER_HOST, timeout: float = TIMEOUT):
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.opened = 0             # connections opened so far, for tests and benchmarks
+        self._idle = {}             # (host, port) → deque of _Connection
+        self._limits = {}           # (host, port) → asyncio.Semaphore
+
+    async def request(self, method: str, url: str, payload=None):
+        """Send one request; returns (HTTP status, response body text)."""
+        parts = urlsplit(url)
+        key = (parts.hostname, parts.port or 80)
+        path = parts.path or "/"
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        limit = self._limits.setdefault(key, asyncio.Semaphore(self.max_per_host))
+        async with limit:
+            conn = await self._acquire(key)
+            try:
+                status, text, keep = await asyncio.wait_for(
+                    self._exchange(conn, key, method, path, body), self.timeout)
+            except _NoResponse:
+                conn.close()
+                if not conn.reused:
+                    raise
+                conn = await self._open(key)
+                try:
+                    status, text, keep = await asyncio.wait_for(
+                        self._exchange(conn, key, method, path, body), self.timeout)
+                except BaseException:
+                    conn.close()
+                    raise
+            except BaseException:
+                conn.close()
+                raise
+            if keep:
+                conn.reused = True
+                self._idle.setdefault(key, deque()).append(conn)
+            else:
+                conn.close()
+        return status, text
+
+    async def close(self) -> None:
+        """Close every idle connection."""
+        for idle in self._idle.values():
+            while idle:
+                idle.pop().close()
+
+    async def _acquire(self, key) -> _Connection:
+        idle = self._idle.get(key)
+        while idle:
+            conn = idle.pop()
+            if not conn.writer.is_closing():
+                return conn
+        return await self._open(key)
+
+    async def _open(self, key) -> _Connection:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(*key), self.timeout)
+        self.opened += 1
+        return _Connection(reader, writer)
+
+    @staticmethod
+    async def _exchange(conn, key, method, path, body):
+        head = (f"{method} {path} HTTP/1.1\r\n"
+                f"Host: {key[0]}:{key[1]}\r\n"
+                "Accept: application/json\r\n"
+                "Accept-Encoding: gzip\r\n"
+                "Content-Type: application/json;charset=UTF-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: keep-alive\r\n\r\n")
+        reader = conn.reader
+        try:
+            conn.writer.write(head.encode("latin-1") + body)
+            await conn.writer.drain()
+            status_line = await reader.readline()
+        except ConnectionError as exc:
+            raise _NoResponse(f"connection lost before the response: {exc}") from exc
+        if not status_line:
+            raise _NoResponse("server closed the connection")
+        version, status = status_line.split(None, 2)[:2]
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            data = b"".join(chunks)
+        elif "content-length" in headers:
+            data = await reader.readexactly(int(headers["content-length"]))
+        else:
+            data = await reader.read()
+            headers["connection"] = "close"
+
+        if headers.get("content-encoding", "").lower() == "gzip":
+            data = gzip.decompress(data)
+        connection = headers.get("connection", "").lower()
+        keep = connection != "close" and (version != b"HTTP/1.0" or connection == "keep-alive")
+        return int(status), data.decode("utf-8"), keep
+
+
+class AsyncElement:
+    """An element of an AsyncDriver session."""
+
+    def __init__(self, driver: "AsyncDriver", element_id: str):
+        self.driver = driver
+        self.id = element_id
+
+    async def _get(self, name: str):
+        return await self.driver.execute("GET", f"/element/{self.id}/{name}")
+
+    async def click(self) -> None:
+        await self.driver.execute("POST", f"/element/{self.id}/click", {})
+
+    async def clear(self) -> None:
+        await self.driver.execute("POST", f"/element/{self.id}/clear", {})
+
+    async def send_keys(self, text: str) -> None:
+        await self.driver.execute("POST", f"/element/{self.id}/value",
+                                  {"text": text, "value": list(text)})
+
+    async def text(self) -> str:
+        return await self._get("text")
+
+    async def get_attribute(self, name: str):
+        return await self._get(f"attribute/{name}")
+
+    async def is_displayed(self) -> bool:
+        return await self._get("displayed")
+
+    async def is_enabled(self) -> bool:
+        return await self._get("enabled")
+
+
+class AsyncDriver:
+    """
+    One WebDriver session driven with coroutines.
+
+    Typical flow:
+        pool = AsyncConnectionPool()
+        driver = await AsyncDriver.start(pool, device.appium_url, capabilities)
+        title, fab = await asyncio.gather(driver.is_visible(a), driver.is_visible(b))
+        await driver.quit()
+    """
+
+    def __init__(self, pool: AsyncConnectionPool, url: str, session_id: str, capabilities: dict):
+        self.pool = pool
+        self.url = url.rstrip("/")
+        self.session_id = session_id
+        self.capabilities = capabilities
+
+    @classmethod
+    async def start(cls, pool: AsyncConnectionPool, url: str, capabilities: dict) -> "AsyncDriver":
+        """Open a session with *capabilities* (W3C alwaysMatch) on the server at *url*."""
+        value = await _command(pool, "POST", url.rstrip("/") + "/session", {
+            "capabilities": {"firstMatch": [{}], "alwaysMatch": capabilities},
+        })
+        return cls(pool, url, value["sessionId"], value.get("capabilities", {}))
+
+    async def execute(self, method: str, path: str, payload=None):
+        """Send a session command (*path* relative to the session) and return its value."""
+        return await _command(self.pool, method,
+                              f"{self.url}/session/{self.session_id}{path}", payload)
+
+    async def quit(self) -> None:
+        await self.execute("DELETE", "")
+
+    # -- finding -------------------------------------------------------
+
+    async def find_element(self, by: str, value: str) -> AsyncElement:
+        found = await self.execute("POST", "/element", {"using": by, "value": value})
+        return AsyncElement(self, found[W3C_ELEMENT_KEY])
+
+    async def find_elements(self, by: str, value: str) -> list:
+        found = await self.execute("POST", "/elements", {"using": by, "value": value})
+        return [AsyncElement(self, f[W3C_ELEMENT_KEY]) for f in found]
+
+    async def is_visible(self, locator) -> bool:
+        """True if an element matching *locator* is displayed right now."""
+        for element in await self.find_elements(*locator):
+            if await element.is_displayed():
+                return True
+        return False
+
+    async def visible_texts(self, texts) -> dict:
+        """{text: visible?} for *texts*, all checked concurrently."""
+        locators = [(AppiumBy.ANDROID_UIAUTOMATOR, f'new UiSelector().text("{t}")') for t in texts]
+        found = await asyncio.gather(*(self.is_visible(locator) for locator in locators))
+        return dict(zip(texts, found))
+
+    async def wait_for(self, locator, timeout: float) -> AsyncElement:
+        """First displayed match of *locator*, polling until *timeout* seconds."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            for element in await self.find_elements(*locator):
+                if await element.is_displayed():
+                    return element
+            if loop.time() >= deadline:
+                raise asyncio.TimeoutError(f"{locator} not displayed after {timeout}s")
+            await asyncio.sleep(POLL)
+
+    # -- screen and app ------------------------------------------------
+
+    async def page_source(self) -> str:
+        return await self.execute("GET", "/source")
+
+    async def back(self) -> None:
+        await self.execute("POST", "/back", {})
+
+    async def execute_script(self, script: str, *args):
+        return await self.execute("POST", "/execute/sync", {"script": script, "args": list(args)})
+
+
+async def _command(pool, method, url, payload):
+    status, text = await pool.request(method, url, payload)
+    if status >= 400:
+        _ERRORS.check_response({"status": status, "value": text})
+    try:
+        return json.loads(text).get("value") if text.strip() else None
+    except ValueError:
+        return text
+
+
+async def run_on_devices(devices, check, capabilities, pool: AsyncConnectionPool = None) -> list:
+    """
+    Open a session on every device, run ``await check(driver)`` on all of
+    them concurrently and quit the sessions; returns the results in device
+    order.  *capabilities(device)* gives each session's capabilities.
+    """
+    own_pool = pool is None
+    pool = pool or AsyncConnectionPool()
+    started = await asyncio.gather(*(
+        AsyncDriver.start(pool, device.appium_url, capabilities(device)) for device in devices),
+        return_exceptions=True)
+    drivers = [d for d in started if isinstance(d, AsyncDriver)]
+    try:
+        for result in started:
+            if isinstance(result, BaseException):
+                raise result
+        return await asyncio.gather(*(check(driver) for driver in drivers))
+    finally:
+        await asyncio.gather(*(driver.quit() for driver in drivers), return_exceptions=True)
+        if own_pool:
+            await pool.close()
@@ -0,0 +1,453 @@
+"""
+framework/benchmark.py
+
+Suite performance benchmark with regression gating.
+
+    python -m framework.benchmark                 # measure, compare, record
+    python -m framework.benchmark --no-e2e        # skip the pytest subprocess
+    python -m framework.benchmark --threshold 0.3 --repeat 9
+
+Runs against in-process fake Appium servers (framework/fake_appium.py)
+with a fixed per-request latency, so results depend on the framework's
+own code and the number of round-trips it makes, not on an emulator.
+Measured, as the median of --repeat runs:
+
+    setup.*      opening a session, the cold reset, the return to home
+    find.*       one BasePage finder per locator strategy: UiSelector
+                 text, accessibility id, resource id, the hint lookup
+                 (find_by_hint) and the plain XPath on @hint, each with
+                 an empty element cache; find.cached is a cache hit
+    input.*      TaskPage.fill (title and description) with values set
+                 directly and typed through the keyboard
+    onboarding   _dismiss_onboarding on a first-run screen
+    http.*       the HTTP layer without server latency: requests over new
+                 vs. kept-alive connections, concurrent requests with a
+                 one-connection vs. a sized pool, page source plain vs.
+                 gzip'd (also in bytes sent and connections opened)
+    async.*      the sidebar row checks on four devices at once: a thread
+                 per device (blocking client), a coroutine per device, and
+                 a coroutine per device with its checks run concurrently
+    e2e.*        every test of the suite end to end (pytest --fake-appium)
+
+Each metric also records the WebDriver commands it took; that count is
+exact, so a change that adds round-trips is caught even when the latency
+hides it in the noise.
+
+Every run is appended to .benchmarks/history.json.  A metric regresses
+when it exceeds the median of its last --window passing runs (same
+latency) by more than --threshold and by more than a small absolute
+margin; the run then exits 1 and is kept out of later baselines.
+
+A deliberate slowdown is accepted with --rebaseline: the run passes, is
+recorded, and becomes the new baseline; older runs no longer count.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from framework.command_timing import COMMAND_LOG
+from framework.devices import DeviceRegistry
+from framework.element_cache import ELEMENT_CACHE
+from framework.fake_appium import FakeAppiumServer
+from framework.http_tuning import HTTP
+from framework.navigation import ADD_TASK, HOME, ONBOARDING, SIDEBAR
+from framework.timeouts import LATENCIES
+
+HISTORY_PATH = Path(".benchmarks") / "history.json"
+
+LATENCY = 0.02        # seconds per fake Appium request
+REPEAT = 5
+THRESHOLD = 0.20      # allowed slowdown over the baseline median
+WINDOW = 5            # passing runs the baseline is taken from
+MAX_RUNS = 100        # history entries kept
+ASYNC_DEVICES = 4     # fake devices driven at once in the async.* benchmarks
+HTTP_REQUESTS = 50    # requests per http.command/http.concurrent measurement
+# Below these absolute differences a change is noise, whatever the ratio
+MIN_DELTA = {"s": 0.010, "commands": 0.5, "bytes": 1024, "connections": 0.5}
+
+
+# ----------------------------------------------------------------------
+# Measurements
+# ----------------------------------------------------------------------
+
+def _measure(results, name, action, repeat, before=None) -> None:
+    """Time *action* *repeat* times (after the untimed *before*), keep medians."""
+    times, commands = [], []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        COMMAND_LOG.take()
+        start = time.perf_counter()
+        action()
+        times.append(time.perf_counter() - start)
+        commands.append(len(COMMAND_LOG.take()))
+    results[name] = {"s": round(statistics.median(times), 4),
+                     "commands": statistics.median(commands)}
+
+
+def _device(server):
+    return DeviceRegistry.from_entries([{"udid": "bench", "appium_url": server.url}]).devices[0]
+
+
+def bench_fixtures(results, latency: float, repeat: int) -> None:
+    """Session creation and the resets the driver fixture runs."""
+    import conftest
+
+    with FakeAppiumServer(port=0, latency=latency) as server:
+        device = _device(server)
+        sessions = []
+        _measure(results, "setup.new_session",
+                 lambda: sessions.append(conftest._new_driver(device)), repeat)
+        for d in sessions[:-1]:
+            d.quit()
+        d = sessions[-1]
+        nav = conftest._navigator(d)
+        _measure(results, "setup.cold_reset", lambda: conftest._reset_app(d), repeat)
+        _measure(results, "setup.return_home", lambda: conftest._return_home(d), repeat,
+                 before=lambda: nav.go_to(SIDEBAR))
+        _measure(results, "setup.navigate_to_sidebar", lambda: nav.go_to(SIDEBAR), repeat,
+                 before=lambda: nav.go_to(HOME))
+        d.quit()
+
+
+def bench_finders(results, latency: float, repeat: int) -> None:
+    """One BasePage finder per locator strategy, on the screen that has it."""
+    import conftest
+    from pages.home_page import HomePage
+    from pages.task_page import TaskPage
+
+    with FakeAppiumServer(port=0, latency=latency) as server:
+        d = conftest._new_driver(_device(server))
+        conftest._reset_app(d)
+        home = HomePage(d)
+        task = TaskPage(d)
+
+        def uncached():
+            ELEMENT_CACHE.forget(d)
+
+        _measure(results, "find.text",
+                 lambda: home.find_by_text(HomePage.TOOLBAR_TITLE_TEXT), repeat, before=uncached)
+        _measure(results, "find.accessibility_id",
+                 lambda: home.find_by_accessibility_id(HomePage.FAB[1]), repeat, before=uncached)
+        _measure(results, "find.resource_id",
+                 lambda: home.find_by_resource_id(HomePage.SEARCH_BUTTON[1]), repeat,
+                 before=uncached)
+        _measure(results, "find.cached",
+                 lambda: home.find_by_resource_id(HomePage.SEARCH_BUTTON[1]), repeat)
+        conftest._navigator(d).go_to(ADD_TASK)
+        _measure(results, "find.hint",
+                 lambda: task.find_by_hint(TaskPage.TITLE_HINT), repeat, before=uncached)
+        _measure(results, "find.xpath_hint",
+                 lambda: task.find(task.hint_locator(TaskPage.TITLE_HINT)), repeat,
+                 before=uncached)
+
+        def fill():
+            task.fill("Benchmark task", "A description of some length " * 4)
+
+        for mode in ("replace", "keys"):
+            task.TEXT_INPUT = mode
+            _measure(results, f"input.{mode}", fill, repeat, before=uncached)
+        d.quit()
+
+
+def bench_onboarding(results, latency: float, repeat: int) -> None:
+    """_dismiss_onboarding on a freshly launched first-run screen."""
+    import conftest
+
+    with FakeAppiumServer(port=0, latency=latency, onboarding=True) as server:
+        d = conftest._new_driver(_device(server))
+        nav = conftest._navigator(d)
+
+        def relaunch():
+            server.device.onboarding_pending = True
+            d.terminate_app("org.tasks")
+            d.activate_app("org.tasks")
+            if nav.wait_for_screen(ONBOARDING) != ONBOARDING:
+                raise RuntimeError("fake server did not show the onboarding screen")
+
+        _measure(results, "onboarding.dismiss",
+                 lambda: conftest._dismiss_onboarding(d), repeat, before=relaunch)
+        d.quit()
+
+
+def bench_http(results, repeat: int) -> None:
+    """
+    Client-side cost of the HTTP requests themselves, without server latency:
+    HTTP_REQUESTS status queries over a new connection per request and over
+    a kept-alive one, the same queries from four threads sharing a session
+    with a pool of one connection (selenium's default) and of HTTP.pool_size,
+    and the add-task page source uncompressed and gzip'd.
+    """
+    import logging
+    from concurrent.futures import ThreadPoolExecutor
+
+    import conftest
+    from appium import webdriver
+    from framework.command_timing import InstrumentedConnection
+    from pages.home_page import HomePage
+
+    saved = (HTTP.pool_size, HTTP.gzip)
+    # A one-connection pool discards the extra sockets of concurrent requests,
+    # with a warning per request; the connections metric shows it instead.
+    pool_log = logging.getLogger("urllib3.connectionpool")
+    level = pool_log.level
+    pool_log.setLevel(logging.ERROR)
+    with FakeAppiumServer(port=0) as server:
+        device = _device(server)
+
+        def new_driver(keep_alive=True):
+            return webdriver.Remote(InstrumentedConnection(device.appium_url, keep_alive=keep_alive),
+                                    options=conftest.get_options(device))
+
+        def measure(name, action, before=None):
+            sent, opened = server.bytes_sent, server.connections
+            _measure(results, name, action, repeat, before=before)
+            results[name]["bytes"] = round((server.bytes_sent - sent) / repeat)
+            results[name]["connections"] = (server.connections - opened) / repeat
+
+        try:
+            for name, keep_alive in (("reconnect", False), ("keep_alive", True)):
+                d = new_driver(keep_alive)
+                fab = d.find_element(*HomePage.FAB)
+                measure(f"http.command.{name}",
+                        lambda: [fab.is_displayed() for _ in range(HTTP_REQUESTS)])
+                d.quit()
+
+            for name, size in (("pool1", 1), ("pooled", saved[0])):
+                HTTP.pool_size = size
+                d = new_driver()
+                fab = d.find_element(*HomePage.FAB)
+                with ThreadPoolExecutor(4) as threads:
+                    measure(f"http.concurrent.{name}", lambda: list(threads.map(
+                        lambda _: fab.is_displayed(), range(HTTP_REQUESTS))))
+                d.quit()
+            HTTP.pool_size = saved[0]
+
+            d = new_driver()
+            conftest._navigator(d).go_to(ADD_TASK)
+            for name, gzip in (("plain", False), ("gzip", True)):
+                HTTP.gzip = gzip
+                measure(f"http.page_source.{name}", lambda: d.page_source)
+            d.quit()
+        finally:
+            HTTP.pool_size, HTTP.gzip = saved
+            pool_log.setLevel(level)
+
+
+def bench_async(results, latency: float, repeat: int) -> None:
+    """
+    The sidebar row checks on ASYNC_DEVICES devices at once: one thread and
+    blocking driver per device, one coroutine per device, and one coroutine
+    per device firing its checks concurrently (framework/async_driver.py).
+    """
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+
+    import conftest
+    from framework.async_driver import AsyncConnectionPool, AsyncDriver
+    from pages.sidebar_page import SidebarPage
+
+    locators = [SidebarPage.text_locator(t) for t in SidebarPage.NAVIGATION_TEXTS]
+
+    def check_blocking(d):
+        return [any(e.is_displayed() for e in d.find_elements(*loc)) for loc in locators]
+
+    async def check_sequential(d):
+        return [await d.is_visible(loc) for loc in locators]
+
+    async def check_concurrent(d):
+        return await asyncio.gather(*(d.is_visible(loc) for loc in locators))
+
+    def run(*aws):
+        async def gathered():
+            return await asyncio.gather(*aws)
+        return loop.run_until_complete(gathered())
+
+    servers = [FakeAppiumServer(port=0, latency=latency).start() for _ in range(ASYNC_DEVICES)]
+    loop = asyncio.new_event_loop()
+    pool = AsyncConnectionPool()
+    try:
+        devices = [_device(server) for server in servers]
+        sessions = run(*(
+            AsyncDriver.start(pool, dev.appium_url, conftest.get_options(dev).to_capabilities())
+            for dev in devices))
+        drivers = [conftest._new_driver(dev) for dev in devices]
+        for d in drivers:
+            conftest._navigator(d).go_to(SIDEBAR)
+
+        with ThreadPoolExecutor(len(drivers)) as threads:
+            _measure(results, "async.threads",
+                     lambda: list(threads.map(check_blocking, drivers)), repeat)
+
+        _measure(results, "async.sequential",
+                 lambda: run(*(check_sequential(d) for d in sessions)), repeat)
+        _measure(results, "async.concurrent",
+                 lambda: run(*(check_concurrent(d) for d in sessions)), repeat)
+        # Only the blocking driver's commands are logged; keep the metrics comparable.
+        for name in ("async.threads", "async.sequential", "async.concurrent"):
+            results[name].pop("commands")
+
+        run(*(d.quit() for d in sessions))
+        for d in drivers:
+            d.quit()
+    finally:
+        loop.run_until_complete(pool.close())
+        loop.close()
+        for server in servers:
+            server.stop()
+
+
+def bench_e2e(results, latency: float) -> None:
+    """Run the suite once against the fake server and time every test."""
+    with tempfile.TemporaryDirectory() as tmp:
+        junit = Path(tmp) / "junit.xml"
+        cmd = [sys.executable, "-m", "pytest", "tests", "--ignore=tests/unit", "-q",
+               "-p", "no:cacheprovider", "-o", "addopts=", "--fake-appium", f"--fake-latency={latency}",
+               "--no-learned-timeouts", f"--timing-history={Path(tmp) / 'timings.json'}",
+               f"--test-durations={Path(tmp) / 'durations.json'}", f"--junitxml={junit}"]
+        start = time.perf_counter()
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        total = time.perf_counter() - start
+        if proc.returncode != 0:
+            print(proc.stdout[-4000:])
+            raise RuntimeError(f"pytest exited with {proc.returncode}")
+        for case in ET.parse(junit).iter("testcase"):
+            results[f"e2e.{case.get('name')}"] = {"s": round(float(case.get("time")), 4)}
+    results["e2e.suite"] = {"s": round(total, 4)}
+
+
+# ----------------------------------------------------------------------
+# History and gating
+# ----------------------------------------------------------------------
+
+def load_history(path) -> list:
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return []
+
+
+def save_history(path, runs) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w") as fh:
+        json.dump(runs[-MAX_RUNS:], fh, indent=1)
+    os.replace(tmp, path)
+
+
+def baseline(runs, latency: float, window: int = WINDOW) -> dict:
+    """
+    Per metric and unit, the median of the last *window* passing runs,
+    going back no further than the latest --rebaseline run.
+    """
+    values = {}
+    for run in reversed(runs):
+        if run.get("regressed") or run.get("latency") != latency:
+            continue
+        for name, metric in run["metrics"].items():
+            for unit, value in metric.items():
+                bucket = values.setdefault((name, unit), [])
+                if len(bucket) < window:
+                    bucket.append(value)
+        if run.get("rebaseline"):
+            break
+    return {key: statistics.median(bucket) for key, bucket in values.items()}
+
+
+def regressions(metrics, base, threshold: float = THRESHOLD) -> list:
+    """(name, unit, value, baseline) for every metric slower than allowed."""
+    found = []
+    for name, metric in sorted(metrics.items()):
+        for unit, value in metric.items():
+            ref = base.get((name, unit))
+            if ref is None:
+                continue
+            if value > ref * (1 + threshold) and value - ref > MIN_DELTA[unit]:
+                found.append((name, unit, value, ref))
+    return found
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--latency", type=float, default=LATENCY,
+                        help="Fake Appium latency per request, in seconds.")
+    parser.add_argument("--repeat", type=int, default=REPEAT,
+                        help="Runs per micro-benchmark (the median is kept).")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="Allowed slowdown over the baseline, e.g. 0.2 for 20%%.")
+    parser.add_argument("--window", type=int, default=WINDOW,
+                        help="Passing runs the baseline median is taken from.")
+    parser.add_argument("--history", default=str(HISTORY_PATH))
+    parser.add_argument("--no-e2e", action="store_true",
+                        help="Skip the end-to-end run of the test suite.")
+    parser.add_argument("--no-save", action="store_true",
+                        help="Compare only; do not append this run to the history.")
+    parser.add_argument("--rebaseline", action="store_true",
+                        help="Accept this run's slowdowns: pass, and make it the new baseline.")
+    args = parser.parse_args(argv)
+
+    # Fixed budgets: learned timeouts would make runs depend on earlier ones.
+    LATENCIES.enabled = False
+    metrics = {}
+    bench_fixtures(metrics, args.latency, args.repeat)
+    bench_finders(metrics, args.latency, args.repeat)
+    bench_onboarding(metrics, args.latency, args.repeat)
+    bench_http(metrics, args.repeat)
+    bench_async(metrics, args.latency, args.repeat)
+    if not args.no_e2e:
+        bench_e2e(metrics, args.latency)
+
+    runs = load_history(args.history)
+    base = baseline(runs, args.latency, args.window)
+    slow = regressions(metrics, base, args.threshold)
+    slow_names = {(name, unit) for name, unit, _, _ in slow}
+    for name, metric in sorted(metrics.items()):
+        ref = base.get((name, "s"))
+        change = f"{(metric['s'] / ref - 1) * 100:+6.1f}%" if ref else "    new"
+        commands = f"{metric['commands']:5g} cmds" if "commands" in metric else " " * 10
+        flag = "REGRESSED" if any(key[0] == name for key in slow_names) else ""
+        if "bytes" in metric:
+            flag = f"{metric['bytes']:8d} B  {metric['connections']:4g} conn  {flag}"
+        print(f"{name:48} {metric['s'] * 1000:9.1f} ms  {commands}  {change}  {flag}")
+    for name, unit, value, ref in slow:
+        print(f"[benchmark] {name} {unit}: {value:g} vs baseline {ref:g} "
+              f"(more than {args.threshold:.0%} over)")
+
+    if not args.no_save:
+        run = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _commit(),
+            "latency": args.latency,
+            "repeat": args.repeat,
+            "regressed": bool(slow) and not args.rebaseline,
+            "metrics": metrics,
+        }
+        if args.rebaseline:
+            run["rebaseline"] = True
+        runs.append(run)
+        save_history(args.history, runs)
+    print(f"[benchmark] {len(metrics)} metrics, {len(slow)} regressed"
+          + (", accepted as the new baseline" if args.rebaseline else "")
+          + ("" if base else " (no baseline yet)"))
+    return 1 if slow and not args.rebaseline else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""
+framework/command_timing.py
+
+Per-command WebDriver timing.
+
+InstrumentedConnection wraps the Appium RemoteConnection so that every
+WebDriver command (find element, click, page source, ...) is timed and
+attributed to the running test, its phase (setup/call/teardown) and the
+outermost page-object method that issued it.  The pytest plugin half of
+this module aggregates the records and publishes them:
+
+    * a breakdown table and the slowest commands in the pytest-html report
+    * the raw per-command records in reports/commands.json
+
+Consecutive identical find commands issued by the same page-object call
+are WebDriverWait polls; they are reported as retries.
+
+conftest.py imports this module before registering it as a plugin, so it
+opts out of assertion rewriting: PYTEST_DONT_REWRITE
+"""
+
+import json
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import pytest
+from framework.element_cache import ELEMENT_CACHE
+from framework.http_tuning import TunedConnection
+
+COMMANDS_JSON = Path("reports") / "commands.json"
+
+# Commands whose "using"/"value" params identify a locator
+_FIND_COMMANDS = {"findElement", "findElements", "findChildElement", "findChildElements"}
+
+
+class CommandLog:
+    """Collects command records for the test currently running."""
+
+    def __init__(self):
+        self.test = None
+        self.phase = None
+        self.records = []
+        self._lock = threading.Lock()
+        self._thread = threading.local()
+
+    def start(self, test: str, phase: str) -> None:
+        self.test, self.phase = test, phase
+
+    def set_thread_phase(self, phase: str) -> None:
+        """Label commands from the calling (background) thread with *phase*
+        instead of attributing them to the running test."""
+        self._thread.phase = phase
+
+    def take(self) -> list:
+        """Return and clear the records gathered so far."""
+        with self._lock:
+            records, self.records = self.records, []
+        return records
+
+    def add(self, record: dict) -> None:
+        phase = getattr(self._thread, "phase", None)
+        record["test"] = f"({phase})" if phase else self.test
+        record["phase"] = phase or self.phase
+        with self._lock:
+            self.records.append(record)
+
+
+COMMAND_LOG = CommandLog()
+
+
+def _page_method() -> str:
+    """Qualified name of the outermost pages.* function on the call stack."""
+    frame = sys._getframe(2)
+    found = None
+    while frame is not None:
+        if frame.f_globals.get("__name__", "").startswith("pages."):
+            code = frame.f_code
+            found = getattr(code, "co_qualname", code.co_name)
+        frame = frame.f_back
+    return found
+
+
+class InstrumentedConnection(TunedConnection):
+    """
+    Appium connection (with the framework's HTTP settings) that times every
+    command into COMMAND_LOG and tells the element cache about commands
+    that may change the screen.
+    """
+
+    def execute(self, command, params):
+        ELEMENT_CACHE.observe(command, params)
+        record = {"command": command, "page_method": _page_method()}
+        if command in _FIND_COMMANDS and isinstance(params, dict):
+            record["using"] = params.get("using")
+            record["value"] = params.get("value")
+        start = time.perf_counter()
+        ok = False
+        try:
+            response = super().execute(command, params)
+            ok = not (isinstance(response, dict)
+                      and isinstance(response.get("status"), int)
+                      and response["status"] >= 400)
+            return response
+        finally:
+            record["duration_s"] = time.perf_counter() - start
+            record["ok"] = ok
+            COMMAND_LOG.add(record)
+
+
+# ----------------------------------------------------------------------
+# Aggregation
+# ----------------------------------------------------------------------
+
+def count_retries(records) -> int:
+    """Count WebDriverWait re-polls: repeats of the previous find in the same call."""
+    retries = 0
+    previous = None
+    for rec in records:
+        key = (rec.get("test"), rec.get("page_method"), rec["command"], rec.get("using"), rec.get("value"))
+        if rec["command"] in _FIND_COMMANDS and key == previous:
+            retries += 1
+        previous = key
+    return retries
+
+
+def summarize(records, key) -> list:
+    """Group *records* by *key(record)* → [(key, count, total_s, max_s, retries)], slowest first."""
+    groups = defaultdict(list)
+    for rec in records:
+        groups[key(rec)].append(rec)
+    rows = [
+        (name, len(recs), sum(r["duration_s"] for r in recs),
+         max(r["duration_s"] for r in recs), count_retries(recs))
+        for name, recs in groups.items()
+    ]
+    return sorted(rows, key=lambda row: row[2], reverse=True)
+
+
+def _command_label(rec) -> str:
+    if rec.get("using"):
+        return f"{rec['command']} [{rec['using']}]"
+    return rec["command"]
+
+
+def _html_table(title, headers, rows) -> str:
+    head = "".join(f"<th>{h}</th>" for h in headers)
+    body = "".join(
+        "<tr>" + "".join(f"<td>{_escape(c)}</td>" for c in row) + "</tr>" for row in rows
+    )
+    return (f"<h3>{title}</h3><table class='webdriver-commands' border='1' "
+            f"cellpadding='3'><tr>{head}</tr>{body}</table>")
+
+
+def _escape(value) -> str:
+    if isinstance(value, float):
+        value = f"{value:.3f}"
+    return (str(value).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;"))
+
+
+def _summary_rows(rows):
+    return [(name, n, total, total / n, peak, retries) for name, n, total, peak, retries in rows]
+
+
+def summary_tables(records, top_n: int) -> list:
+    """HTML tables for the report summary: per command, per page-object method, slowest."""
+    headers = ["", "count", "total s", "mean s", "max s", "retries"]
+    slowest = sorted(records, key=lambda r: r["duration_s"], reverse=True)[:top_n]
+    return [
+        _html_table("WebDriver commands", ["command"] + headers[1:],
+                    _summary_rows(summarize(records, _command_label))),
+        _html_table("WebDriver time by page-object method", ["page-object method"] + headers[1:],
+                    _summary_rows(summarize(
+                        records, lambda r: r.get("page_method") or "(fixture/test)"))),
+        _html_table(f"Top {top_n} slowest commands",
+                    ["test", "phase", "command", "locator", "page-object method", "s"],
+                    [(r["test"], r["phase"], r["command"], r.get("value") or "",
+                      r.get("page_method") or "", r["duration_s"]) for r in slowest]),
+    ]
+
+
+def write_commands_json(records, path=COMMANDS_JSON) -> None:
+    """Write the raw *records* with their totals (the reports/commands.json layout)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "total_s": sum(r["duration_s"] for r in records),
+        "commands": len(records),
+        "retries": count_retries(records),
+        "records": records,
+    }, indent=1))
+
+
+# ----------------------------------------------------------------------
+# pytest plugin
+# ----------------------------------------------------------------------
+
+_COLLECTED = []
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("appium")
+    group.addoption(
+        "--slowest-commands", type=int, default=10,
+        help="How many of the slowest WebDriver commands to list in the report.",
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    COMMAND_LOG.start(item.nodeid, "setup")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_call(item):
+    COMMAND_LOG.start(item.nodeid, "call")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_teardown(item):
+    COMMAND_LOG.start(item.nodeid, "teardown")
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    # Ship records in a private report attribute: it survives pytest-xdist
+    # serialisation, but unlike user_properties it stays out of junitxml,
+    # which only gets the command count.
+    records = COMMAND_LOG.take()
+    if records:
+        report._webdriver_commands = records
+        report.user_properties.append(("webdriver_commands", len(records)))
+
+
+def _records_of(report) -> list:
+    return getattr(report, "_webdriver_commands", None) or []
+
+
+def pytest_runtest_logreport(report):
+    _COLLECTED.extend(_records_of(report))
+
+
+def pytest_sessionfinish(session):
+    if not _COLLECTED or hasattr(session.config, "workerinput"):
+        return
+    write_commands_json(_COLLECTED)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not _COLLECTED:
+        return
+    terminalreporter.write_sep("-", "webdriver commands")
+    for name, n, total, peak, retries in summarize(_COLLECTED, _command_label)[:10]:
+        terminalreporter.write_line(
+            f"{name:40} {n:5}x  total {total:7.2f}s  max {peak:6.2f}s  retries {retries}")
+    terminalreporter.write_line(f"raw records: {COMMANDS_JSON}")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_html_results_summary(prefix, summary, postfix, session):
+    if not _COLLECTED:
+        return
+    postfix.extend(summary_tables(_COLLECTED, session.config.getoption("--slowest-commands")))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_html_results_table_html(report, data):
+    records = _records_of(report)
+    if records:
+        rows = _summary_rows(summarize(records, _command_label))
+        data.append(_html_table(
+            f"WebDriver commands ({report.when})",
+            ["command", "count", "total s", "mean s", "max s", "retries"], rows))
@@ -0,0 +1,145 @@
+"""
+framework/devices.py
+
+Device registry for running the suite on several emulators at once.
+
+A registry is a JSON list of devices, each with its own Appium server URL
+and the host ports UiAutomator2 needs to be unique per device:
+
+    [
+      {"udid": "emulator-5554", "appium_url": "http://127.0.0.1:4723"},
+      {"udid": "emulator-5556", "appium_url": "http://127.0.0.1:4725",
+       "system_port": 8201, "mjpeg_server_port": 7811}
+    ]
+
+Missing ports are assigned from the UiAutomator2 defaults (8200 / 7810)
+plus the device's position in the list.  Worker processes (pytest-xdist
+workers, or independent pytest runs) each lease one device through a lock
+file (framework/lockfile.py), so two workers never drive the same emulator.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from framework.lockfile import try_lock, unlock
+
+DEFAULT_APPIUM_URL = "http://127.0.0.1:4723"
+DEFAULT_UDID = "emulator-5554"
+BASE_SYSTEM_PORT = 8200
+BASE_MJPEG_SERVER_PORT = 7810
+
+
+@dataclass(frozen=True)
+class Device:
+    """One Android device/emulator and the Appium server that drives it."""
+
+    udid: str
+    appium_url: str
+    system_port: int
+    mjpeg_server_port: int
+
+    @property
+    def name(self) -> str:
+        return self.udid
+
+
+class DeviceRegistry:
+    """
+    The set of devices available to this run, with cross-process leasing.
+
+    Typical flow:
+        registry = DeviceRegistry.from_file("devices.json")
+        device = registry.lease()      # blocks until a device is free
+        ...
+        registry.release(device)
+    """
+
+    def __init__(self, devices, lock_dir=None):
+        if not devices:
+            raise ValueError("Device registry is empty")
+        udids = [d.udid for d in devices]
+        ports = [p for d in devices for p in (d.system_port, d.mjpeg_server_port)]
+        if len(set(udids)) != len(udids):
+            raise ValueError(f"Duplicate udid in device registry: {udids}")
+        if len(set(ports)) != len(ports):
+            raise ValueError("systemPort/mjpegServerPort values must be unique across devices")
+        self.devices = list(devices)
+        if lock_dir is None:
+            digest = hashlib.sha1(",".join(udids).encode()).hexdigest()[:12]
+            lock_dir = Path(tempfile.gettempdir()) / f"appium-device-locks-{digest}"
+        self.lock_dir = Path(lock_dir)
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_entries(cls, entries, lock_dir=None) -> "DeviceRegistry":
+        """Build a registry from dicts as found in the JSON file."""
+        devices = []
+        for i, entry in enumerate(entries):
+            devices.append(Device(
+                udid=entry["udid"],
+                appium_url=entry.get("appium_url", DEFAULT_APPIUM_URL),
+                system_port=int(entry.get("system_port", BASE_SYSTEM_PORT + i)),
+                mjpeg_server_port=int(entry.get("mjpeg_server_port", BASE_MJPEG_SERVER_PORT + i)),
+            ))
+        return cls(devices, lock_dir)
+
+    @classmethod
+    def from_file(cls, path, lock_dir=None) -> "DeviceRegistry":
+        """Load a registry from a JSON file (see module docstring)."""
+        return cls.from_entries(json.loads(Path(path).read_text()), lock_dir)
+
+    @classmethod
+    def single(cls, appium_url: str = DEFAULT_APPIUM_URL, udid: str = DEFAULT_UDID) -> "DeviceRegistry":
+        """The historical one-emulator setup."""
+        return cls.from_entries([{"udid": udid, "appium_url": appium_url}])
+
+    # ------------------------------------------------------------------
+    # Leasing
+    # ------------------------------------------------------------------
+
+    def lease(self, timeout: float = 600, poll: float = 1.0, preferred: int = 0) -> Device:
+        """
+        Lock and return a free device, waiting up to *timeout* seconds.
+
+        Devices are tried starting at index *preferred* (e.g. the xdist
+        worker number) so workers spread out without contending.
+        """
+        deadline = time.monotonic() + timeout
+        count = len(self.devices)
+        while True:
+            for offset in range(count):
+                device = self.devices[(preferred + offset) % count]
+                if self._try_lock(device):
+                    return device
+            if time.monotonic() >= deadline:
+                raise TimeoutError(
+                    f"No free device among {[d.udid for d in self.devices]} "
+                    f"after {timeout:.0f}s (locks in {self.lock_dir})"
+                )
+            time.sleep(poll)
+
+    def release(self, device: Device) -> None:
+        """Unlock *device* so another worker can lease it."""
+        unlock(self._lock_path(device))
+
+    def _lock_path(self, device: Device) -> Path:
+        return self.lock_dir / f"{device.udid}.lock"
+
+    def _try_lock(self, device: Device) -> bool:
+        return try_lock(self._lock_path(device))
+
+
+def worker_index() -> int:
+    """Index of this pytest-xdist worker (gw0 → 0), or 0 when not distributed."""
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+    digits = "".join(ch for ch in worker if ch.isdigit())
+    return int(digits) if digits else 0
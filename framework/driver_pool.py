@@ -0,0 +1,154 @@
+"""
+framework/driver_pool.py
+
+DriverPool — keeps live Appium sessions alive between tests.
+
+Creating a UiAutomator2 session is by far the most expensive part of a
+test's setup.  The pool creates sessions lazily (up to *size* per device),
+hands each test a session that has just been passed through *reset*, and
+takes it back afterwards.  A session whose test failed, or which no longer
+answers, is quit and replaced so one broken test cannot leak state into
+the next.
+"""
+
+import threading
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+
+class DriverPool:
+    """
+    Thread-safe pool of reusable Appium sessions for a single device.
+
+    Typical flow:
+        pool = DriverPool(new_driver, reset_app, size=1)
+        d = pool.acquire()        # reset session, ready on the home screen
+        ...
+        pool.release(d, reusable=not failed)
+        pool.close()              # quit every idle session
+    """
+
+    def __init__(self, factory, reset, size: int = 1):
+        """
+        *factory* is a zero-argument callable returning a new WebDriver;
+        *reset* takes a WebDriver and brings the app back to a clean state.
+        """
+        if size < 1:
+            raise ValueError(f"Pool size must be >= 1, got {size}")
+        self._factory = factory
+        self._reset = reset
+        self._size = size
+        self._idle = []
+        self._in_use = set()
+        self._creating = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self.stats = {"created": 0, "reused": 0, "discarded": 0, "create_s": 0.0}
+
+    # ------------------------------------------------------------------
+    # Lease / return
+    # ------------------------------------------------------------------
+
+    def acquire(self, timeout: float = 300, reset=None):
+        """
+        Return a reset session, creating one if the pool is not full.
+
+        *reset*, if given, replaces the pool's reset for this acquisition
+        (e.g. a lighter one when the previous test left the app in place).
+        """
+        reset = reset or self._reset
+        deadline = time.monotonic() + timeout
+        while True:
+            d = self._take_or_reserve(deadline)
+            reused = d is not None
+            try:
+                if d is None:
+                    d = self._create()
+                reset(d)
+            except WebDriverException as exc:
+                print(f"[driver_pool] session unusable, replacing it: {exc.msg}")
+                self._discard(d)
+                if not reused:
+                    raise
+                continue
+            except BaseException:
+                # The session may be anywhere; never leave it leased
+                self._discard(d)
+                raise
+            if reused:
+                self.stats["reused"] += 1
+            return d
+
+    def release(self, d, reusable: bool = True) -> None:
+        """Give *d* back to the pool, or quit it when *reusable* is False."""
+        if not reusable or self._closed:
+            self._discard(d)
+            return
+        with self._cond:
+            self._in_use.discard(d)
+            self._idle.append(d)
+            self._cond.notify()
+
+    def close(self) -> None:
+        """Quit every idle session; sessions still leased are quit on release."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for d in idle:
+            self._quit(d)
+        print(f"[driver_pool] closed: {self.stats}")
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _take_or_reserve(self, deadline: float):
+        """Pop an idle session, or reserve a slot (returns None) to create one."""
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("DriverPool is closed")
+                if self._idle:
+                    d = self._idle.pop()
+                    self._in_use.add(d)
+                    return d
+                if len(self._in_use) + self._creating < self._size:
+                    self._creating += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No pooled session free within the timeout (size={self._size})")
+                self._cond.wait(remaining)
+
+    def _create(self):
+        start = time.monotonic()
+        try:
+            d = self._factory()
+        except BaseException:
+            with self._cond:
+                self._creating -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._creating -= 1
+            self._in_use.add(d)
+        self.stats["created"] += 1
+        self.stats["create_s"] += time.monotonic() - start
+        return d
+
+    def _discard(self, d) -> None:
+        with self._cond:
+            self._in_use.discard(d)
+            self._cond.notify()
+        if d is not None:
+            self.stats["discarded"] += 1
+            self._quit(d)
+
+    @staticmethod
+    def _quit(d) -> None:
+        try:
+            d.quit()
+        except Exception:
+            pass
+
@@ -0,0 +1,119 @@
+"""
+framework/element_cache.py
+
+Per-session cache of resolved elements.
+
+Page-object actions used to find their element again on every call:
+checking for the hamburger and then tapping it, or typing into a field
+and then reading it back, each cost a fresh find_element (plus the
+displayed/enabled checks).  BasePage now remembers every element it
+resolved, keyed by session and locator, and hands the same element id
+back while the screen cannot have changed.
+
+What counts as "the screen may have changed" is decided where every
+command passes anyway: InstrumentedConnection reports each command to
+observe(), and any click, Back, gesture, script or app start/stop clears
+the session's entries.  Typing, setting values, reading attributes and
+page_source keep them.
+
+Cached elements are CachedElement instances.  When the device still
+reports one as stale (the UI changed on its own), the locator is
+resolved again and the command retried once, so callers never see the
+StaleElementReferenceException.
+"""
+
+import threading
+
+from appium.webdriver.webelement import WebElement
+from selenium.common.exceptions import StaleElementReferenceException
+
+# Commands after which previously found elements may be gone or moved
+SCREEN_CHANGING = {
+    "quit",
+    "clickElement", "goBack", "actions", "touchAction",
+    "w3cExecuteScript", "w3cExecuteScriptAsync",
+    "activateApp", "terminateApp", "pressKeyCode", "longPressKeyCode",
+}
+# Scripts (mobile: extensions) that leave the screen's elements in place
+SCREEN_KEEPING_SCRIPTS = {
+    "mobile: isKeyboardShown", "mobile: getCurrentActivity", "mobile: getCurrentPackage",
+    "mobile: queryAppState", "mobile: getDeviceTime", "mobile: batteryInfo",
+    "mobile: replaceElementValue",
+}
+
+
+class CachedElement(WebElement):
+    """A WebElement that re-resolves its locator once when found stale."""
+
+    # Set once BasePage.find() confirmed the element displayed and enabled
+    clickable = False
+
+    def __init__(self, element, resolve):
+        super().__init__(element.parent, element.id)
+        self._resolve = resolve
+
+    def _execute(self, command, params=None):
+        try:
+            return super()._execute(command, dict(params or {}))
+        except StaleElementReferenceException:
+            self._id = self._resolve().id
+            return super()._execute(command, dict(params or {}))
+
+
+class ElementCache:
+    """Elements found per session, dropped whenever the screen may change."""
+
+    def __init__(self):
+        self._sessions = {}     # session id → {locator: CachedElement}
+        self._lock = threading.Lock()
+
+    def get(self, driver, locator):
+        """The cached element for *locator* on *driver*'s session, or None."""
+        with self._lock:
+            return self._sessions.get(driver.session_id, {}).get(locator)
+
+    def put(self, driver, locator, element, resolve):
+        """
+        Remember *element* as the match of *locator* and return it wrapped;
+        *resolve* finds the locator again should the element turn stale.
+
+        Sessions whose commands are not observed (no InstrumentedConnection)
+        cannot be invalidated, so their elements are returned unwrapped and
+        never cached.
+        """
+        with self._lock:
+            elements = self._sessions.get(driver.session_id)
+            if elements is None:
+                return element
+            if not isinstance(element, CachedElement):
+                element = CachedElement(element, resolve)
+            elements[locator] = element
+        return element
+
+    def forget(self, driver) -> None:
+        """Drop the elements cached for *driver*'s session (it stays tracked)."""
+        with self._lock:
+            if driver.session_id in self._sessions:
+                self._sessions[driver.session_id] = {}
+
+    def observe(self, command: str, params) -> None:
+        """
+        Called for every command about to be sent: starts tracking the
+        session, and forgets its elements if the command can change the screen.
+        """
+        session_id = params.get("sessionId") if isinstance(params, dict) else None
+        if session_id is None:
+            return
+        if params.get("script") in SCREEN_KEEPING_SCRIPTS:
+            command = "screenKeepingScript"
+        with self._lock:
+            if command == "quit":
+                self._sessions.pop(session_id, None)
+            elif command in SCREEN_CHANGING:
+                self._sessions[session_id] = {}
+            else:
+                self._sessions.setdefault(session_id, {})
+
+
+# The cache BasePage consults; fed by InstrumentedConnection.
+ELEMENT_CACHE = ElementCache()
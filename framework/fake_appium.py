@@ -0,0 +1,754 @@
+"""
+framework/fake_appium.py
+
+FakeAppiumServer — a local stand-in for the Appium endpoint.
+
+Speaks enough of the W3C WebDriver / Appium HTTP protocol for the page
+objects and fixtures in this repo, and serves the stored Appium Inspector
+dumps in pages/xml/ as the app's screens:
+
+    home       home.xml              (tasks saved so far are listed here)
+    add_task   addTask.xml           (typed text is reflected in the fields)
+    sidebar    hamburger_sidebar.xml
+    onboarding a synthetic first-run screen (--onboarding)
+
+Taps on the FAB, hamburger, Save, "Close navigation menu" and Back move
+between screens the way the real app does.  Every command can be delayed
+by a fixed *latency*, and new screens only become visible *transition_delay*
+seconds after the tap, so waits behave realistically.  Responses of 1KB
+or more are gzip'd when the client sends Accept-Encoding: gzip.
+
+One server models one device: app data (saved tasks) survives sessions.
+Tasks live in an in-memory SQLite "tasks" table, which `mobile: shell`
+sqlite3 commands (framework/seeding.py) can write directly.
+
+Run standalone:
+    python -m framework.fake_appium --port 4723 --latency 0.05
+or let the suite start one per worker:
+    pytest --fake-appium
+"""
+
+import argparse
+import copy
+import gzip
+import json
+import re
+import shlex
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+import xml.etree.ElementTree as ET
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from appium.webdriver.common.appiumby import AppiumBy
+
+from framework.locators import HierarchySnapshot, LocatorError
+
+XML_DIR = Path(__file__).resolve().parent.parent / "pages" / "xml"
+
+APP_PACKAGE = "org.tasks"
+MAIN_ACTIVITY = "com.todoroo.astrid.activity.MainActivity"
+LAUNCHER_ACTIVITY = "com.android.launcher3.Launcher"
+# Android version reported to new sessions (the dumps come from an API 33 emulator)
+PLATFORM_VERSION = "13"
+W3C_ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+# Responses at least this large are gzip'd for clients that accept it
+GZIP_MIN_BYTES = 1024
+
+SCREEN_DUMPS = {
+    "home": "home.xml",
+    "add_task": "addTask.xml",
+    "sidebar": "hamburger_sidebar.xml",
+}
+
+_ONBOARDING_XML = """<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>
+<hierarchy index="0" class="hierarchy" rotation="0" width="1080" height="2400">
+  <android.widget.FrameLayout index="0" package="org.tasks" class="android.widget.FrameLayout" text="" clickable="false" enabled="true" bounds="[0,0][1080,2400]" displayed="true">
+    <android.widget.TextView index="0" package="org.tasks" class="android.widget.TextView" text="Welcome to Tasks.org" clickable="false" enabled="true" bounds="[100,600][980,720]" displayed="true" />
+    <android.widget.Button index="1" package="org.tasks" class="android.widget.Button" text="Sign in" clickable="true" enabled="true" bounds="[100,1800][980,1950]" displayed="true" />
+    <android.widget.Button index="2" package="org.tasks" class="android.widget.Button" text="Continue without sync" clickable="true" enabled="true" bounds="[100,2000][980,2150]" displayed="true" />
+  </android.widget.FrameLayout>
+</hierarchy>
+"""
+
+_LAUNCHER_XML = """<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>
+<hierarchy index="0" class="hierarchy" rotation="0" width="1080" height="2400">
+  <android.widget.FrameLayout index="0" package="com.android.launcher3" class="android.widget.FrameLayout" text="" clickable="false" enabled="true" bounds="[0,0][1080,2400]" displayed="true" />
+</hierarchy>
+"""
+
+# (screen, locator of the tapped area) → (next screen, side effect)
+TRANSITIONS = [
+    ("onboarding", (AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().text("Continue without sync")'),
+     "home", "finish_onboarding"),
+    ("home", (AppiumBy.ACCESSIBILITY_ID, "Create new task"), "add_task", "new_task"),
+    ("home", (AppiumBy.ANDROID_UIAUTOMATOR,
+              'new UiSelector().className("android.widget.ImageButton").instance(0)'), "sidebar", None),
+    ("sidebar", (AppiumBy.ACCESSIBILITY_ID, "Close navigation menu"), "home", None),
+    ("sidebar", (AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().text("My Tasks")'), "home", None),
+    ("add_task", (AppiumBy.ACCESSIBILITY_ID, "Save"), "home", "save_task"),
+]
+
+# The columns of Tasks.org's tasks table that the framework reads or writes
+_TASKS_TABLE = """
+CREATE TABLE tasks (
+    _id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT, notes TEXT, importance INTEGER DEFAULT 3,
+    dueDate INTEGER DEFAULT 0, hideUntil INTEGER DEFAULT 0,
+    created INTEGER DEFAULT 0, modified INTEGER DEFAULT 0,
+    completed INTEGER DEFAULT 0, deleted INTEGER DEFAULT 0,
+    estimatedSeconds INTEGER DEFAULT 0, elapsedSeconds INTEGER DEFAULT 0,
+    timerStart INTEGER DEFAULT 0, notificationFlags INTEGER DEFAULT 0,
+    lastNotified INTEGER DEFAULT 0, collapsed INTEGER DEFAULT 0,
+    parent INTEGER DEFAULT 0, remoteId TEXT
+)
+"""
+APP_UID = "10123"
+
+# Where the hardware Back button leads from each screen
+BACK = {"add_task": "home", "sidebar": "home", "home": "launcher", "onboarding": "launcher"}
+
+
+class WebDriverError(Exception):
+    """A W3C error response: HTTP status, error code and message."""
+
+    def __init__(self, status: int, error: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.error = error
+        self.message = message
+
+
+def _no_such_element(locator):
+    return WebDriverError(404, "no such element",
+                          f"An element could not be located using {locator[0]}={locator[1]!r}")
+
+
+class FakeDevice:
+    """App/UI state of one emulated device, shared by all its sessions."""
+
+    def __init__(self, onboarding: bool = False, transition_delay: float = 0.0,
+                 launch_delay: float = 0.0):
+        self.lock = threading.RLock()
+        self.transition_delay = transition_delay
+        self.launch_delay = launch_delay
+        self.onboarding_pending = onboarding
+        self.templates = {
+            name: ET.parse(XML_DIR / dump).getroot() for name, dump in SCREEN_DUMPS.items()
+        }
+        self.templates["onboarding"] = ET.fromstring(_ONBOARDING_XML.encode())
+        self.templates["launcher"] = ET.fromstring(_LAUNCHER_XML.encode())
+        self.db = sqlite3.connect(":memory:", check_same_thread=False)
+        self.db.execute(_TASKS_TABLE)
+        self.fields = {}
+        self.keyboard_shown = False
+        self.screen = "launcher"
+        self.pending = None         # (screen, visible_at)
+        self.generation = 0
+        self._snapshot = None
+
+    # ------------------------------------------------------------------
+    # Screen state
+    # ------------------------------------------------------------------
+
+    def current_screen(self) -> str:
+        if self.pending and time.monotonic() >= self.pending[1]:
+            self._show(self.pending[0])
+        return self.screen
+
+    def navigate(self, screen: str, delay: float = None) -> None:
+        """Switch to *screen*, visible after *delay* (default transition_delay)."""
+        delay = self.transition_delay if delay is None else delay
+        self.keyboard_shown = False
+        if delay > 0:
+            # The old screen stays on display until the transition finishes.
+            self.pending = (screen, time.monotonic() + delay)
+        else:
+            self._show(screen)
+
+    def _show(self, screen: str) -> None:
+        self.pending = None
+        self.screen = screen
+        self.generation += 1
+        self._snapshot = None
+
+    @property
+    def tasks(self) -> list:
+        """Titles of the active tasks, in list order."""
+        return [title for (title,) in self.db.execute(
+            "SELECT title FROM tasks WHERE deleted = 0 AND completed = 0 ORDER BY _id")]
+
+    def add_task(self, title: str, notes: str = "") -> None:
+        now = int(time.time() * 1000)
+        self.db.execute("INSERT INTO tasks (title, notes, created, modified) VALUES (?, ?, ?, ?)",
+                        (title, notes, now, now))
+
+    def touch(self) -> None:
+        """Invalidate the rendered hierarchy after a state change on screen."""
+        self._snapshot = None
+
+    def activity(self) -> str:
+        return LAUNCHER_ACTIVITY if self.current_screen() == "launcher" else MAIN_ACTIVITY
+
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+
+    def page_source(self) -> str:
+        return self.snapshot()[0]
+
+    def snapshot(self):
+        """(xml, HierarchySnapshot) of what is on screen right now."""
+        self.current_screen()
+        if self._snapshot is None:
+            root = copy.deepcopy(self.templates[self.screen])
+            if self.screen == "add_task":
+                self._render_fields(root)
+            elif self.screen == "home":
+                self._render_tasks(root)
+            xml = "<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>\n" + \
+                ET.tostring(root, encoding="unicode")
+            self._snapshot = (xml, HierarchySnapshot.from_source(xml))
+        return self._snapshot
+
+    def _render_fields(self, root) -> None:
+        for elem in root.iter("android.widget.EditText"):
+            value = self.fields.get(elem.get("hint"))
+            if value:
+                elem.set("text", value)
+                elem.set("showing-hint", "false")
+
+    def _render_tasks(self, root) -> None:
+        tasks = self.tasks
+        if not tasks:
+            return
+        for container in root.iter():
+            if container.get("resource-id") == "org.tasks:id/body_empty":
+                break
+        else:
+            return
+        for child in list(container):
+            container.remove(child)
+        container.set("resource-id", "org.tasks:id/recycler_view")
+        bottom = int(re.findall(r"\d+", container.get("bounds", "[0,0][0,2400]"))[3])
+        # Like a RecyclerView, only the rows that fit on screen exist.
+        for i, title in enumerate(tasks):
+            top = 210 + i * 150
+            if top >= bottom:
+                break
+            ET.SubElement(container, "android.widget.TextView", {
+                "index": str(i), "package": APP_PACKAGE, "class": "android.widget.TextView",
+                "text": title, "resource-id": "org.tasks:id/title", "clickable": "true",
+                "enabled": "true", "displayed": "true", "bounds": f"[42,{top}][1038,{top + 150}]",
+            })
+
+    # ------------------------------------------------------------------
+    # Interaction
+    # ------------------------------------------------------------------
+
+    def launch(self) -> None:
+        if self.current_screen() != "launcher":
+            return
+        start = "onboarding" if self.onboarding_pending else "home"
+        self.navigate(start, self.launch_delay)
+
+    def terminate(self) -> None:
+        self.fields = {}
+        self.navigate("launcher", 0)
+
+    def back(self) -> None:
+        screen = self.current_screen()
+        if self.keyboard_shown:
+            self.keyboard_shown = False
+            return
+        self.navigate(BACK.get(screen, screen))
+
+    def tap(self, x: int, y: int) -> None:
+        """Tap screen coordinates, following any transition the tap triggers."""
+        screen = self.current_screen()
+        _, snap = self.snapshot()
+        for source, locator, target, effect in TRANSITIONS:
+            if source != screen:
+                continue
+            for node in snap.find_all(locator):
+                b = node.bounds
+                if b and b[0] <= x < b[2] and b[1] <= y < b[3]:
+                    self._apply(effect)
+                    self.navigate(target)
+                    return
+        # A tap on a text field focuses it and brings up the keyboard.
+        for node in snap.find_all((AppiumBy.CLASS_NAME, "android.widget.EditText")):
+            b = node.bounds
+            if b and b[0] <= x < b[2] and b[1] <= y < b[3]:
+                self.keyboard_shown = True
+
+    def _apply(self, effect) -> None:
+        if effect == "new_task":
+            self.fields = {}
+        elif effect == "save_task":
+            title = self.fields.get("Task name")
+            if title:
+                self.add_task(title, self.fields.get("Description", ""))
+            self.fields = {}
+        elif effect == "finish_onboarding":
+            self.onboarding_pending = False
+
+    def set_text(self, node, text: str, replace: bool = True, keyboard: bool = True) -> None:
+        """Set a field's text; typing (*keyboard*) brings up the soft keyboard."""
+        hint = node.get("hint")
+        if node.get("class") != "android.widget.EditText" or not hint:
+            raise WebDriverError(400, "invalid element state", "Element is not editable")
+        self.fields[hint] = text if replace else self.fields.get(hint, "") + text
+        self.keyboard_shown = self.keyboard_shown or keyboard
+        self.touch()
+
+    def shell(self, command: str) -> str:
+        """Run the subset of `adb shell` the framework uses (see framework/seeding.py)."""
+        argv = shlex.split(command)
+        if argv[:2] == ["su", "0"]:
+            argv = argv[2:]
+        if argv[:1] == ["sqlite3"] and len(argv) == 3:
+            try:
+                rows = self.db.executescript(argv[2]) if ";" in argv[2] else self.db.execute(argv[2])
+                output = "\n".join("|".join(str(v) for v in row) for row in rows.fetchall())
+            except sqlite3.Error as exc:
+                raise WebDriverError(500, "unknown error", f"Error: {exc}") from None
+            self.touch()
+            return output
+        if argv[:2] == ["am", "force-stop"]:
+            if argv[2:] == [APP_PACKAGE]:
+                self.terminate()
+            return ""
+        if argv[:1] == ["stat"]:
+            return f"{APP_UID}:{APP_UID}\n"
+        if argv[:1] in (["chown"], ["restorecon"]):
+            return ""
+        raise WebDriverError(500, "unknown error", f"The fake device cannot run {command!r}")
+
+
+class _Session:
+    def __init__(self, capabilities):
+        self.id = uuid.uuid4().hex
+        self.capabilities = capabilities
+        self.implicit_wait = 0.0
+
+
+class FakeAppiumServer:
+    """
+    Threaded HTTP server implementing the WebDriver endpoints the suite uses.
+
+    Typical flow:
+        with FakeAppiumServer(port=0, latency=0.02) as server:
+            driver = webdriver.Remote(server.url, options=get_options())
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 4723, latency: float = 0.0,
+                 transition_delay: float = 0.0, launch_delay: float = 0.0,
+                 onboarding: bool = False):
+        self.latency = latency
+        self.device = FakeDevice(onboarding, transition_delay, launch_delay)
+        self.sessions = {}
+        self.request_count = 0
+        self.bytes_sent = 0         # response bodies as sent (after compression)
+        self.connections = 0        # TCP connections accepted
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeAppiumServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ------------------------------------------------------------------
+    # Command handling
+    # ------------------------------------------------------------------
+
+    def dispatch(self, method: str, path: str, body: dict):
+        """Route one request; returns the JSON "value" or raises WebDriverError."""
+        self.request_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if path == "/status" and method == "GET":
+            return {"ready": True, "message": "fake appium ready", "build": {"version": "fake"}}
+        if path == "/session" and method == "POST":
+            return self._new_session(body)
+        match = re.match(r"^/session/([^/]+)(/.*)?$", path)
+        if not match:
+            raise WebDriverError(404, "unknown command", f"Unknown path {path}")
+        session = self.sessions.get(match.group(1))
+        if session is None:
+            raise WebDriverError(404, "invalid session id", "No such session")
+        rest = match.group(2) or ""
+        for pattern, verb, handler in _ROUTES:
+            found = re.match(pattern + "$", rest)
+            if found and verb == method:
+                with self.device.lock:
+                    return handler(self, session, body, *found.groups())
+        raise WebDriverError(404, "unknown command", f"{method} {rest} is not implemented by the fake server")
+
+    def _new_session(self, body: dict):
+        caps = body.get("capabilities", {}).get("alwaysMatch", {})
+        session = _Session(caps)
+        self.sessions[session.id] = session
+        with self.device.lock:
+            # appium:forceAppLaunch restarts the app on the home screen.
+            if caps.get("appium:forceAppLaunch"):
+                self.device.terminate()
+            self.device.launch()
+        capabilities = dict(caps, platformName="Android", platformVersion=PLATFORM_VERSION,
+                            deviceName="fake", udid=caps.get("appium:udid", "fake"))
+        return {"sessionId": session.id, "capabilities": capabilities}
+
+    # -- element resolution -------------------------------------------
+
+    def _find(self, session, locator, many: bool, root_node=None):
+        deadline = time.monotonic() + session.implicit_wait
+        while True:
+            _, snap = self.device.snapshot()
+            try:
+                nodes = snap.find_all(locator)
+            except LocatorError as exc:
+                raise WebDriverError(400, "invalid selector", str(exc))
+            if root_node is not None:
+                nodes = [n for n in nodes if _is_descendant(n, root_node)]
+            if nodes or time.monotonic() >= deadline:
+                break
+            # Release the device while the server-side implicit wait polls.
+            self.device.lock.release()
+            try:
+                time.sleep(0.05)
+            finally:
+                self.device.lock.acquire()
+        if not nodes and not many:
+            raise _no_such_element(locator)
+        refs = [self._element_ref(snap, node) for node in nodes]
+        return refs if many else refs[0]
+
+    def _element_ref(self, snap, node):
+        element_id = f"{self.device.generation}.{snap.nodes.index(node)}"
+        return {W3C_ELEMENT_KEY: element_id, "ELEMENT": element_id}
+
+    def _node(self, element_id: str):
+        generation, _, index = element_id.partition(".")
+        _, snap = self.device.snapshot()
+        if not generation.isdigit() or int(generation) != self.device.generation:
+            raise WebDriverError(404, "stale element reference",
+                                 f"Element {element_id} is no longer attached to the screen")
+        return snap.nodes[int(index)]
+
+
+def _is_descendant(node, ancestor) -> bool:
+    node = node.parent
+    while node is not None:
+        if node is ancestor:
+            return True
+        node = node.parent
+    return False
+
+
+def _locator(body):
+    return (body.get("using"), body.get("value"))
+
+
+# ----------------------------------------------------------------------
+# Route handlers: (server, session, body, *path groups) → value
+# ----------------------------------------------------------------------
+
+def _delete_session(server, session, body):
+    server.sessions.pop(session.id, None)
+
+
+def _set_timeouts(server, session, body):
+    if body.get("implicit") is not None:
+        session.implicit_wait = body["implicit"] / 1000.0
+
+
+def _get_timeouts(server, session, body):
+    return {"implicit": int(session.implicit_wait * 1000), "pageLoad": 300000, "script": 30000}
+
+
+def _find_element(server, session, body):
+    return server._find(session, _locator(body), many=False)
+
+
+def _find_elements(server, session, body):
+    return server._find(session, _locator(body), many=True)
+
+
+def _find_child(server, session, body, element_id):
+    return server._find(session, _locator(body), many=False, root_node=server._node(element_id))
+
+
+def _find_children(server, session, body, element_id):
+    return server._find(session, _locator(body), many=True, root_node=server._node(element_id))
+
+
+def _click(server, session, body, element_id):
+    center = server._node(element_id).center
+    server.device.tap(*center)
+
+
+def _clear(server, session, body, element_id):
+    server.device.set_text(server._node(element_id), "")
+
+
+def _send_keys(server, session, body, element_id):
+    text = body.get("text")
+    if text is None:
+        text = "".join(body.get("value", []))
+    server.device.set_text(server._node(element_id), text, replace=False)
+
+
+def _displayed(server, session, body, element_id):
+    return server._node(element_id).get("displayed", "true") == "true"
+
+
+def _enabled(server, session, body, element_id):
+    return server._node(element_id).get("enabled", "true") == "true"
+
+
+def _selected(server, session, body, element_id):
+    return server._node(element_id).get("selected") == "true"
+
+
+def _attribute(server, session, body, element_id, name):
+    value = server._node(element_id).get(name, None)
+    return value
+
+
+def _text(server, session, body, element_id):
+    return server._node(element_id).text
+
+
+def _name(server, session, body, element_id):
+    return server._node(element_id).get("class")
+
+
+def _rect(server, session, body, element_id):
+    left, top, right, bottom = server._node(element_id).bounds
+    return {"x": left, "y": top, "width": right - left, "height": bottom - top}
+
+
+def _source(server, session, body):
+    return server.device.page_source()
+
+
+def _back(server, session, body):
+    server.device.back()
+
+
+def _actions(server, session, body):
+    # Only single-pointer taps (pointerMove + pointerDown/Up) are modelled.
+    for source in body.get("actions", []):
+        if source.get("type") != "pointer":
+            continue
+        x = y = None
+        pressed = False
+        for action in source.get("actions", []):
+            if action.get("type") == "pointerMove":
+                x, y = action.get("x"), action.get("y")
+            elif action.get("type") == "pointerDown":
+                pressed = True
+            elif action.get("type") == "pointerUp" and pressed and x is not None:
+                server.device.tap(int(x), int(y))
+                pressed = False
+
+
+def _release_actions(server, session, body):
+    return None
+
+
+def _terminate_app(server, session, body):
+    running = server.device.current_screen() != "launcher"
+    server.device.terminate()
+    return running
+
+
+def _activate_app(server, session, body):
+    server.device.launch()
+
+
+def _current_activity(server, session, body):
+    return server.device.activity()
+
+
+def _current_package(server, session, body):
+    return "com.android.launcher3" if server.device.current_screen() == "launcher" else APP_PACKAGE
+
+
+def _is_keyboard_shown(server, session, body):
+    return server.device.keyboard_shown
+
+
+def _hide_keyboard(server, session, body):
+    if not server.device.keyboard_shown:
+        raise WebDriverError(500, "unknown error", "Soft keyboard not present, cannot hide keyboard")
+    server.device.keyboard_shown = False
+
+
+def _replace_value(server, session, body):
+    # UiAutomator2 sets the text through accessibility: no focus, no keyboard.
+    node = server._node(body.get("elementId", ""))
+    server.device.set_text(node, body.get("text", ""), keyboard=False)
+
+
+def _shell(server, session, body):
+    command = " ".join([body.get("command", "")] + [str(a) for a in body.get("args", [])])
+    return server.device.shell(command)
+
+
+def _execute_sync(server, session, body):
+    script = body.get("script", "")
+    args = body.get("args") or [{}]
+    handler = _MOBILE_COMMANDS.get(script)
+    if handler is None:
+        raise WebDriverError(404, "unknown method", f"Script {script!r} is not supported by the fake server")
+    return handler(server, session, args[0] if args else {})
+
+
+_MOBILE_COMMANDS = {
+    "mobile: terminateApp": _terminate_app,
+    "mobile: activateApp": _activate_app,
+    "mobile: getCurrentActivity": _current_activity,
+    "mobile: getCurrentPackage": _current_package,
+    "mobile: isKeyboardShown": _is_keyboard_shown,
+    "mobile: hideKeyboard": _hide_keyboard,
+    "mobile: shell": _shell,
+    "mobile: replaceElementValue": _replace_value,
+}
+
+
+_ROUTES = [
+    (r"", "DELETE", _delete_session),
+    (r"/timeouts", "POST", _set_timeouts),
+    (r"/timeouts", "GET", _get_timeouts),
+    (r"/element", "POST", _find_element),
+    (r"/elements", "POST", _find_elements),
+    (r"/element/([^/]+)/element", "POST", _find_child),
+    (r"/element/([^/]+)/elements", "POST", _find_children),
+    (r"/element/([^/]+)/click", "POST", _click),
+    (r"/element/([^/]+)/clear", "POST", _clear),
+    (r"/element/([^/]+)/value", "POST", _send_keys),
+    (r"/element/([^/]+)/displayed", "GET", _displayed),
+    (r"/element/([^/]+)/enabled", "GET", _enabled),
+    (r"/element/([^/]+)/selected", "GET", _selected),
+    (r"/element/([^/]+)/attribute/([^/]+)", "GET", _attribute),
+    (r"/element/([^/]+)/text", "GET", _text),
+    (r"/element/([^/]+)/name", "GET", _name),
+    (r"/element/([^/]+)/rect", "GET", _rect),
+    (r"/source", "GET", _source),
+    (r"/back", "POST", _back),
+    (r"/actions", "POST", _actions),
+    (r"/actions", "DELETE", _release_actions),
+    (r"/execute/sync", "POST", _execute_sync),
+    (r"/appium/device/terminate_app", "POST", _terminate_app),
+    (r"/appium/device/activate_app", "POST", _activate_app),
+    (r"/appium/device/current_activity", "GET", _current_activity),
+    (r"/appium/device/current_package", "GET", _current_package),
+    (r"/appium/device/is_keyboard_shown", "GET", _is_keyboard_shown),
+    (r"/appium/device/hide_keyboard", "POST", _hide_keyboard),
+]
+
+
+def _make_handler(server: FakeAppiumServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"    # keep-alive, like the real server
+        disable_nagle_algorithm = True   # headers and body go out separately
+
+        def setup(self):
+            server.connections += 1
+            super().setup()
+
+        def _handle(self, method):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            try:
+                body = json.loads(raw) if raw.strip() else {}
+            except ValueError:
+                body = {}
+            path = self.path.split("?", 1)[0].rstrip("/") or "/"
+            if path.startswith("/wd/hub"):
+                path = path[len("/wd/hub"):] or "/"
+            try:
+                status, payload = 200, {"value": server.dispatch(method, path, body)}
+            except WebDriverError as exc:
+                status, payload = exc.status, {"value": {
+                    "error": exc.error, "message": exc.message, "stacktrace": ""}}
+            except Exception as exc:
+                # A bug in a route handler must still produce a W3C response,
+                # not a dropped connection the client retries.
+                status, payload = 500, {"value": {
+                    "error": "unknown error", "message": f"{type(exc).__name__}: {exc}",
+                    "stacktrace": traceback.format_exc()}}
+            data = json.dumps(payload).encode("utf-8")
+            gzipped = (len(data) >= GZIP_MIN_BYTES
+                       and "gzip" in self.headers.get("Accept-Encoding", ""))
+            if gzipped:
+                data = gzip.compress(data, compresslevel=6)
+            server.bytes_sent += len(data)
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            if gzipped:
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_POST(self):
+            self._handle("POST")
+
+        def do_DELETE(self):
+            self._handle("DELETE")
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4723)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Seconds added to every command.")
+    parser.add_argument("--transition-delay", type=float, default=0.0,
+                        help="Seconds before a new screen becomes visible after a tap.")
+    parser.add_argument("--launch-delay", type=float, default=0.0,
+                        help="Seconds for the app to show its first screen after launch.")
+    parser.add_argument("--onboarding", action="store_true",
+                        help="Show the first-run onboarding screen on the first launch.")
+    args = parser.parse_args(argv)
+    server = FakeAppiumServer(args.host, args.port, args.latency, args.transition_delay,
+                              args.launch_delay, args.onboarding)
+    print(f"Fake Appium server listening on {server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+framework/hierarchy.py
+
+Parsing of UiAutomator2 page-source dumps (driver.page_source or the
+Appium Inspector files under pages/xml/) into lightweight nodes, so a
+whole screen can be inspected locally from a single device round-trip.
+
+Dumps repeat the same ~25 attributes on every node, so the model is
+kept compact:
+
+* nodes use __slots__; attribute names live once per distinct attribute
+  layout (a shared _Schema), each node only holds a tuple of values
+* attribute values are interned per parse ("false", "true", class and
+  package names are shared rather than copied onto every node)
+* bounds are decoded to integers on first use and cached
+
+parse_hierarchy() streams the source through expat without building an
+ElementTree, and accepts bytes, str, a binary file or an iterable of
+byte chunks.  fingerprint() condenses a parsed screen into one hash for
+cheap "has the UI changed?" comparisons.
+"""
+
+import re
+import sys
+from xml.parsers import expat
+
+_BOUNDS_RE = re.compile(r"\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]")
+_UNSET = object()
+_CHUNK = 64 * 1024
+# What a user can see change; focus and window ids are left out on purpose
+_FINGERPRINT_ATTRS = ("text", "content-desc", "resource-id", "bounds",
+                      "checked", "selected", "enabled", "displayed")
+
+
+class _Schema:
+    """An attribute layout shared by every node with the same attribute names."""
+
+    __slots__ = ("names", "index")
+
+    def __init__(self, names: tuple):
+        self.names = names
+        self.index = {name: i for i, name in enumerate(names)}
+
+
+class Node:
+    """One element of a UI hierarchy dump."""
+
+    __slots__ = ("tag", "parent", "children", "_schema", "_values", "_bounds")
+
+    def __init__(self, tag: str, attrib: dict, parent=None):
+        self.tag = tag
+        self.parent = parent
+        self.children = []
+        self._schema = _Schema(tuple(attrib))
+        self._values = tuple(attrib.values())
+        self._bounds = _UNSET
+
+    def get(self, name: str, default: str = "") -> str:
+        """Return the raw value of attribute *name*."""
+        i = self._schema.index.get(name)
+        return default if i is None else self._values[i]
+
+    def has(self, name: str) -> bool:
+        """Return True if the node carries attribute *name* at all."""
+        return name in self._schema.index
+
+    @property
+    def attrib(self) -> dict:
+        """All attributes as a new dict (prefer get() in hot paths)."""
+        return dict(zip(self._schema.names, self._values))
+
+    @property
+    def text(self) -> str:
+        return self.get("text")
+
+    @property
+    def bounds(self):
+        """(left, top, right, bottom) in screen pixels, or None."""
+        if self._bounds is _UNSET:
+            match = _BOUNDS_RE.match(self.get("bounds"))
+            self._bounds = tuple(int(v) for v in match.groups()) if match else None
+        return self._bounds
+
+    @property
+    def center(self):
+        """(x, y) centre of the node's bounds, or None."""
+        b = self.bounds
+        return ((b[0] + b[2]) // 2, (b[1] + b[3]) // 2) if b else None
+
+    def is_true(self, name: str) -> bool:
+        """Return True if boolean attribute *name* is "true"."""
+        return self.get(name) == "true"
+
+    def __repr__(self) -> str:
+        return f"<Node {self.tag} text={self.text!r}>"
+
+
+def _chunks(source):
+    if isinstance(source, str):
+        source = source.encode("utf-8")
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        view = memoryview(source)
+        for start in range(0, len(view), _CHUNK):
+            yield view[start:start + _CHUNK]
+    elif hasattr(source, "read"):
+        yield from iter(lambda: source.read(_CHUNK), b"")
+    else:
+        yield from source
+
+
+def parse_hierarchy(source) -> list:
+    """
+    Parse a page source and return every node in document order.
+
+    *source* is a str, bytes, a file opened in binary mode or an iterable
+    of byte chunks.  The synthetic <hierarchy> root is included as the
+    first node.
+    """
+    nodes = []
+    stack = []
+    schemas = {}
+    values = {}
+    intern_value = values.setdefault
+    new_node = Node.__new__
+
+    def start(tag, attrs):
+        # ordered_attributes: attrs is [name0, value0, name1, value1, ...]
+        names = tuple(attrs[0::2])
+        schema = schemas.get(names)
+        if schema is None:
+            schema = schemas[names] = _Schema(tuple(sys.intern(n) for n in names))
+        node = new_node(Node)
+        node.tag = intern_value(tag, tag)
+        node.children = []
+        node._schema = schema
+        vals = attrs[1::2]
+        node._values = tuple(map(intern_value, vals, vals))
+        node._bounds = _UNSET
+        if stack:
+            node.parent = parent = stack[-1]
+            parent.children.append(node)
+        else:
+            node.parent = None
+        nodes.append(node)
+        stack.append(node)
+
+    def end(tag):
+        stack.pop()
+
+    parser = expat.ParserCreate()
+    parser.ordered_attributes = True
+    parser.buffer_text = True
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    for chunk in _chunks(source):
+        parser.Parse(bytes(chunk), False)
+    parser.Parse(b"", True)
+    return nodes
+
+
+def fingerprint(nodes) -> int:
+    """Hash of the visible state of *nodes* (as returned by parse_hierarchy)."""
+    return hash(tuple(
+        (node.tag,) + tuple(node.get(name) for name in _FINGERPRINT_ATTRS)
+        for node in nodes
+    ))
@@ -0,0 +1,102 @@
+"""
+framework/http_tuning.py
+
+HTTP settings of the framework's Appium connections.
+
+Every finder, tap and page_source fetch is one HTTP request to Appium.
+Left to selenium's defaults, a session's connection pool keeps a single
+idle socket (concurrent commands open throw-away connections), requests
+never time out (a hung Appium server hangs the run) and responses travel
+uncompressed (the add-task hierarchy is ~65KB).  TunedConnection, the base
+of InstrumentedConnection, applies the settings in HTTP instead:
+
+    pool_size        keep-alive sockets kept per Appium server and session
+    connect_timeout  seconds to open a connection
+    read_timeout     seconds to wait for a response; above the longest
+                     wait the framework itself performs (READY_TIMEOUT),
+                     so only a hung server trips it
+    session_timeout  read timeout of newSession, which may install the
+                     UiAutomator2 server on the device first
+    gzip             ask for gzip-compressed responses; urllib3 inflates
+                     them transparently, uncompressed answers still work
+
+conftest.py sets them from --http-pool-size, --http-timeout and --no-gzip.
+framework/benchmark.py measures them (http.* metrics).
+"""
+
+import urllib3
+from appium.webdriver.appium_connection import AppiumConnection
+
+POOL_SIZE = 4
+CONNECT_TIMEOUT = 10.0
+READ_TIMEOUT = 90.0
+SESSION_TIMEOUT = 300.0
+
+
+class HttpSettings:
+    """Connection settings shared by every TunedConnection opened afterwards."""
+
+    def __init__(self, pool_size: int = POOL_SIZE, connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT, session_timeout: float = SESSION_TIMEOUT,
+                 gzip: bool = True):
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.session_timeout = session_timeout
+        self.gzip = gzip
+
+    def pool_manager_args(self) -> dict:
+        """Keyword arguments for the connection's urllib3.PoolManager."""
+        return {
+            "maxsize": self.pool_size,
+            "block": False,
+            "timeout": urllib3.Timeout(connect=self.connect_timeout, read=self.read_timeout),
+        }
+
+
+# The settings new connections use; configured by conftest.py.
+HTTP = HttpSettings()
+
+
+class _SessionTimeout:
+    """PoolManager proxy giving newSession requests HTTP.session_timeout."""
+
+    def __init__(self, manager):
+        self._manager = manager
+
+    def request(self, method, url, *args, **kwargs):
+        if method == "POST" and url.rstrip("/").endswith("/session"):
+            kwargs.setdefault("timeout", urllib3.Timeout(
+                connect=HTTP.connect_timeout, read=HTTP.session_timeout))
+        return self._manager.request(method, url, *args, **kwargs)
+
+    def __enter__(self):
+        self._manager.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._manager.__exit__(*exc)
+
+    def __getattr__(self, name):
+        return getattr(self._manager, name)
+
+
+class TunedConnection(AppiumConnection):
+    """AppiumConnection with the pool size, timeouts and compression of HTTP."""
+
+    def __init__(self, remote_server_addr: str, keep_alive: bool = True,
+                 ignore_proxy: bool = False, init_args_for_pool_manager=None):
+        args = HTTP.pool_manager_args()
+        args.update(init_args_for_pool_manager or {})
+        super().__init__(remote_server_addr, keep_alive=keep_alive, ignore_proxy=ignore_proxy,
+                         init_args_for_pool_manager=args)
+
+    @classmethod
+    def get_remote_connection_headers(cls, parsed_url, keep_alive: bool = True) -> dict:
+        headers = super().get_remote_connection_headers(parsed_url, keep_alive=keep_alive)
+        if HTTP.gzip:
+            headers["Accept-Encoding"] = "gzip"
+        return headers
+
+    def _get_connection_manager(self):
+        return _SessionTimeout(super()._get_connection_manager())
@@ -0,0 +1,534 @@
+"""
+framework/impact.py
+
+Impact-based test selection — run only the tests a change can affect.
+
+    pytest tests/ --impacted                       # changes since HEAD (uncommitted)
+    pytest tests/ --impacted --impact-base=origin/main
+    python -m framework.impact --base=origin/main  # what would run, and why
+
+A dependency map is built from each test to the page-object members it
+uses (classes, methods and locator constants in pages/*.py):
+
+* statically, by walking the AST of the test modules and page objects:
+  Page.ATTR, Page(driver).method() and page.method() on a variable
+  assigned a page object, and self.ATTR inside page methods, followed
+  transitively through the methods they call (inherited members resolve
+  to the class defining them; self.ATTR also counts overrides in
+  subclasses);
+* from a recorded run, when reports/commands.json exists: the
+  page-object methods each test's WebDriver commands came from
+  (framework/command_timing.py), which also catches indirect use.
+
+Tests that drive the app (they use the driver fixture, directly or
+through another fixture) also run through the page members conftest.py
+references, and through the navigation (framework/navigation.py) between
+the home screen and their start_screen: the markers of the screens on
+that route and the page members of its edges.  Unit tests have neither.
+
+The changed lines of `git diff <base>` (plus untracked files) are mapped
+to the members they fall in, on both sides of the diff, so edits and
+removals count.  A test is selected when one of its members changed or
+its own file did.  Changes anywhere else that tests run through
+(conftest.py, framework/, pytest.ini, requirements, the XML dumps, or a
+page module's imports) select every test; documentation, CI files,
+demo/ and the offline tools are ignored.
+
+conftest.py imports this module before registering it as a plugin, so it
+opts out of assertion rewriting: PYTEST_DONT_REWRITE
+"""
+
+import argparse
+import ast
+import fnmatch
+import json
+import re
+import subprocess
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+import pytest
+
+from framework.navigation import Navigator
+
+ROOT = Path(__file__).resolve().parent.parent
+PAGES_DIR = "pages"
+TESTS_DIR = "tests"
+RECORDED_MAP = Path("reports") / "commands.json"
+# Fixtures every test that drives the app runs through
+FIXTURE_SOURCE = "conftest.py"
+APP_FIXTURE = "driver"
+# Screens and transitions between them (start_screen markers)
+NAVIGATION = "framework/navigation.py"
+# Changes here cannot affect a test run
+IGNORED = ("*.md", ".github/*", ".gitignore", "demo/*", "reports/*", "devices.example.json",
+           "framework/benchmark.py", "framework/async_driver.py")
+
+_HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+# ----------------------------------------------------------------------
+# Page-object index
+# ----------------------------------------------------------------------
+
+class PageIndex:
+    """Classes of pages/*.py, their members' line ranges and what each member uses."""
+
+    def __init__(self, sources: dict):
+        self.bases = {}         # class → [base class, ...] (page classes only)
+        self.members = {}       # class → {name: (first line, last line)}
+        self.module_of = {}     # class → path
+        self.spans = {}         # class → (first line, last line) of the class statement
+        self.headers = {}       # class → last line of its "class" line and docstring
+        self.uses = {}          # (class, name) → {(class, name), ...}
+        trees = {path: ast.parse(text) for path, text in sources.items()}
+        for path, tree in trees.items():
+            for node in tree.body:
+                if isinstance(node, ast.ClassDef):
+                    self.module_of[node.name] = path
+                    self.spans[node.name] = (node.lineno, node.end_lineno)
+                    self.headers[node.name] = _header_end(node)
+                    self.bases[node.name] = [b.id for b in node.bases if isinstance(b, ast.Name)]
+                    self.members[node.name] = dict(_member_ranges(node))
+        for path, tree in trees.items():
+            for node in tree.body:
+                if isinstance(node, ast.ClassDef):
+                    for item in node.body:
+                        if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                            self.uses[(node.name, item.name)] = self.references(item, node.name)
+
+    def mro(self, cls: str) -> list:
+        order = [cls]
+        for base in self.bases.get(cls, ()):
+            order += [c for c in self.mro(base) if c not in order]
+        return order
+
+    def resolve(self, cls: str, name: str):
+        """(defining class, name) of *name* looked up on *cls*, or None."""
+        for c in self.mro(cls):
+            if name in self.members.get(c, ()):
+                return (c, name)
+        return None
+
+    def overrides(self, cls: str, name: str) -> set:
+        """Definitions of *name* in subclasses of *cls*."""
+        return {(c, name) for c in self.members
+                if c != cls and cls in self.mro(c) and name in self.members[c]}
+
+    def references(self, scope, self_class: str = None) -> set:
+        """Page members *scope* (an AST node) refers to."""
+        instances = {}      # variable → page class
+        for node in ast.walk(scope):
+            if isinstance(node, ast.Assign) and len(node.targets) == 1:
+                cls = self._class_of(node.value, instances)
+                if cls and isinstance(node.targets[0], ast.Name):
+                    instances[node.targets[0].id] = cls
+        found = set()
+        for node in ast.walk(scope):
+            if not isinstance(node, ast.Attribute):
+                continue
+            receiver = node.value
+            if isinstance(receiver, ast.Name) and receiver.id in ("self", "cls") and self_class:
+                member = self.resolve(self_class, node.attr)
+                found |= self.overrides(self_class, node.attr)
+            else:
+                cls = self._class_of(receiver, instances)
+                member = self.resolve(cls, node.attr) if cls else None
+            if member:
+                found.add(member)
+        for node in ast.walk(scope):
+            # Instantiating a page runs its __init__
+            if isinstance(node, ast.Call):
+                cls = self._class_of(node, instances)
+                member = self.resolve(cls, "__init__") if cls else None
+                if member:
+                    found.add(member)
+        return found
+
+    def _class_of(self, node, instances):
+        """The page class *node* evaluates to (Page, Page(...), or a page variable)."""
+        if isinstance(node, ast.Call):
+            node = node.func
+            if isinstance(node, ast.Name) and node.id in self.members:
+                return node.id
+            return None
+        if isinstance(node, ast.Name):
+            if node.id in self.members:
+                return node.id
+            return instances.get(node.id)
+        return None
+
+    def closure(self, members) -> set:
+        """*members* plus everything they use, transitively."""
+        seen, todo = set(), list(members)
+        while todo:
+            member = todo.pop()
+            if member not in seen:
+                seen.add(member)
+                todo.extend(self.uses.get(member, ()))
+        return seen
+
+    def members_at(self, path: str, lines) -> tuple:
+        """
+        Members of *path* whose lines intersect *lines*; the second value is
+        True when a changed line lies outside every class (imports, module
+        code), which may affect everything in the module.
+
+        A line of a class outside its members counts for the member below
+        it (a comment or blank line above a locator), or for every member
+        when it is the class statement or docstring.
+        """
+        hit, outside = set(), False
+        classes = [cls for cls in self.members if self.module_of[cls] == path]
+        for line in lines:
+            owner = next((cls for cls in classes
+                          if self.spans[cls][0] <= line <= self.spans[cls][1]), None)
+            if owner is None:
+                outside = True
+                continue
+            spans = self.members[owner]
+            inside = {(owner, name) for name, (first, last) in spans.items() if first <= line <= last}
+            below = sorted((first, name) for name, (first, _) in spans.items() if first > line)
+            if inside:
+                hit |= inside
+            elif below and line > self.headers[owner]:
+                hit.add((owner, below[0][1]))
+            else:
+                hit |= {(owner, name) for name in spans}
+        return hit, outside
+
+
+def _header_end(class_node) -> int:
+    """Last line of the class statement's header, including its docstring."""
+    body = class_node.body
+    if (body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant)
+            and isinstance(body[0].value.value, str)):
+        return body[0].end_lineno
+    # Bases may span lines
+    return max([class_node.lineno] + [n.end_lineno for n in class_node.bases + class_node.keywords])
+
+
+def _member_ranges(class_node):
+    for item in class_node.body:
+        first = min([item.lineno] + [d.lineno for d in getattr(item, "decorator_list", ())])
+        if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            yield item.name, (first, item.end_lineno)
+        elif isinstance(item, (ast.Assign, ast.AnnAssign)):
+            targets = item.targets if isinstance(item, ast.Assign) else [item.target]
+            for target in targets:
+                if isinstance(target, ast.Name):
+                    yield target.id, (first, item.end_lineno)
+
+
+# ----------------------------------------------------------------------
+# Dependency map
+# ----------------------------------------------------------------------
+
+def _sources(root: Path, directory: str, pattern: str) -> dict:
+    return {p.relative_to(root).as_posix(): p.read_text(encoding="utf-8")
+            for p in sorted((root / directory).rglob(pattern))}
+
+
+def test_functions(path: str, tree) -> list:
+    """(nodeid, AST node) of the test functions of a module."""
+    found = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith("test"):
+            found.append((f"{path}::{node.name}", node))
+        elif isinstance(node, ast.ClassDef) and node.name.startswith("Test"):
+            found += [(f"{path}::{node.name}::{item.name}", item) for item in node.body
+                      if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
+                      and item.name.startswith("test")]
+    return found
+
+
+def dependency_map(index: PageIndex, root: Path = ROOT, recorded=RECORDED_MAP) -> dict:
+    """{test nodeid: page members it can run through}, static plus recorded."""
+    fixtures = _source_tree(root, FIXTURE_SOURCE)
+    shared = index.references(fixtures) if fixtures else set()
+    app_fixtures = _app_fixtures(fixtures)
+    routes = NavigationRoutes(index, _source_tree(root, NAVIGATION))
+    deps = {}
+    for path, text in _sources(root, TESTS_DIR, "test_*.py").items():
+        tree = ast.parse(text)
+        module_level = index.references(
+            ast.Module(body=[n for n in tree.body if not isinstance(
+                n, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))], type_ignores=[]))
+        for nodeid, node in test_functions(path, tree):
+            deps[nodeid] = index.references(node) | module_level
+            args = {a.arg for a in node.args.args}
+            if args & app_fixtures:
+                # The navigator fixture can take a test to any screen
+                anywhere = "navigator" in args
+                deps[nodeid] |= shared | routes.members(routes.start_of(node), anywhere)
+    for nodeid, members in recorded_members(recorded, index).items():
+        # Only tests driving the app issue WebDriver commands
+        deps.setdefault(nodeid, shared | routes.members(routes.home)).update(members)
+    return {nodeid: index.closure(members) for nodeid, members in deps.items()}
+
+
+def _source_tree(root: Path, name: str):
+    path = root / name
+    return ast.parse(path.read_text(encoding="utf-8")) if path.exists() else None
+
+
+def _app_fixtures(tree) -> set:
+    """The driver fixture and the fixtures of *tree* (conftest.py) that depend on it."""
+    found = {APP_FIXTURE}
+    fixtures = {} if tree is None else {
+        node.name: {a.arg for a in node.args.args} for node in tree.body
+        if isinstance(node, ast.FunctionDef) and any("fixture" in ast.unparse(d)
+                                                     for d in node.decorator_list)}
+    grown = True
+    while grown:
+        grown = False
+        for name, args in fixtures.items():
+            if name not in found and args & found:
+                found.add(name)
+                grown = True
+    return found
+
+
+class NavigationRoutes:
+    """
+    The screens and edges of framework/navigation.py with the page members
+    each uses, read from its Screen(...) and Edge(...) definitions.
+    """
+
+    def __init__(self, index: PageIndex, tree):
+        self.names = {}         # module-level constant → value (HOME = "home", ...)
+        self.screens = {}       # screen → page members of its markers
+        self.edges = []         # _Hop per Edge(...)
+        if tree is None:
+            self.home = "home"
+            return
+        functions = {}
+        for node in tree.body:
+            if isinstance(node, ast.FunctionDef):
+                functions[node.name] = node
+            elif (isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant)
+                  and isinstance(node.value.value, str)):
+                self.names.update((t.id, node.value.value) for t in node.targets
+                                  if isinstance(t, ast.Name))
+        self.home = self.names.get("HOME", "home")
+        for node in ast.walk(tree):
+            if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.args):
+                continue
+            if node.func.id == "Screen":
+                self.screens[self.value(node.args[0])] = index.references(node)
+            elif node.func.id == "Edge" and len(node.args) >= 5:
+                source, target, cost, _, action = node.args[:5]
+                action = functions.get(getattr(action, "id", None))
+                self.edges.append(_Hop(self.value(source), self.value(target), self.value(cost),
+                                       index.references(action) if action else set()))
+
+    def value(self, node):
+        """A constant, or a module-level constant's value, of an argument node."""
+        if isinstance(node, ast.Constant):
+            return node.value
+        return self.names.get(getattr(node, "id", None))
+
+    def start_of(self, test) -> str:
+        """The screen a test function's start_screen marker names (home by default)."""
+        for decorator in test.decorator_list:
+            if (isinstance(decorator, ast.Call)
+                    and ast.unparse(decorator.func).endswith("mark.start_screen")):
+                screen = decorator.args[0] if decorator.args else next(
+                    (k.value for k in decorator.keywords if k.arg == "screen"), None)
+                return self.value(screen) or self.home
+        return self.home
+
+    def members(self, start: str, anywhere: bool = False) -> set:
+        """Page members of the route from home to *start* and back (every route if *anywhere*)."""
+        if anywhere:
+            hops = self.edges
+        else:
+            navigator = Navigator(None, screens=(), edges=self.edges)
+            hops = [e for e in self.edges if e.source is None]
+            for source, target in ((self.home, start), (start, self.home)):
+                try:
+                    hops += navigator.path(source, target)
+                except RuntimeError:        # NavigationError: no route
+                    pass
+        found = set(self.screens.get(self.home, ())) | set(self.screens.get(start, ()))
+        for hop in hops:
+            found |= hop.members | self.screens.get(hop.target, set())
+            found |= self.screens.get(hop.source, set())
+        return found
+
+
+_Hop = namedtuple("_Hop", "source target cost members")
+
+
+def recorded_members(path, index: PageIndex) -> dict:
+    """{test nodeid: page methods} from a reports/commands.json of an earlier run."""
+    try:
+        records = json.loads(Path(path).read_text())["records"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+    found = {}
+    for record in records:
+        method, test = record.get("page_method"), record.get("test") or ""
+        if not method or "::" not in test:
+            continue
+        parts = method.split(".")
+        member = index.resolve(parts[0], parts[1]) if len(parts) > 1 else None
+        if member:
+            found.setdefault(test.split("[")[0], set()).add(member)
+    return found
+
+
+# ----------------------------------------------------------------------
+# Changes
+# ----------------------------------------------------------------------
+
+def _git(args, root: Path) -> str:
+    proc = subprocess.run(["git", *args], cwd=root, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)}: {proc.stderr.strip()}")
+    return proc.stdout
+
+
+def changed_lines(base: str, root: Path = ROOT) -> dict:
+    """{path: (old lines, new lines)} changed since *base*, working tree included."""
+    changes = {}
+    old_path = new_path = None
+    for line in _git(["diff", "-U0", "--no-color", "--no-renames", base, "--"], root).splitlines():
+        if line.startswith("--- "):
+            old_path = line[6:] if line.startswith("--- a/") else None
+        elif line.startswith("+++ "):
+            new_path = line[6:] if line.startswith("+++ b/") else None
+            changes.setdefault(new_path or old_path, (set(), set()))
+        else:
+            match = _HUNK_RE.match(line)
+            if match:
+                old, new = changes[new_path or old_path]
+                o_start, o_len, n_start, n_len = (int(g) if g is not None else 1
+                                                  for g in match.groups())
+                # Pure insertions leave the old lines alone, pure deletions the new ones
+                old.update(range(o_start, o_start + o_len))
+                new.update(range(n_start, n_start + n_len))
+    for path in _git(["ls-files", "--others", "--exclude-standard"], root).splitlines():
+        changes[path] = (set(), {0})     # untracked: the whole file is new
+    return changes
+
+
+def analyse(base: str, root: Path = ROOT, recorded=RECORDED_MAP) -> dict:
+    """
+    What changed since *base* and which tests it affects:
+    {"all": reason or None, "changed": {member, ...}, "tests": {nodeid: reason}}.
+    """
+    changes = changed_lines(base, root)
+    index = PageIndex(_sources(root, PAGES_DIR, "*.py"))
+    old_index = None
+    changed, test_files, reasons = set(), set(), []
+    for path, (old_lines, new_lines) in sorted(changes.items()):
+        if any(fnmatch.fnmatch(path, pattern) for pattern in IGNORED):
+            continue
+        if path.startswith(f"{TESTS_DIR}/") and Path(path).name.startswith("test_"):
+            test_files.add(path)
+        elif path.startswith(f"{PAGES_DIR}/") and path.endswith(".py") and path != "pages/__init__.py":
+            hit, outside = index.members_at(path, new_lines)
+            if old_index is None:
+                old_index = PageIndex(_base_sources(base, root))
+            old_hit, old_outside = old_index.members_at(path, old_lines)
+            changed |= hit | old_hit
+            if outside or old_outside:
+                reasons.append(f"{path} (module level)")
+        else:
+            reasons.append(path)
+    if reasons:
+        return {"all": ", ".join(reasons), "changed": changed, "tests": {}}
+
+    selected = {}
+    for nodeid, members in dependency_map(index, root, recorded).items():
+        if nodeid.split("::")[0] in test_files:
+            selected[nodeid] = "test file changed"
+        elif members & changed:
+            selected[nodeid] = ", ".join(sorted(f"{c}.{n}" for c, n in members & changed))
+    return {"all": None, "changed": changed, "tests": selected}
+
+
+def _base_sources(base: str, root: Path) -> dict:
+    """pages/*.py as they were at *base*."""
+    sources = {}
+    for path in _git(["ls-tree", "-r", "--name-only", base, "--", PAGES_DIR], root).splitlines():
+        if path.endswith(".py"):
+            sources[path] = _git(["show", f"{base}:{path}"], root)
+    return sources
+
+
+# ----------------------------------------------------------------------
+# pytest plugin
+# ----------------------------------------------------------------------
+
+_SUMMARY = {}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("appium")
+    group.addoption(
+        "--impacted", action="store_true", default=False,
+        help="Run only the tests affected by the changes since --impact-base.",
+    )
+    group.addoption(
+        "--impact-base", metavar="REF", default="HEAD",
+        help="Git revision --impacted compares the working tree with (default: HEAD).",
+    )
+    group.addoption(
+        "--impact-map", metavar="PATH", default=str(RECORDED_MAP),
+        help="commands.json of an earlier run, adding recorded page-method use "
+             "to the static map (ignored when missing).",
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config, items):
+    if not config.getoption("--impacted"):
+        return
+    try:
+        result = analyse(config.getoption("--impact-base"), Path(config.rootpath),
+                         config.getoption("--impact-map"))
+    except RuntimeError as e:
+        raise pytest.UsageError(f"--impacted: {e}") from None
+    if result["all"]:
+        _SUMMARY["line"] = f"impacted: all {len(items)} tests ({result['all']} changed)"
+        return
+    keep = [i for i in items if i.nodeid.split("[")[0] in result["tests"]]
+    config.hook.pytest_deselected(items=[i for i in items if i not in keep])
+    _SUMMARY["line"] = (f"impacted: {len(keep)} of {len(items)} tests "
+                        f"({len(result['changed'])} page-object members changed)")
+    items[:] = keep
+
+
+def pytest_report_collectionfinish(config, start_path, items):
+    return _SUMMARY.get("line")
+
+
+# ----------------------------------------------------------------------
+# Command line
+# ----------------------------------------------------------------------
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--base", default="HEAD",
+                        help="Git revision to compare the working tree with.")
+    parser.add_argument("--map", default=str(RECORDED_MAP),
+                        help="commands.json of an earlier run (optional).")
+    args = parser.parse_args(argv)
+
+    result = analyse(args.base, ROOT, args.map)
+    for cls, name in sorted(result["changed"]):
+        print(f"changed: {cls}.{name}")
+    if result["all"]:
+        print(f"[impact] every test: {result['all']} changed")
+        return 0
+    for nodeid, reason in sorted(result["tests"].items()):
+        print(f"{nodeid}  ← {reason}")
+    print(f"[impact] {len(result['tests'])} tests affected")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,571 @@
+"""
+framework/locators.py
+
+Offline locator engine.
+
+Resolves the same (AppiumBy, value) tuples the page objects use against a
+parsed hierarchy dump, without a device.  Supported strategies:
+
+    AppiumBy.ACCESSIBILITY_ID   content-desc
+    AppiumBy.ID                 resource-id ("pkg:id/x" or bare "x")
+    AppiumBy.CLASS_NAME         class
+    AppiumBy.ANDROID_UIAUTOMATOR  single UiSelector chains
+    AppiumBy.XPATH              the XPath 1.0 subset used by UiAutomator2
+                                (axes / and //, name tests, [@a="v"],
+                                contains(), starts-with(), and/or/not(),
+                                positional predicates)
+
+Run as a module to validate every page-object locator against the dumps
+in pages/xml/, or to list cheaper equivalent locators for them:
+
+    python -m framework.locators
+    python -m framework.locators --advise
+"""
+
+import argparse
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+from appium.webdriver.common.appiumby import AppiumBy
+
+from framework.hierarchy import parse_hierarchy
+
+XML_DIR = Path(__file__).resolve().parent.parent / "pages" / "xml"
+
+
+class LocatorError(ValueError):
+    """Raised for locators the offline engine cannot evaluate."""
+
+
+class HierarchySnapshot:
+    """
+    A parsed UI hierarchy indexed for fast locator lookups.
+
+    Typical flow:
+        snap = HierarchySnapshot.from_source(driver.page_source)
+        snap.find_all(HomePage.FAB)      # -> [Node, ...]
+    """
+
+    INDEXED = {
+        "text": "text",
+        "content-desc": "desc",
+        "resource-id": "resource_id",
+        "class": "class_name",
+        "hint": "hint",
+    }
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.root = nodes[0] if nodes else None
+        # Every node except the synthetic <hierarchy> root, in document order
+        self.elements = nodes[1:]
+        self._position = {id(node): i for i, node in enumerate(nodes)}
+        self.indexes = {key: defaultdict(list) for key in self.INDEXED.values()}
+        for node in self.elements:
+            for attr, key in self.INDEXED.items():
+                value = node.get(attr)
+                if value:
+                    self.indexes[key][value].append(node)
+
+    @classmethod
+    def from_source(cls, source) -> "HierarchySnapshot":
+        """Build a snapshot from a page-source string or bytes."""
+        return cls(parse_hierarchy(source))
+
+    @classmethod
+    def from_file(cls, path) -> "HierarchySnapshot":
+        """Build a snapshot from a dump file (e.g. pages/xml/home.xml)."""
+        with open(path, "rb") as fh:
+            return cls.from_source(fh)
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def find_all(self, locator) -> list:
+        """Return every node matched by the (by, value) *locator*."""
+        by, value = locator
+        if by == AppiumBy.ACCESSIBILITY_ID:
+            return list(self.indexes["desc"].get(value, ()))
+        if by == AppiumBy.ID:
+            return self._find_by_id(value)
+        if by == AppiumBy.CLASS_NAME:
+            return list(self.indexes["class_name"].get(value, ()))
+        if by == AppiumBy.ANDROID_UIAUTOMATOR:
+            return UiSelector.parse(value).select(self)
+        if by == AppiumBy.XPATH:
+            return XPath.compile(value).evaluate(self)
+        raise LocatorError(f"Unsupported locator strategy: {by!r}")
+
+    def find(self, locator):
+        """Return the first node matched by *locator*, or None."""
+        found = self.find_all(locator)
+        return found[0] if found else None
+
+    def is_visible(self, locator) -> bool:
+        """Return True if *locator* matches a node with displayed="true"."""
+        return any(node.get("displayed", "true") == "true" for node in self.find_all(locator))
+
+    def document_order(self, nodes) -> list:
+        """Sort *nodes* into document order, dropping duplicates."""
+        unique = {id(node): node for node in nodes}
+        return sorted(unique.values(), key=lambda node: self._position.get(id(node), -1))
+
+    def _find_by_id(self, value: str) -> list:
+        exact = self.indexes["resource_id"].get(value)
+        if exact or ":id/" in value:
+            return list(exact or ())
+        # UiAutomator2 expands a bare id with the node's package.
+        return [
+            node for node in self.elements
+            if node.get("resource-id") == f"{node.get('package')}:id/{value}"
+        ]
+
+
+# ----------------------------------------------------------------------
+# UiSelector
+# ----------------------------------------------------------------------
+
+_CALL_RE = re.compile(r"\.\s*(\w+)\s*\(\s*(\"(?:[^\"\\]|\\.)*\"|-?\d+|true|false)\s*\)")
+
+_BOOL_METHODS = {
+    "checkable": "checkable", "checked": "checked", "clickable": "clickable",
+    "enabled": "enabled", "focusable": "focusable", "focused": "focused",
+    "longClickable": "long-clickable", "scrollable": "scrollable",
+    "selected": "selected",
+}
+_STRING_METHODS = {
+    "text": ("text", "eq"), "textContains": ("text", "contains"),
+    "textStartsWith": ("text", "startswith"), "textMatches": ("text", "matches"),
+    "description": ("content-desc", "eq"),
+    "descriptionContains": ("content-desc", "contains"),
+    "descriptionStartsWith": ("content-desc", "startswith"),
+    "descriptionMatches": ("content-desc", "matches"),
+    "resourceId": ("resource-id", "eq"),
+    "resourceIdMatches": ("resource-id", "matches"),
+    "className": ("class", "eq"), "classNameMatches": ("class", "matches"),
+    "packageName": ("package", "eq"), "packageNameMatches": ("package", "matches"),
+}
+
+
+class UiSelector:
+    """A parsed `new UiSelector()...` chain (no child/parent selectors)."""
+
+    def __init__(self, criteria, index=None, instance=None):
+        self.criteria = criteria    # [(attr, op, value)]
+        self.index = index
+        self.instance = instance
+
+    @classmethod
+    def parse(cls, expression: str) -> "UiSelector":
+        expr = expression.strip().rstrip(";")
+        if not expr.startswith("new UiSelector()"):
+            raise LocatorError(f"Only plain UiSelector chains are supported: {expression!r}")
+        rest = expr[len("new UiSelector()"):]
+        criteria, index, instance = [], None, None
+        pos = 0
+        for match in _CALL_RE.finditer(rest):
+            if rest[pos:match.start()].strip():
+                break
+            pos = match.end()
+            method, raw = match.groups()
+            arg = _literal(raw)
+            if method in _STRING_METHODS:
+                attr, op = _STRING_METHODS[method]
+                criteria.append((attr, op, arg))
+            elif method in _BOOL_METHODS:
+                criteria.append((_BOOL_METHODS[method], "eq", "true" if arg else "false"))
+            elif method == "index":
+                index = arg
+            elif method == "instance":
+                instance = arg
+            else:
+                raise LocatorError(f"Unsupported UiSelector method {method}() in {expression!r}")
+        if rest[pos:].strip():
+            raise LocatorError(f"Cannot parse UiSelector near {rest[pos:]!r}")
+        return cls(criteria, index, instance)
+
+    def matches(self, node) -> bool:
+        for attr, op, value in self.criteria:
+            if not _compare(node.get(attr), op, value):
+                return False
+        if self.index is not None and node.get("index") != str(self.index):
+            return False
+        return True
+
+    def select(self, snapshot: HierarchySnapshot) -> list:
+        candidates = snapshot.elements
+        # Narrow the scan with an index when the chain has an exact criterion.
+        for attr, op, value in self.criteria:
+            key = HierarchySnapshot.INDEXED.get(attr)
+            if op == "eq" and key:
+                candidates = snapshot.indexes[key].get(value, ())
+                break
+        found = [node for node in candidates if self.matches(node)]
+        if self.instance is not None:
+            return found[self.instance:self.instance + 1]
+        return found
+
+
+def _literal(raw: str):
+    if raw.startswith('"'):
+        return re.sub(r"\\(.)", r"\1", raw[1:-1])
+    if raw in ("true", "false"):
+        return raw == "true"
+    return int(raw)
+
+
+def _compare(actual: str, op: str, expected) -> bool:
+    if op == "eq":
+        return actual == expected
+    if op == "contains":
+        return expected in actual
+    if op == "startswith":
+        return actual.startswith(expected)
+    if op == "matches":
+        return re.fullmatch(expected, actual) is not None
+    raise LocatorError(f"Unknown comparison {op!r}")
+
+
+# ----------------------------------------------------------------------
+# XPath subset
+# ----------------------------------------------------------------------
+
+_XPATH_TOKEN_RE = re.compile(r"""
+    \s*(?:
+      (?P<dslash>//) | (?P<slash>/) | (?P<lbr>\[) | (?P<rbr>\]) |
+      (?P<lpar>\() | (?P<rpar>\)) | (?P<comma>,) | (?P<op>!=|=) |
+      (?P<attr>@[\w:.-]+) | (?P<string>"[^"]*"|'[^']*') |
+      (?P<number>\d+) | (?P<star>\*) | (?P<dot>\.\.|\.) |
+      (?P<name>[A-Za-z_][\w.$-]*)
+    )""", re.VERBOSE)
+
+
+class XPath:
+    """A compiled XPath expression from the UiAutomator2-friendly subset."""
+
+    _cache = {}
+
+    def __init__(self, steps):
+        self.steps = steps      # [(axis, name_or_None, [predicate, ...])]
+
+    @classmethod
+    def compile(cls, expression: str) -> "XPath":
+        compiled = cls._cache.get(expression)
+        if compiled is None:
+            compiled = cls._cache[expression] = _XPathParser(expression).parse()
+        return compiled
+
+    def evaluate(self, snapshot: HierarchySnapshot) -> list:
+        document = _Document(snapshot.root)
+        context = [document]
+        for axis, name, predicates in self.steps:
+            result = []
+            for ctx in context:
+                if axis == "parent":
+                    pool = [[ctx.parent]] if ctx.parent is not None else []
+                elif axis == "self":
+                    pool = [[ctx]]
+                elif axis == "descendant":
+                    # //x is descendant-or-self::node()/child::x — positions
+                    # in predicates count among siblings of each parent.
+                    pool = [parent.children for parent in _descendants_or_self(ctx)]
+                else:
+                    pool = [ctx.children]
+                for group in pool:
+                    matched = [n for n in group if name is None or n.tag == name]
+                    for predicate in predicates:
+                        matched = [
+                            n for i, n in enumerate(matched, 1)
+                            if predicate(n, i, len(matched))
+                        ]
+                    result.extend(matched)
+            context = snapshot.document_order(result)
+        return [node for node in context if node is not document]
+
+
+class _Document:
+    """The XPath document node: parent of the <hierarchy> root element."""
+
+    tag = None
+    parent = None
+
+    def __init__(self, root):
+        self.children = [root] if root is not None else []
+
+    def get(self, name: str, default: str = "") -> str:
+        return default
+
+    def has(self, name: str) -> bool:
+        return False
+
+
+def _descendants_or_self(node):
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(reversed(current.children))
+
+
+class _XPathParser:
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.tokens = []
+        pos = 0
+        expr = expression.strip()
+        while pos < len(expr):
+            match = _XPATH_TOKEN_RE.match(expr, pos)
+            if not match or match.end() == pos:
+                raise LocatorError(f"Cannot tokenize XPath {expression!r} at {expr[pos:]!r}")
+            self.tokens.append((match.lastgroup, match.group(match.lastgroup)))
+            pos = match.end()
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, kind=None):
+        token = self.peek()
+        if token[0] is None or (kind and token[0] != kind):
+            raise LocatorError(f"Unexpected token {token[1]!r} in XPath {self.expression!r}")
+        self.pos += 1
+        return token
+
+    def parse(self) -> XPath:
+        steps = []
+        kind, _ = self.peek()
+        if kind not in ("slash", "dslash"):
+            raise LocatorError(f"Only absolute XPath is supported: {self.expression!r}")
+        while self.peek()[0] in ("slash", "dslash"):
+            axis = "descendant" if self.take()[0] == "dslash" else "child"
+            kind, value = self.take()
+            if kind == "dot":
+                if axis == "descendant":
+                    raise LocatorError(f"'//{value}' is not supported: {self.expression!r}")
+                steps.append(("parent" if value == ".." else "self", None, []))
+                continue
+            if kind not in ("name", "star"):
+                raise LocatorError(f"Expected a node test in XPath {self.expression!r}")
+            predicates = []
+            while self.peek()[0] == "lbr":
+                self.take("lbr")
+                predicates.append(self.parse_predicate())
+                self.take("rbr")
+            steps.append((axis, value if kind == "name" else None, predicates))
+        if self.peek()[0] is not None:
+            raise LocatorError(f"Trailing tokens in XPath {self.expression!r}")
+        return XPath(steps)
+
+    def parse_predicate(self):
+        if self.peek()[0] == "number":
+            position = int(self.take()[1])
+            return lambda node, i, size: i == position
+        if self.peek() == ("name", "last"):
+            self.take()
+            self.take("lpar")
+            self.take("rpar")
+            return lambda node, i, size: i == size
+        test = self.parse_or()
+        return lambda node, i, size: test(node)
+
+    def parse_or(self):
+        left = self.parse_and()
+        while self.peek() == ("name", "or"):
+            self.take()
+            right = self.parse_and()
+            left = (lambda a, b: lambda n: a(n) or b(n))(left, right)
+        return left
+
+    def parse_and(self):
+        left = self.parse_term()
+        while self.peek() == ("name", "and"):
+            self.take()
+            right = self.parse_term()
+            left = (lambda a, b: lambda n: a(n) and b(n))(left, right)
+        return left
+
+    def parse_term(self):
+        kind, value = self.peek()
+        if kind == "lpar":
+            self.take()
+            inner = self.parse_or()
+            self.take("rpar")
+            return inner
+        if kind == "attr":
+            attr = self.take()[1][1:]
+            if self.peek()[0] != "op":
+                return lambda n: n.has(attr)
+            op = self.take()[1]
+            expected = self.take("string")[1][1:-1]
+            if op == "=":
+                return lambda n: n.get(attr, None) == expected
+            return lambda n: n.get(attr, None) != expected
+        if kind == "name" and value in ("contains", "starts-with", "not"):
+            self.take()
+            self.take("lpar")
+            if value == "not":
+                inner = self.parse_or()
+                self.take("rpar")
+                return lambda n: not inner(n)
+            attr = self.take("attr")[1][1:]
+            self.take("comma")
+            expected = self.take("string")[1][1:-1]
+            self.take("rpar")
+            if value == "contains":
+                return lambda n: expected in n.get(attr)
+            return lambda n: n.get(attr).startswith(expected)
+        raise LocatorError(f"Unsupported XPath predicate near {value!r} in {self.expression!r}")
+
+
+# ----------------------------------------------------------------------
+# Page-object validation
+# ----------------------------------------------------------------------
+
+def page_object_locators(page_cls) -> dict:
+    """
+    Return {constant name: locator} for every locator declared on *page_cls*.
+
+    Tuple constants are used as-is; *_TEXT and *_HINT strings are turned
+    into the locators BasePage builds for them.
+    """
+    locators = {}
+    for name in dir(page_cls):
+        if not name.isupper():
+            continue
+        value = getattr(page_cls, name)
+        if isinstance(value, tuple) and len(value) == 2:
+            locators[name] = value
+        elif isinstance(value, str) and name.endswith("_TEXT"):
+            locators[name] = page_cls.text_locator(value)
+        elif isinstance(value, str) and name.endswith("_HINT"):
+            locators[name] = page_cls.hint_locator(value)
+    return locators
+
+
+def _default_pages() -> list:
+    from pages.home_page import HomePage
+    from pages.sidebar_page import SidebarPage
+    from pages.task_page import TaskPage
+    return [HomePage, SidebarPage, TaskPage]
+
+
+def validate_page_objects(page_classes=None) -> list:
+    """
+    Resolve every page-object locator against its XML_DUMP.
+
+    Returns [(page class name, constant, locator, match count)].
+    """
+    results = []
+    for page_cls in page_classes or _default_pages():
+        snapshot = HierarchySnapshot.from_file(XML_DIR / page_cls.XML_DUMP)
+        for name, locator in sorted(page_object_locators(page_cls).items()):
+            results.append((page_cls.__name__, name, locator, len(snapshot.find_all(locator))))
+    return results
+
+
+# ----------------------------------------------------------------------
+# Locator cost advice
+# ----------------------------------------------------------------------
+
+# Relative device-side cost of each strategy, cheapest first.  Ids and
+# UiSelectors are matched while UiAutomator2 walks the accessibility tree;
+# XPath first serialises the whole hierarchy to XML, then evaluates.
+STRATEGY_COST = {
+    AppiumBy.ID: 1,
+    AppiumBy.ACCESSIBILITY_ID: 1,
+    AppiumBy.ANDROID_UIAUTOMATOR: 2,
+    AppiumBy.CLASS_NAME: 2,
+    AppiumBy.XPATH: 3,
+}
+
+
+def _quote(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def candidate_locators(node) -> list:
+    """Locators that could identify *node*, cheapest strategy first."""
+    candidates = []
+    if node.get("resource-id"):
+        candidates.append((AppiumBy.ID, node.get("resource-id")))
+    if node.get("content-desc"):
+        candidates.append((AppiumBy.ACCESSIBILITY_ID, node.get("content-desc")))
+    text = node.get("text")
+    if text:
+        by_text = (AppiumBy.ANDROID_UIAUTOMATOR, f'new UiSelector().text("{_quote(text)}")')
+        by_class_text = (AppiumBy.ANDROID_UIAUTOMATOR,
+                         f'new UiSelector().className("{node.get("class")}")'
+                         f'.text("{_quote(text)}")')
+        # A field's hint is only its text while empty: pin the class as well.
+        if node.get("showing-hint") == "true":
+            candidates.append(by_class_text)
+        else:
+            candidates.extend([by_text, by_class_text])
+    return candidates
+
+
+def advise_page_objects(page_classes=None) -> list:
+    """
+    For every page-object locator matching a single node in its XML_DUMP,
+    look for a cheaper strategy that matches that node alone.
+
+    Returns [(page class name, constant, locator, match count, advice)];
+    advice is None when nothing cheaper exists, else (locator, note).
+    """
+    results = []
+    for page_cls in page_classes or _default_pages():
+        snapshot = HierarchySnapshot.from_file(XML_DIR / page_cls.XML_DUMP)
+        for name, locator in sorted(page_object_locators(page_cls).items()):
+            found = snapshot.find_all(locator)
+            advice = None
+            if len(found) == 1:
+                node = found[0]
+                cost = STRATEGY_COST.get(locator[0], STRATEGY_COST[AppiumBy.XPATH])
+                for candidate in candidate_locators(node):
+                    if STRATEGY_COST[candidate[0]] >= cost or snapshot.find_all(candidate) != [node]:
+                        continue
+                    note = ""
+                    if node.get("showing-hint") == "true" and "text(" in candidate[1]:
+                        note = "hint shown as text: Android 8+, empty field only"
+                    advice = (candidate, note)
+                    break
+            results.append((page_cls.__name__, name, locator, len(found), advice))
+    return results
+
+
+def _print_advice() -> int:
+    results = advise_page_objects()
+    faster = 0
+    for page, name, (by, value), count, advice in results:
+        status = "faster" if advice else "ok" if count == 1 else f"{count} hits"
+        print(f"{status:8} {page + '.' + name:36} {by}: {value}")
+        if advice:
+            faster += 1
+            (new_by, new_value), note = advice
+            print(f"{'':8} {'→':>36} {new_by}: {new_value}" + (f"  ({note})" if note else ""))
+    print(f"{len(results)} locators checked, {faster} with a faster unique strategy")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check page-object locators against pages/xml/.")
+    parser.add_argument("--advise", action="store_true",
+                        help="List cheaper unique strategies (id, accessibility id, "
+                             "UiSelector) for each locator instead of validating.")
+    if parser.parse_args(argv).advise:
+        return _print_advice()
+    results = validate_page_objects()
+    missing = 0
+    for page, name, (by, value), count in results:
+        status = "ok" if count else "MISSING"
+        missing += not count
+        print(f"{status:8} {page + '.' + name:36} {count:2}  {by}: {value}")
+    print(f"{len(results)} locators checked, {missing} missing")
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+framework/lockfile.py
+
+Cross-process lock files, shared by device leasing (framework/devices.py)
+and the latency history (framework/timeouts.py).
+
+A lock is a file created exclusively (O_CREAT | O_EXCL) that holds the
+owner's pid, so it works the same on every OS, between pytest-xdist
+workers and between independent runs.  A lock whose process no longer
+exists is stale and can be reclaimed.  Reclaiming is serialised by a
+short-lived "<lock>.reclaim" file and the stale check is repeated while
+holding it: two workers that saw the same dead pid cannot both take the
+lock, and a lock re-created in the meantime is never deleted.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# A .reclaim file older than this was left by a process that died while
+# reclaiming (it is held for a few microseconds otherwise).
+ABANDONED_RECLAIM_AGE = 10.0
+
+
+def try_lock(path) -> bool:
+    """Create the lock file *path* for this process; False if someone holds it."""
+    path = Path(path)
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        if is_stale(path) and _reclaim(path):
+            return try_lock(path)
+        return False
+    with os.fdopen(fd, "w") as fh:
+        fh.write(str(os.getpid()))
+    return True
+
+
+def unlock(path) -> None:
+    """Remove the lock file *path*."""
+    try:
+        Path(path).unlink()
+    except FileNotFoundError:
+        pass
+
+
+@contextmanager
+def held(path, timeout: float, poll: float = 0.05):
+    """Hold the lock *path*, waiting up to *timeout* seconds (TimeoutError)."""
+    deadline = time.monotonic() + timeout
+    while not try_lock(path):
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"{path} still held after {timeout:.0f}s")
+        time.sleep(poll)
+    try:
+        yield
+    finally:
+        unlock(path)
+
+
+def is_stale(path) -> bool:
+    """A lock is stale when the process that wrote it no longer exists."""
+    try:
+        pid = int(Path(path).read_text() or 0)
+    except (OSError, ValueError):
+        return False
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
+
+
+def _reclaim(path: Path) -> bool:
+    """Delete the stale lock *path*; False if another process got there first."""
+    guard = path.with_name(path.name + ".reclaim")
+    try:
+        os.close(os.open(guard, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        _drop_if_abandoned(guard)
+        return False
+    try:
+        if not is_stale(path):
+            return False        # reclaimed, and maybe locked again, meanwhile
+        unlock(path)
+        return True
+    finally:
+        unlock(guard)
+
+
+def _drop_if_abandoned(guard: Path) -> None:
+    try:
+        if time.time() - guard.stat().st_mtime > ABANDONED_RECLAIM_AGE:
+            unlock(guard)
+    except FileNotFoundError:
+        pass
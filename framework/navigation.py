@@ -0,0 +1,227 @@
+"""
+framework/navigation.py
+
+Screen graph and shortest-path navigation.
+
+The app's screens are nodes, identified from a single hierarchy snapshot
+by locators taken from the page objects; the ways to move between them
+are weighted edges:
+
+    home ──hamburger──▶ sidebar ──close──▶ home
+    home ──FAB────────▶ add_task ──back──▶ home
+    (any) ──restart (terminate + activate)──▶ home
+
+Navigator.go_to("sidebar") identifies the current screen, runs Dijkstra
+over the graph and walks the cheapest path, confirming every hop with a
+fresh snapshot.  An unexpected screen along the way just triggers a
+re-plan; the restart edge is expensive, so it is only taken when nothing
+cheaper leads to the target (unknown screen, app not running).  The
+starting screen is identified from one snapshot without waiting, so an
+unknown one goes to the restart right away.
+
+Typical flow:
+    nav = Navigator(driver)
+    nav.go_to(SIDEBAR)          # from wherever the app currently is
+"""
+
+import heapq
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from appium.webdriver.common.appiumby import AppiumBy
+from selenium.common.exceptions import WebDriverException
+
+from framework.locators import HierarchySnapshot
+from framework.waits import intervals
+from pages.home_page import HomePage
+from pages.sidebar_page import SidebarPage
+from pages.task_page import TaskPage
+
+APP_PACKAGE = "org.tasks"
+
+HOME = "home"
+SIDEBAR = "sidebar"
+ADD_TASK = "add_task"
+ONBOARDING = "onboarding"
+
+# Seconds to wait for one hop to land before re-planning
+HOP_TIMEOUT = 5
+# Upper bound on hops (including re-plans) for one go_to()
+MAX_HOPS = 8
+
+
+class NavigationError(RuntimeError):
+    """The target screen could not be reached."""
+
+
+@dataclass(frozen=True)
+class Screen:
+    """A node: the screen is showing when any of its *markers* is visible."""
+
+    name: str
+    markers: tuple
+
+
+@dataclass(frozen=True)
+class Edge:
+    """
+    A transition from *source* to *target* costing about *cost* seconds,
+    expected to land within *timeout*.
+
+    *source* None means the edge applies from any screen, including an
+    unidentified one.
+    """
+
+    source: Optional[str]
+    target: str
+    cost: float
+    name: str
+    action: Callable
+    timeout: float = HOP_TIMEOUT
+
+
+# Checked in order; the first screen with a visible marker wins.
+SCREENS = (
+    Screen(SIDEBAR, (SidebarPage.CLOSE_SIDEBAR,)),
+    Screen(ADD_TASK, (TaskPage.SAVE_BUTTON,)),
+    Screen(HOME, (HomePage.FAB,)),
+    Screen(ONBOARDING, ((AppiumBy.ANDROID_UIAUTOMATOR,
+                         'new UiSelector().text("Continue without sync")'),)),
+)
+
+
+def _open_sidebar(driver) -> None:
+    HomePage(driver).find(HomePage.HAMBURGER_BUTTON).click()
+
+
+def _close_sidebar(driver) -> None:
+    # A plain tap: go_to() itself waits for the drawer to be gone.
+    page = SidebarPage(driver)
+    page.find(page.CLOSE_SIDEBAR).click()
+
+
+def _open_add_task(driver) -> None:
+    HomePage(driver).find(HomePage.FAB).click()
+
+
+def _leave_add_task(driver) -> None:
+    page = TaskPage(driver)
+    page.hide_keyboard()        # otherwise the first Back only hides it
+    page.press_back()
+
+
+def _restart(driver) -> None:
+    driver.terminate_app(APP_PACKAGE)
+    driver.activate_app(APP_PACKAGE)
+
+
+EDGES = (
+    Edge(HOME, SIDEBAR, 1.0, "hamburger", _open_sidebar),
+    Edge(SIDEBAR, HOME, 1.0, "close sidebar", _close_sidebar),
+    Edge(HOME, ADD_TASK, 1.0, "fab", _open_add_task),
+    Edge(ADD_TASK, HOME, 1.5, "back", _leave_add_task),
+    Edge(None, HOME, 6.0, "restart", _restart, timeout=30),
+)
+
+
+class Navigator:
+    """Moves the app to a requested screen along the cheapest known path."""
+
+    def __init__(self, driver, screens=SCREENS, edges=EDGES):
+        self.driver = driver
+        self.screens = tuple(screens)
+        self.edges = tuple(edges)
+
+    # ------------------------------------------------------------------
+    # Where are we?
+    # ------------------------------------------------------------------
+
+    def identify(self, snapshot: HierarchySnapshot) -> Optional[str]:
+        """Name of the screen *snapshot* shows, or None if it is not in the graph."""
+        for screen in self.screens:
+            if any(snapshot.is_visible(marker) for marker in screen.markers):
+                return screen.name
+        return None
+
+    def current_screen(self) -> Optional[str]:
+        """Identify the screen on display right now (one page_source call)."""
+        try:
+            return self.identify(HierarchySnapshot.from_source(self.driver.page_source))
+        except WebDriverException:
+            return None     # app (re)starting; the server may hiccup
+
+    def wait_for_screen(self, expected=None, timeout: float = HOP_TIMEOUT) -> Optional[str]:
+        """
+        Poll until *expected* (or, without one, any known screen) is showing.
+
+        Returns the last screen seen, which differs from *expected* on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        for interval in intervals():
+            screen = self.current_screen()
+            if screen == expected or (expected is None and screen is not None):
+                return screen
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return screen
+            time.sleep(min(interval, remaining))
+
+    # ------------------------------------------------------------------
+    # Planning
+    # ------------------------------------------------------------------
+
+    def path(self, source: Optional[str], target: str) -> list:
+        """Cheapest list of edges from *source* to *target* (Dijkstra)."""
+        if source == target:
+            return []
+        best = {source: 0.0}
+        queue = [(0.0, 0, source, [])]
+        counter = 1         # tie-breaker so heapq never compares names/paths
+        while queue:
+            cost, _, node, route = heapq.heappop(queue)
+            if node == target:
+                return route
+            if cost > best.get(node, float("inf")):
+                continue
+            for edge in self.edges:
+                if edge.source not in (None, node):
+                    continue
+                total = cost + edge.cost
+                if total < best.get(edge.target, float("inf")):
+                    best[edge.target] = total
+                    heapq.heappush(queue, (total, counter, edge.target, route + [edge]))
+                    counter += 1
+        raise NavigationError(f"No path from {source or 'unknown screen'} to {target}")
+
+    # ------------------------------------------------------------------
+    # Moving
+    # ------------------------------------------------------------------
+
+    def go_to(self, target: str, timeout: float = 30) -> list:
+        """
+        Bring the app to *target* and return the names of the edges taken.
+
+        Raises NavigationError if *target* is not showing within *timeout*.
+        """
+        deadline = time.monotonic() + timeout
+        taken = []
+        # One snapshot: an unknown screen (e.g. search left open) is not
+        # waited on, the plan goes straight to the restart edge.
+        screen = self.current_screen()
+        for _ in range(MAX_HOPS):
+            if screen == target:
+                return taken
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            edge = self.path(screen, target)[0]
+            print(f"[navigation] {screen or 'unknown'} → {edge.target} via {edge.name}")
+            try:
+                edge.action(self.driver)
+            except WebDriverException as exc:
+                print(f"[navigation] {edge.name} failed: {exc.msg}")
+            taken.append(edge.name)
+            screen = self.wait_for_screen(edge.target, min(edge.timeout, max(remaining, 0.1)))
+        raise NavigationError(
+            f"Could not reach {target} (last seen: {screen or 'unknown screen'}, path: {taken})")
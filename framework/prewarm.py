@@ -0,0 +1,179 @@
+"""
+framework/prewarm.py
+
+SessionPrewarmer — prepares the next test's Appium session in the
+background while the current test runs.
+
+A UiAutomator2 device only serves one session at a time (a new session
+tears down the instrumentation of the old one), so the warm session
+lives on a second device: with two devices A and B, test N runs on A
+while a worker thread creates (or reuses) the session on B and relaunches
+the app there; when test N finishes, A is reset in the background while
+test N+1 runs on B, and so on.
+
+Hand-off: acquire() returns whichever device is ready first and then
+runs the caller's (cheap) per-test reset, e.g. navigating to the test's
+start screen.  A session whose test failed is quit and replaced in the
+background.  close() waits for outstanding warm-ups and quits every
+session, counting the ones no test used.
+
+Exposes the same acquire/release/close interface as DriverPool.
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from selenium.common.exceptions import WebDriverException
+
+from framework.command_timing import COMMAND_LOG
+
+
+class _Slot:
+    """One device: how to open a session on it, and its current warm-up."""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.driver = None      # session handed to a test, while in use
+        self.future = None      # background warm-up → ready session
+
+
+class SessionPrewarmer:
+    """
+    Round-robins sessions over several devices, readying one in the background.
+
+    Typical flow:
+        warm = SessionPrewarmer([new_driver_a, new_driver_b], reset_app)
+        d = warm.acquire()         # ready session; the other device warms up
+        ...
+        warm.release(d, reusable=not failed)
+        warm.close()
+    """
+
+    def __init__(self, factories, prepare):
+        """
+        *factories* holds one zero-argument session factory per device;
+        *prepare* brings a session's app to a clean state and runs in the
+        background.
+        """
+        if len(factories) < 2:
+            raise ValueError("Prewarming needs at least two devices")
+        self._prepare = prepare
+        self._slots = [_Slot(factory) for factory in factories]
+        self._executor = ThreadPoolExecutor(len(self._slots), thread_name_prefix="prewarm")
+        self._lock = threading.Lock()
+        self.stats = {"created": 0, "discarded": 0, "unused": 0, "warm_hits": 0,
+                      "waits": 0, "wait_s": 0.0, "prepare_s": 0.0}
+        for slot in self._slots:
+            self._warm(slot, None, reusable=False)
+
+    # ------------------------------------------------------------------
+    # Lease / return
+    # ------------------------------------------------------------------
+
+    def acquire(self, timeout: float = 300, reset=None):
+        """
+        Return a warmed session, waiting for the first device to be ready.
+
+        *reset*, if given, runs on the session after the hand-off.
+        """
+        deadline = time.monotonic() + timeout
+        start = time.monotonic()
+        while True:
+            pending = [slot.future for slot in self._slots if slot.future is not None]
+            hit = any(future.done() for future in pending)
+            done, _ = wait(pending, max(deadline - time.monotonic(), 0), FIRST_COMPLETED)
+            if not done:
+                raise TimeoutError(f"No warm session ready within {timeout}s")
+            slot = next(s for s in self._slots if s.future in done)
+            future, slot.future = slot.future, None
+            try:
+                d = future.result()
+            except Exception as exc:
+                print(f"[prewarm] warm-up failed, retrying: {exc}")
+                self._warm(slot, None, reusable=False)
+                continue
+            waited = time.monotonic() - start
+            with self._lock:
+                self.stats["warm_hits" if hit else "waits"] += 1
+                self.stats["wait_s"] += waited
+            slot.driver = d
+            try:
+                if reset is not None:
+                    reset(d)
+            except BaseException as exc:
+                # The session may be anywhere; never keep its device leased
+                self.release(d, reusable=False)
+                if not isinstance(exc, WebDriverException):
+                    raise
+                print(f"[prewarm] session unusable, replacing it: {exc.msg}")
+                continue
+            return d
+
+    def release(self, d, reusable: bool = True) -> None:
+        """Hand *d* back; its device is reset (or re-created) in the background."""
+        slot = next((s for s in self._slots if s.driver is d), None)
+        if slot is None:
+            raise ValueError(f"{d!r} was not acquired from this prewarmer")
+        slot.driver = None
+        self._warm(slot, d, reusable)
+
+    def close(self) -> None:
+        """Wait for outstanding warm-ups and quit every session."""
+        for slot in self._slots:
+            sessions = [slot.driver]
+            if slot.future is not None:
+                try:
+                    sessions.append(slot.future.result())
+                    self.stats["unused"] += 1
+                except Exception:
+                    pass
+                slot.future = None
+            for d in sessions:
+                if d is not None:
+                    self._quit(d)
+            slot.driver = None
+        self._executor.shutdown(wait=True)
+        print(f"[prewarm] closed: {self.stats}")
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _warm(self, slot, d, reusable: bool) -> None:
+        slot.future = self._executor.submit(self._ready, slot, d, reusable)
+
+    def _ready(self, slot, d, reusable: bool):
+        """Background: return a session on *slot*'s device with the app reset."""
+        COMMAND_LOG.set_thread_phase("prewarm")
+        start = time.monotonic()
+        if d is not None and not reusable:
+            self._count("discarded")
+            self._quit(d)
+            d = None
+        for attempt in range(2):
+            if d is None:
+                d = slot.factory()
+                self._count("created")
+            try:
+                self._prepare(d)
+                break
+            except WebDriverException:
+                self._quit(d)
+                d = None
+                if attempt:
+                    raise
+        with self._lock:
+            self.stats["prepare_s"] += time.monotonic() - start
+        return d
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    @staticmethod
+    def _quit(d) -> None:
+        try:
+            d.quit()
+        except Exception:
+            pass
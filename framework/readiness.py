@@ -0,0 +1,41 @@
+"""
+framework/readiness.py
+
+Readiness polling used after (re)launching the app.
+
+Instead of sleeping a fixed number of seconds after activate_app(), poll
+for a real signal — the foreground activity is MainActivity and one of
+the *markers* (e.g. the FAB or the "My Tasks" toolbar) is on screen —
+and return as soon as it holds.
+"""
+
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+MAIN_ACTIVITY = "com.todoroo.astrid.activity.MainActivity"
+
+
+def wait_for_app_ready(driver, markers, timeout: float, poll: float = 0.25):
+    """
+    Poll until MainActivity is in the foreground and any locator in
+    *markers* matches an element.
+
+    Returns the matched locator, or None when *timeout* elapsed first.
+    The caller is responsible for the driver's implicit wait; keep it at 0
+    while polling so a missing marker does not block.
+    """
+    deadline = time.monotonic() + timeout
+    short_name = MAIN_ACTIVITY.rsplit(".", 1)[-1]
+    while True:
+        try:
+            activity = driver.current_activity or ""
+            if activity.endswith(short_name):
+                for locator in markers:
+                    if driver.find_elements(*locator):
+                        return locator
+        except WebDriverException:
+            pass    # app still starting; the UiAutomator2 server may hiccup
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(poll)
@@ -0,0 +1,220 @@
+"""
+framework/replay.py
+
+Record/replay of WebDriver traffic.
+
+    pytest --record=recordings/      # run against Appium, keep the traffic
+    pytest --replay=recordings/      # rerun offline from the recordings
+
+In record mode every WebDriver command a test's session sends (including
+the session setup and teardown in its fixtures) is stored with its
+response and duration in <dir>/<test id>.json.gz, one gzip'd JSON file
+per test.
+
+In replay mode no Appium server or device is needed: the driver's
+connection answers each command from the test's recording.  Responses are
+queued per command and parameters, so a refactored page object that
+polls fewer (or more) times, or issues independent commands in another
+order, still replays; the last response of a query is reused once its
+queue is exhausted.  A command the recording never saw fails with an
+"unknown error" naming it.  Tests without a recording are skipped.
+
+--replay-delays sleeps for each command's recorded duration, which gives
+stable timings for benchmarking framework changes against the same
+device behaviour.
+
+Sessions must belong to a single test, so --record and --replay cannot be
+combined with --driver-pool or --prewarm.
+
+conftest.py imports this module before registering it as a plugin, so it
+opts out of assertion rewriting: PYTEST_DONT_REWRITE
+"""
+
+import copy
+import gzip
+import json
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+
+import pytest
+from appium.webdriver.appium_connection import AppiumConnection
+from selenium.webdriver.remote.webelement import WebElement
+
+from framework.command_timing import COMMAND_LOG, InstrumentedConnection
+
+# Commands whose parameters vary between runs without changing the answer
+_UNKEYED = {"newSession", "setTimeouts"}
+# W3C element reference key
+_ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+
+def _jsonable(value):
+    """json default= hook: element references as the protocol encodes them."""
+    if isinstance(value, WebElement):
+        return {_ELEMENT_KEY: value.id}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _plain(params):
+    """A JSON-safe copy of *params*."""
+    return json.loads(json.dumps(params, default=_jsonable))
+
+
+def recording_path(directory, nodeid: str) -> Path:
+    """File holding the recording of the test *nodeid*."""
+    return Path(directory) / (re.sub(r"[^A-Za-z0-9_.-]+", "_", nodeid) + ".json.gz")
+
+
+def command_key(command: str, params) -> str:
+    """Replay lookup key: the command plus its parameters, minus the session id."""
+    if command in _UNKEYED or not isinstance(params, dict):
+        return command
+    params = {k: v for k, v in params.items() if k != "sessionId"}
+    return command + " " + json.dumps(params, sort_keys=True, default=_jsonable)
+
+
+class Recorder:
+    """Buffers the traffic of the running tests and writes one file per test."""
+
+    def __init__(self):
+        self.directory = None
+        self._commands = defaultdict(list)     # nodeid → [[command, params, response, s]]
+        self._lock = threading.Lock()
+
+    def add(self, command, params, response, seconds) -> None:
+        test = COMMAND_LOG.test
+        if self.directory is None or test is None:
+            return
+        with self._lock:
+            self._commands[test].append([command, params, response, round(seconds, 4)])
+
+    def save(self, nodeid: str) -> None:
+        with self._lock:
+            commands = self._commands.pop(nodeid, None)
+        if not commands:
+            return
+        path = recording_path(self.directory, nodeid)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, "wt", encoding="utf-8") as fh:
+            json.dump({"test": nodeid, "commands": commands}, fh, separators=(",", ":"))
+
+
+class Player:
+    """Serves the recorded responses of the test being replayed."""
+
+    def __init__(self):
+        self.directory = None
+        self.delays = False
+        self._queues = {}
+        self._last = {}
+
+    def load(self, nodeid: str) -> bool:
+        """Load *nodeid*'s recording; False when there is none."""
+        path = recording_path(self.directory, nodeid)
+        if not path.exists():
+            return False
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            commands = json.load(fh)["commands"]
+        self._queues = defaultdict(deque)
+        self._last = {}
+        for command, params, response, seconds in commands:
+            self._queues[command_key(command, params)].append((response, seconds))
+        return True
+
+    def respond(self, command, params) -> dict:
+        key = command_key(command, params)
+        queue = self._queues.get(key)
+        if queue:
+            self._last[key] = queue.popleft()
+        entry = self._last.get(key)
+        if entry is None:
+            return {"status": 500, "value": {
+                "error": "unknown error",
+                "message": f"Replay: no recorded response for {key}",
+            }}
+        response, seconds = entry
+        if self.delays:
+            time.sleep(seconds)
+        return copy.deepcopy(response)
+
+
+RECORDER = Recorder()
+PLAYER = Player()
+
+
+class _RecordingTransport(AppiumConnection):
+    def execute(self, command, params):
+        recorded = _plain(params)           # execute() strips the URL parameters
+        start = time.perf_counter()
+        response = super().execute(command, params)
+        # Copied now: WebDriver.execute() unwraps elements in place afterwards.
+        RECORDER.add(command, recorded, _plain(response), time.perf_counter() - start)
+        return response
+
+
+class _ReplayTransport(AppiumConnection):
+    def execute(self, command, params):
+        return PLAYER.respond(command, params)
+
+
+class RecordingConnection(InstrumentedConnection, _RecordingTransport):
+    """InstrumentedConnection that also records each command and response."""
+
+
+class ReplayConnection(InstrumentedConnection, _ReplayTransport):
+    """InstrumentedConnection answered from a recording instead of Appium."""
+
+
+def connection_for(appium_url: str, keep_alive: bool = True) -> InstrumentedConnection:
+    """The connection class the current mode (normal, record, replay) calls for."""
+    if PLAYER.directory is not None:
+        return ReplayConnection(appium_url, keep_alive=keep_alive)
+    if RECORDER.directory is not None:
+        return RecordingConnection(appium_url, keep_alive=keep_alive)
+    return InstrumentedConnection(appium_url, keep_alive=keep_alive)
+
+
+# ----------------------------------------------------------------------
+# pytest plugin
+# ----------------------------------------------------------------------
+
+def pytest_addoption(parser):
+    group = parser.getgroup("appium")
+    group.addoption(
+        "--record", metavar="DIR", default=None,
+        help="Record each test's WebDriver traffic into DIR.",
+    )
+    group.addoption(
+        "--replay", metavar="DIR", default=None,
+        help="Answer WebDriver commands from the recordings in DIR (no device needed).",
+    )
+    group.addoption(
+        "--replay-delays", action="store_true", default=False,
+        help="With --replay, wait each command's recorded duration.",
+    )
+
+
+def pytest_configure(config):
+    record, replay = config.getoption("--record"), config.getoption("--replay")
+    if record and replay:
+        raise pytest.UsageError("--record and --replay are mutually exclusive")
+    if (record or replay) and (config.getoption("--driver-pool") or config.getoption("--prewarm")):
+        raise pytest.UsageError("--record/--replay need one session per test; "
+                                "drop --driver-pool/--prewarm")
+    RECORDER.directory = record
+    PLAYER.directory = replay
+    PLAYER.delays = config.getoption("--replay-delays")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    if PLAYER.directory is not None and not PLAYER.load(item.nodeid):
+        pytest.skip(f"no recording in {PLAYER.directory}")
+
+
+def pytest_runtest_logreport(report):
+    if report.when == "teardown" and RECORDER.directory is not None:
+        RECORDER.save(report.nodeid)
@@ -0,0 +1,180 @@
+"""
+framework/scheduling.py
+
+Test scheduler — runs tests grouped by the screen and app state they
+start from, so consecutive tests need as little navigation as possible.
+
+Tests declare their starting point with a marker (unmarked tests start
+on the home screen in the default state):
+
+    @pytest.mark.start_screen(SIDEBAR)
+    @pytest.mark.start_screen(HOME, state="seeded")
+
+A test keeps its own UI step to its start screen (HomePage.open_sidebar(),
+HomePage.tap_fab()); those steps do nothing when the screen is already
+showing, so consecutive sidebar tests share one opened drawer.
+
+At collection time tests are bucketed by state, then by screen, and the
+buckets are ordered greedily along the cheapest transitions of the
+navigation graph (framework/navigation.py), starting from home.  Tests
+keep their relative order inside a bucket.
+
+The driver fixture pairs this with a light reset: when the previous test
+in this process passed and shared the state, the app is navigated
+straight to the next start screen (often a no-op) instead of being reset
+to home first.  The terminal summary compares the measured light and
+full resets and the estimated transition cost of both orders, each with
+light resets.
+
+--no-schedule keeps pytest's order and always does a full reset.
+
+conftest.py imports this module before registering it as a plugin, so it
+opts out of assertion rewriting: PYTEST_DONT_REWRITE
+"""
+
+from collections import namedtuple
+
+from framework.navigation import EDGES, HOME, Navigator
+
+DEFAULT_STATE = "default"
+
+Start = namedtuple("Start", "screen state")
+
+_NAVIGATOR = Navigator(None)
+# Estimated seconds for a full reset: relaunch, then walk from home
+_FULL_RESET_COST = next(edge.cost for edge in EDGES if edge.source is None)
+
+_STARTS = {}            # nodeid → Start
+_PREVIOUS = {"start": None, "passed": False}
+_FAILED = set()         # nodeids with a failed phase so far
+_RESETS = {}            # "light"/"full"/"warm" → [seconds, ...]
+_ESTIMATES = {}         # "default order"/"scheduled" → estimated seconds
+
+
+def start_of(item) -> Start:
+    """The screen and state *item* declares it starts from."""
+    marker = item.get_closest_marker("start_screen")
+    if marker is None:
+        return Start(HOME, DEFAULT_STATE)
+    screen = marker.args[0] if marker.args else marker.kwargs.get("screen", HOME)
+    return Start(screen, marker.kwargs.get("state", DEFAULT_STATE))
+
+
+def path_cost(source: str, target: str) -> float:
+    return sum(edge.cost for edge in _NAVIGATOR.path(source, target))
+
+
+def transition_cost(previous, start: Start, light: bool = True) -> float:
+    """Estimated reset cost of running a test starting at *start* after *previous*."""
+    if light and previous is not None and previous.state == start.state:
+        return path_cost(previous.screen, start.screen)
+    return _FULL_RESET_COST + path_cost(HOME, start.screen)
+
+
+def schedule(items, start=start_of) -> list:
+    """Return *items* reordered by state, then along the cheapest screen transitions."""
+    buckets = {}
+    for item in items:
+        buckets.setdefault(start(item), []).append(item)
+    states = list(dict.fromkeys([DEFAULT_STATE] + [s.state for s in buckets]))
+    ordered = []
+    for state in states:
+        pending = [s for s in buckets if s.state == state]
+        current = Start(HOME, state)
+        while pending:
+            # min() keeps the first bucket (collection order) on ties
+            nxt = min(pending, key=lambda s: path_cost(current.screen, s.screen))
+            pending.remove(nxt)
+            ordered.extend(buckets[nxt])
+            current = nxt
+    return ordered
+
+
+def estimate(items, light: bool, start=start_of) -> float:
+    """Estimated total reset cost of running *items* in this order."""
+    total, previous = 0.0, None
+    for item in items:
+        current = start(item)
+        total += transition_cost(previous, current, light)
+        previous = current
+    return total
+
+
+def can_reset_lightly(item) -> bool:
+    """True when the previous test passed and left the app in *item*'s state."""
+    previous = _PREVIOUS["start"]
+    return (item.config.getoption("schedule")
+            and _PREVIOUS["passed"]
+            and previous is not None
+            and previous.state == start_of(item).state)
+
+
+def record_reset(item, kind: str, seconds: float) -> None:
+    """Attach a reset ("light", "full" or "warm") and its duration to *item*'s report."""
+    item.user_properties.append(("reset", (kind, round(seconds, 3))))
+
+
+# ----------------------------------------------------------------------
+# pytest plugin
+# ----------------------------------------------------------------------
+
+def pytest_addoption(parser):
+    group = parser.getgroup("appium")
+    group.addoption(
+        "--no-schedule", action="store_false", dest="schedule", default=True,
+        help="Keep pytest's test order and fully reset the app before every test.",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "start_screen(screen, state='default'): screen (framework.navigation) "
+        "and app state the test starts from; used to order tests and skip resets.",
+    )
+
+
+def uses_app(item) -> bool:
+    """True for tests that drive the app (the driver fixture resets it)."""
+    return "driver" in getattr(item, "fixturenames", ())
+
+
+def pytest_collection_modifyitems(config, items):
+    app_items = [item for item in items if uses_app(item)]
+    for item in app_items:
+        _STARTS[item.nodeid] = start_of(item)
+    if not config.getoption("schedule"):
+        return
+    # Both orders are costed with the same (light) resets, so the
+    # difference is the ordering alone.  Tests without the app (unit
+    # tests) keep their order, ahead of the scheduled ones.
+    _ESTIMATES["default order"] = estimate(app_items, light=True)
+    scheduled = schedule(app_items)
+    _ESTIMATES["scheduled"] = estimate(scheduled, light=True)
+    items[:] = [item for item in items if not uses_app(item)] + scheduled
+
+
+def pytest_runtest_logreport(report):
+    # Collected from the reports so pytest-xdist runs are counted as well.
+    if report.when == "setup":
+        for name, value in report.user_properties:
+            if name == "reset":
+                _RESETS.setdefault(value[0], []).append(value[1])
+    if report.failed:
+        _FAILED.add(report.nodeid)
+    if report.when == "teardown" and report.nodeid in _STARTS:
+        _PREVIOUS["start"] = _STARTS[report.nodeid]
+        _PREVIOUS["passed"] = report.nodeid not in _FAILED
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not _RESETS:
+        return
+    terminalreporter.write_sep("-", "test scheduling")
+    for kind, times in _RESETS.items():
+        terminalreporter.write_line(
+            f"{kind} resets: {len(times):3}  total {sum(times):6.2f}s  "
+            f"mean {sum(times) / len(times):.2f}s")
+    if _ESTIMATES:
+        terminalreporter.write_line("estimated reset cost: " + ", ".join(
+            f"{name} {seconds:.1f}s" for name, seconds in _ESTIMATES.items()))
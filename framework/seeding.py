@@ -0,0 +1,155 @@
+"""
+framework/seeding.py
+
+Bulk task seeding without the add-task UI.
+
+Creating a task through the UI (FAB → title → Save) costs several seconds,
+which rules out scenarios that need hundreds of tasks.  TaskSeeder writes
+the rows straight into the app's Room database with sqlite3 over
+`mobile: shell`, a few hundred tasks per shell call:
+
+    1. force-stop org.tasks (so the app re-reads the database on launch)
+    2. INSERT the tasks, tagged with a "seed-" remoteId
+    3. hand the database files back to the app's uid and SELinux label
+
+The caller relaunches the app afterwards (the seed_tasks fixture does this
+through the usual app reset).  clear() deletes only seeded rows, so tasks
+created through the UI by other tests are left alone.
+
+Requirements on a real device: a rootable emulator image (google_apis,
+`su 0`) with sqlite3, and an Appium server started with
+`--allow-insecure adb_shell`.  FakeAppiumServer supports the same commands.
+
+Keep the UI path (HomePage.tap_fab / TaskPage) for tests that verify task
+creation itself; use seeding for everything that only needs data present.
+"""
+
+import shlex
+import time
+import uuid
+from dataclasses import dataclass
+
+APP_PACKAGE = "org.tasks"
+APP_DATA_DIR = f"/data/data/{APP_PACKAGE}"
+DB_PATH = f"{APP_DATA_DIR}/databases/database"
+
+# Shell prefix that grants access to another app's private data
+ROOT_PREFIX = ("su", "0")
+# Tag stored in tasks.remoteId so seeded rows can be found and removed
+SEED_PREFIX = "seed-"
+# Rows per sqlite3 invocation — keeps each adb command line well below its limit
+CHUNK_SIZE = 100
+
+# Importance values used by Tasks.org (tasks.importance)
+IMPORTANCE_HIGH, IMPORTANCE_MEDIUM, IMPORTANCE_LOW, IMPORTANCE_NONE = range(4)
+
+_COLUMNS = ("title", "notes", "importance", "dueDate", "hideUntil", "created",
+            "modified", "completed", "deleted", "estimatedSeconds",
+            "elapsedSeconds", "timerStart", "notificationFlags", "lastNotified",
+            "collapsed", "parent", "remoteId")
+
+
+class SeedingError(RuntimeError):
+    """A seeding shell command failed on the device."""
+
+
+@dataclass(frozen=True)
+class SeedTask:
+    """One task to insert.  *due* and *completed* are epoch milliseconds (0 = none)."""
+
+    title: str
+    notes: str = ""
+    importance: int = IMPORTANCE_NONE
+    due: int = 0
+    completed: int = 0
+
+
+def _sql_literal(value) -> str:
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return str(int(value))
+
+
+def insert_sql(tasks, now_ms: int = None) -> str:
+    """INSERT statement creating *tasks* (SeedTask instances) in one transaction."""
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    rows = []
+    for offset, task in enumerate(tasks):
+        # Distinct creation times keep the app's default sort stable.
+        created = now_ms + offset
+        values = (task.title, task.notes, task.importance, task.due, 0, created,
+                  created, task.completed, 0, 0, 0, 0, 0, 0, 0, 0,
+                  SEED_PREFIX + uuid.uuid4().hex)
+        rows.append("(" + ",".join(_sql_literal(v) for v in values) + ")")
+    return (f"BEGIN;INSERT INTO tasks ({','.join(_COLUMNS)}) VALUES "
+            + ",".join(rows) + ";COMMIT;")
+
+
+def as_seed_tasks(tasks) -> list:
+    """Accept titles, SeedTask instances or a count and return SeedTask instances."""
+    if isinstance(tasks, int):
+        return [SeedTask(f"Seeded task {i + 1:04d}") for i in range(tasks)]
+    return [t if isinstance(t, SeedTask) else SeedTask(str(t)) for t in tasks]
+
+
+class TaskSeeder:
+    """
+    Creates and removes tasks through the device shell.
+
+    Typical flow:
+        seeder = TaskSeeder(driver)
+        seeder.seed(300)                    # or titles / SeedTask objects
+        ...relaunch the app, run the scenario...
+        seeder.clear()
+    """
+
+    def __init__(self, driver, db_path: str = DB_PATH, root_prefix=ROOT_PREFIX):
+        self.driver = driver
+        self.db_path = db_path
+        self.root_prefix = tuple(root_prefix)
+
+    def shell(self, *argv) -> str:
+        """Run *argv* on the device as root and return its output."""
+        command = self.root_prefix + argv
+        try:
+            return self.driver.execute_script("mobile: shell", {
+                "command": command[0],
+                # adb joins the arguments into one line for the device shell
+                "args": [shlex.quote(str(arg)) for arg in command[1:]],
+            }) or ""
+        except Exception as exc:
+            raise SeedingError(f"shell {' '.join(argv[:2])} ... failed: {exc}") from exc
+
+    def sql(self, statements: str) -> str:
+        return self.shell("sqlite3", self.db_path, statements)
+
+    def seed(self, tasks) -> list:
+        """
+        Insert *tasks* (a count, titles or SeedTask objects) and return the
+        titles in insertion order.  The app is force-stopped first and must
+        be relaunched by the caller.
+        """
+        tasks = as_seed_tasks(tasks)
+        if not tasks:
+            return []
+        self.shell("am", "force-stop", APP_PACKAGE)
+        now_ms = int(time.time() * 1000)
+        for start in range(0, len(tasks), CHUNK_SIZE):
+            self.sql(insert_sql(tasks[start:start + CHUNK_SIZE], now_ms + start))
+        self._restore_ownership()
+        print(f"[seeding] inserted {len(tasks)} tasks")
+        return [t.title for t in tasks]
+
+    def clear(self) -> None:
+        """Delete every seeded task (UI-created tasks are kept)."""
+        self.shell("am", "force-stop", APP_PACKAGE)
+        self.sql(f"DELETE FROM tasks WHERE remoteId LIKE '{SEED_PREFIX}%';")
+        self._restore_ownership()
+
+    def _restore_ownership(self) -> None:
+        # sqlite3 ran as root: journal/WAL files it created must go back to
+        # the app, or the app cannot open its database.
+        owner = self.shell("stat", "-c", "%u:%g", APP_DATA_DIR).strip()
+        databases = self.db_path.rsplit("/", 1)[0]
+        self.shell("chown", "-R", owner, databases)
+        self.shell("restorecon", "-R", databases)
@@ -0,0 +1,361 @@
+"""
+framework/sharding.py
+
+Timing-based sharding of the suite across CI jobs.
+
+    pytest tests/ --shard=2/3                  # run the second of three shards
+    pytest tests/ --collect-only -q --shard=2/3
+    python -m framework.sharding plan 3        # every shard's tests and load
+    python -m framework.sharding merge shards/*/ --out=reports
+
+Every run records how long each test took end to end (setup, call and
+teardown, so resets and navigation are included) in
+reports/durations.json, and unsharded runs on a device (not --replay or
+--fake-appium) append it to the history in .timings/test_durations.json.  With --shard=I/N the collected tests are
+split into N shards by greedy longest-first bin packing on the median of
+each test's recorded durations: tests are taken slowest first and each
+goes to the shard with the least estimated time so far.  Tests without
+history count as the median known test.  Collection order and the history
+file are the only inputs, so every shard job computes the same split, and
+the split can be checked locally without a device.  Inside a shard the
+scheduler (framework/scheduling.py) still orders the tests by start screen.
+
+"merge" combines the reports directories of the shard jobs into one:
+report.html (the pytest-html results of all shards, summary counts and
+WebDriver tables recomputed), commands.json and durations.json.  With
+--history it also appends the shards' durations to the history file,
+which is how CI keeps the history current across parallel jobs.
+
+conftest.py imports this module before registering it as a plugin, so it
+opts out of assertion rewriting: PYTEST_DONT_REWRITE
+"""
+
+import argparse
+import contextlib
+import html
+import io
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from framework.command_timing import summary_tables, write_commands_json
+
+HISTORY_PATH = Path(".timings") / "test_durations.json"
+DURATIONS_JSON = Path("reports") / "durations.json"
+
+MAX_SAMPLES = 10          # per test; oldest dropped first
+DEFAULT_DURATION = 30.0   # seconds assumed per test while there is no history at all
+SLOWEST_COMMANDS = 10     # rows of the "slowest commands" table in a merged report
+
+
+def parse_shard(value: str):
+    """"I/N" → (I, N) with 1 <= I <= N."""
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", value or "")
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise ValueError(f"expected I/N with 1 <= I <= N, got {value!r}")
+    return int(match.group(1)), int(match.group(2))
+
+
+# ----------------------------------------------------------------------
+# Duration history
+# ----------------------------------------------------------------------
+
+def load_history(path) -> dict:
+    """{nodeid: [seconds, ...]} from *path*; empty when missing or unreadable."""
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def update_history(path, durations) -> None:
+    """Append one run's {nodeid: seconds} to the history file (atomic replace)."""
+    if not durations:
+        return
+    path = Path(path)
+    history = load_history(path)
+    for nodeid, seconds in durations.items():
+        bucket = history.setdefault(nodeid, [])
+        bucket.append(round(seconds, 3))
+        del bucket[:-MAX_SAMPLES]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w") as fh:
+        json.dump(history, fh, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def estimates(nodeids, history) -> dict:
+    """Expected seconds per test: its median duration, else the median known test."""
+    known = {n: statistics.median(history[n]) for n in nodeids if history.get(n)}
+    fallback = statistics.median(known.values()) if known else DEFAULT_DURATION
+    return {n: known.get(n, fallback) for n in nodeids}
+
+
+def split(nodeids, history, shards: int) -> list:
+    """
+    Partition *nodeids* into *shards* lists by longest-first bin packing.
+
+    Each list keeps collection order.  Ties (equal estimates, equally
+    loaded shards) are broken by collection order and shard number, so
+    the result only depends on the inputs.
+    """
+    expected = estimates(nodeids, history)
+    position = {n: i for i, n in enumerate(nodeids)}
+    loads = [0.0] * shards
+    assigned = [[] for _ in range(shards)]
+    for nodeid in sorted(nodeids, key=lambda n: (-expected[n], position[n])):
+        target = min(range(shards), key=lambda i: (loads[i], i))
+        loads[target] += expected[nodeid]
+        assigned[target].append(nodeid)
+    return [sorted(tests, key=position.get) for tests in assigned]
+
+
+def shard_loads(shards, history) -> list:
+    """Estimated seconds of each shard returned by split()."""
+    expected = estimates([n for tests in shards for n in tests], history)
+    return [sum(expected[n] for n in tests) for tests in shards]
+
+
+# ----------------------------------------------------------------------
+# Merging shard reports
+# ----------------------------------------------------------------------
+
+_BLOB_RE = re.compile(r'(<div id="data-container" data-jsonblob=")([^"]*)(")')
+_RUN_COUNT_RE = re.compile(r'<p class="run-count">(\d+) tests? took ([^<]*?)\.</p>')
+_FILTER_RE = re.compile(r'(data-test-result="(\w+)") ?(?:disabled)?>(\s*<span class="\2">)(\d+)')
+_POSTFIX_RE = re.compile(r'(<div class="additional-summary postfix">).*?(</div>)', re.S)
+
+
+def _parse_took(text: str) -> float:
+    """Seconds from pytest-html's "904 ms" or "00:01:23" run time."""
+    if text.endswith(" ms"):
+        return float(text[:-3]) / 1000
+    seconds = 0.0
+    for part in text.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def _format_took(seconds: float) -> str:
+    if seconds < 1:
+        return f"{round(seconds * 1000)} ms"
+    return time.strftime("%H:%M:%S", time.gmtime(seconds))
+
+
+def merge_html(pages, records=None) -> str:
+    """
+    One pytest-html report (self-contained) from the shards' *pages*.
+
+    The first page is the template; the results of all pages are combined
+    in its data blob, and the run count, the outcome filters and (given
+    the merged command *records*) the WebDriver summary tables recomputed.
+    """
+    merged, tests, slowest = None, {}, 0.0
+    for page in pages:
+        match = _BLOB_RE.search(page)
+        if match is None:
+            raise ValueError("not a pytest-html report (no data-container)")
+        blob = json.loads(html.unescape(match.group(2)))
+        tests.update(blob["tests"])
+        took = _RUN_COUNT_RE.search(page)
+        if took:
+            slowest = max(slowest, _parse_took(took.group(2)))
+        if merged is None:
+            merged, template = blob, page
+    merged["tests"] = tests
+
+    counts = {}
+    for results in tests.values():
+        for result in results:
+            key = result["result"].lower()
+            counts[key] = counts.get(key, 0) + 1
+
+    def filter_count(match):
+        n = counts.get(match.group(2), 0)
+        return f"{match.group(1)} {'' if n else 'disabled'}>{match.group(3)}{n}"
+
+    page = _BLOB_RE.sub(lambda m: m.group(1) + html.escape(json.dumps(merged)) + m.group(3),
+                        template, count=1)
+    page = _RUN_COUNT_RE.sub(
+        f'<p class="run-count">{len(tests)} tests took {_format_took(slowest)} '
+        f'(slowest of {len(pages)} shards).</p>', page, count=1)
+    page = _FILTER_RE.sub(filter_count, page)
+    if records:
+        tables = "\n        ".join(summary_tables(records, SLOWEST_COMMANDS))
+        page = _POSTFIX_RE.sub(lambda m: f"{m.group(1)}\n        {tables}\n      {m.group(2)}",
+                               page, count=1)
+    return page
+
+
+def merge_reports(directories, out, history=None) -> dict:
+    """
+    Merge the shard *directories* (each a copy of a shard's reports/) into
+    *out*; returns what was merged, for printing.
+    """
+    out = Path(out)
+    out.mkdir(parents=True, exist_ok=True)
+    pages, records, durations = [], [], {}
+    for directory in map(Path, directories):
+        if (directory / "report.html").exists():
+            pages.append((directory / "report.html").read_text(encoding="utf-8"))
+        if (directory / "commands.json").exists():
+            records.extend(json.loads((directory / "commands.json").read_text())["records"])
+        if (directory / "durations.json").exists():
+            durations.update(json.loads((directory / "durations.json").read_text()))
+    if pages:
+        (out / "report.html").write_text(merge_html(pages, records), encoding="utf-8")
+    if records:
+        write_commands_json(records, out / "commands.json")
+    if durations:
+        (out / "durations.json").write_text(json.dumps(durations, indent=1, sort_keys=True))
+    if history is not None:
+        update_history(history, durations)
+    return {"reports": len(pages), "commands": len(records), "tests": len(durations)}
+
+
+# ----------------------------------------------------------------------
+# pytest plugin
+# ----------------------------------------------------------------------
+
+_DURATIONS = {}       # nodeid → seconds over all phases, this run
+_RAN = set()          # nodeids whose call phase ran (not skipped)
+_SHARD = {}           # "index", "count", "selected", "loads" of this run's shard
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("appium")
+    group.addoption(
+        "--shard", metavar="I/N", default=None,
+        help="Run only the I-th of N shards, balanced on recorded test durations.",
+    )
+    group.addoption(
+        "--test-durations", metavar="PATH", default=str(HISTORY_PATH),
+        help="Per-test duration history used to balance --shard.",
+    )
+
+
+def pytest_configure(config):
+    value = config.getoption("--shard")
+    if value is not None:
+        try:
+            parse_shard(value)
+        except ValueError as e:
+            raise pytest.UsageError(f"--shard: {e}") from None
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config, items):
+    # tryfirst: deselect before the scheduler orders what is left.
+    value = config.getoption("--shard")
+    if value is None:
+        return
+    index, count = parse_shard(value)
+    history = load_history(config.getoption("--test-durations"))
+    shards = split([item.nodeid for item in items], history, count)
+    selected = set(shards[index - 1])
+    config.hook.pytest_deselected(items=[i for i in items if i.nodeid not in selected])
+    items[:] = [i for i in items if i.nodeid in selected]
+    _SHARD.update(index=index, count=count, selected=len(items),
+                  loads=shard_loads(shards, history))
+
+
+def pytest_runtest_logreport(report):
+    _DURATIONS[report.nodeid] = _DURATIONS.get(report.nodeid, 0.0) + report.duration
+    if report.when == "call" and not report.skipped:
+        _RAN.add(report.nodeid)
+
+
+def pytest_sessionfinish(session):
+    if hasattr(session.config, "workerinput"):
+        return
+    durations = {n: round(s, 3) for n, s in _DURATIONS.items() if n in _RAN}
+    if not durations:
+        return
+    DURATIONS_JSON.parent.mkdir(parents=True, exist_ok=True)
+    DURATIONS_JSON.write_text(json.dumps(durations, indent=1, sort_keys=True))
+    # Shards leave the history alone so later shards of the same run split
+    # identically; "merge --history" appends their durations afterwards.
+    # Replayed and fake-server runs say nothing about the device.
+    config = session.config
+    if (config.getoption("--shard") is None and not config.getoption("--replay")
+            and not config.getoption("--fake-appium")):
+        update_history(config.getoption("--test-durations"), durations)
+
+
+def pytest_report_collectionfinish(config, start_path, items):
+    if not _SHARD:
+        return None
+    loads = ", ".join(f"{s:.1f}s" for s in _SHARD["loads"])
+    return (f"shard {_SHARD['index']}/{_SHARD['count']}: {_SHARD['selected']} tests, "
+            f"estimated {_SHARD['loads'][_SHARD['index'] - 1]:.1f}s (all shards: {loads})")
+
+
+# ----------------------------------------------------------------------
+# Command line
+# ----------------------------------------------------------------------
+
+class _Collector:
+    """pytest plugin that keeps the collected node ids."""
+
+    def __init__(self):
+        self.nodeids = []
+
+    def pytest_collection_finish(self, session):
+        self.nodeids = [item.nodeid for item in session.items]
+
+
+def collect(paths) -> list:
+    """Node ids pytest collects from *paths*, in collection order."""
+    collector = _Collector()
+    with contextlib.redirect_stdout(io.StringIO()):
+        code = pytest.main(["--collect-only", "-q", "-p", "no:cacheprovider",
+                            "-o", "addopts=", *paths], plugins=[collector])
+    if code != 0:
+        raise RuntimeError(f"test collection failed (pytest exit code {code})")
+    return collector.nodeids
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    plan = commands.add_parser("plan", help="Show how the collected tests split into N shards.")
+    plan.add_argument("shards", type=int)
+    plan.add_argument("paths", nargs="*", default=["tests"])
+    plan.add_argument("--history", default=str(HISTORY_PATH))
+    merge = commands.add_parser("merge", help="Combine the shards' reports directories.")
+    merge.add_argument("directories", nargs="+")
+    merge.add_argument("--out", default="reports")
+    merge.add_argument("--history", default=None,
+                       help="Also append the shards' test durations to this history file.")
+    args = parser.parse_args(argv)
+
+    if args.command == "merge":
+        merged = merge_reports(args.directories, args.out, args.history)
+        print(f"[sharding] merged {merged['reports']} reports, {merged['tests']} test "
+              f"durations and {merged['commands']} commands into {args.out}")
+        return 0 if merged["reports"] else 1
+
+    if args.shards < 1:
+        parser.error("shards must be at least 1")
+    history = load_history(args.history)
+    nodeids = collect(args.paths)
+    shards = split(nodeids, history, args.shards)
+    expected = estimates(nodeids, history)
+    for number, (tests, load) in enumerate(zip(shards, shard_loads(shards, history)), 1):
+        print(f"shard {number}/{args.shards}: {len(tests)} tests, estimated {load:.1f}s")
+        for nodeid in tests:
+            known = "" if history.get(nodeid) else "  (no history)"
+            print(f"    {expected[nodeid]:7.1f}s  {nodeid}{known}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+framework/timeouts.py
+
+Learned per-locator timeouts.
+
+Every successful wait records how long the element took to appear, keyed
+by locator and environment ("ci" or "local").  Once a locator has enough
+samples, its timeout becomes
+
+    min(default, max(MIN_TIMEOUT, p95 * MARGIN + SLACK))
+
+so checks for elements that normally show up in 300ms no longer sit out
+a 10-15s budget when they fail — which matters most for negative checks
+such as is_empty_state_visible().  Passing an explicit timeout to a page
+object method always wins over the learned value.
+
+History lives in .timings/locator_latencies.json (cached between CI runs).
+Each pytest-xdist worker merges its samples into it under a lock file
+(framework/lockfile.py), so concurrent workers do not overwrite each
+other's samples.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from framework.lockfile import held
+
+HISTORY_PATH = Path(".timings") / "locator_latencies.json"
+
+PERCENTILE = 0.95
+MARGIN = 2.0          # multiplier on the percentile
+SLACK = 1.0           # seconds added on top, for HTTP/device jitter
+MIN_TIMEOUT = 1.0
+MIN_SAMPLES = 5
+MAX_SAMPLES = 200     # per locator and environment; oldest dropped first
+LOCK_TIMEOUT = 30.0   # seconds save() waits for another worker's merge
+
+
+def locator_key(locator) -> str:
+    """Stable string key for a (by, value) locator, or a caller-chosen name."""
+    if isinstance(locator, str):
+        return locator
+    return f"{locator[0]}={locator[1]}"
+
+
+def percentile(samples, fraction: float) -> float:
+    """Nearest-rank percentile of *samples* (non-empty)."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+class LatencyHistory:
+    """
+    Observed appearance latencies per locator, and the budgets derived from them.
+
+    Typical flow:
+        LATENCIES.load(HISTORY_PATH, env="ci")
+        timeout = LATENCIES.timeout_for(locator, default=10)
+        ...
+        LATENCIES.record(locator, elapsed)
+        LATENCIES.save()
+    """
+
+    def __init__(self, env: str = "local", enabled: bool = True):
+        self.env = env
+        self.enabled = enabled
+        self.path = None
+        self._samples = {}      # env → {key: [seconds, ...]}
+        self._new = {}          # samples recorded by this process, for merging
+        self._lock = threading.Lock()
+
+    def load(self, path, env: str) -> None:
+        self.path = Path(path)
+        self.env = env
+        try:
+            self._samples = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            self._samples = {}
+
+    def samples(self, locator) -> list:
+        return list(self._samples.get(self.env, {}).get(locator_key(locator), ()))
+
+    def record(self, locator, seconds: float) -> None:
+        """Remember that *locator* appeared after *seconds*."""
+        key = locator_key(locator)
+        with self._lock:
+            for store in (self._samples, self._new):
+                bucket = store.setdefault(self.env, {}).setdefault(key, [])
+                bucket.append(round(seconds, 3))
+                del bucket[:-MAX_SAMPLES]
+
+    def timeout_for(self, locator, default: float) -> float:
+        """Learned timeout for *locator*, never above *default*."""
+        samples = self.samples(locator) if self.enabled else ()
+        if len(samples) < MIN_SAMPLES:
+            return default
+        learned = max(MIN_TIMEOUT, percentile(samples, PERCENTILE) * MARGIN + SLACK)
+        return min(default, learned)
+
+    def save(self) -> None:
+        """
+        Merge this process's samples into the history file.
+
+        The read-merge-write runs under a lock file shared by every worker
+        and ends with an atomic replace, so no worker loses samples or
+        reads a half-written file.
+        """
+        if self.path is None or not self._new:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            lock = self.path.with_name(self.path.name + ".lock")
+            with held(lock, timeout=LOCK_TIMEOUT):
+                try:
+                    merged = json.loads(self.path.read_text())
+                except (OSError, ValueError):
+                    merged = {}
+                for env, keys in self._new.items():
+                    for key, values in keys.items():
+                        bucket = merged.setdefault(env, {}).setdefault(key, [])
+                        bucket.extend(values)
+                        del bucket[:-MAX_SAMPLES]
+                fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+                with os.fdopen(fd, "w") as fh:
+                    json.dump(merged, fh, indent=1, sort_keys=True)
+                os.replace(tmp, self.path)
+        except TimeoutError as exc:
+            print(f"[timeouts] WARNING: latency samples not saved: {exc}")
+            return
+        self._new = {}
+
+
+# The history the page objects consult; configured by conftest.py.
+LATENCIES = LatencyHistory()
@@ -0,0 +1,152 @@
+"""
+framework/waits.py
+
+Wait primitives shared by the page objects and fixtures.
+
+Three rules keep waits fast and bounded:
+
+* Presence is waited for on the device.  UiAutomator2 polls the UI tree
+  itself while the session's implicit wait is running, so a find_element
+  call returns as soon as the element appears, without a client
+  round-trip per poll.  The implicit wait is a fixed IMPLICIT_WAIT slice
+  and the client repeats the find until the locator's own timeout, so
+  per-locator budgets do not each cost a setTimeouts call.
+* Anything the server cannot wait for (displayed/enabled, snapshot
+  checks, app state) is polled from the client with a short, growing
+  interval — 50ms first, backing off to 500ms — and the implicit wait is
+  forced to 0 for those polls, so the two kinds of wait never stack.
+* Transitions that leave no new element to wait for (a closing drawer,
+  a list refreshing after Save, a dismissed dialog) are waited out by
+  comparing hierarchy fingerprints: wait_for_settled() returns once the
+  screen has changed and two consecutive snapshots agree.
+
+The session's implicit wait is tracked per driver so it is only sent to
+the server when it actually changes (between 0 and IMPLICIT_WAIT).
+Always go through set_implicit_wait() rather than calling
+driver.implicitly_wait().
+"""
+
+import time
+import weakref
+
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+
+from framework.hierarchy import fingerprint, parse_hierarchy
+
+POLL_INITIAL = 0.05
+POLL_FACTOR = 1.5
+POLL_MAX = 0.5
+# Upper bound for a transition to start and settle
+SETTLE_TIMEOUT = 5
+# Implicit wait of every waited find; longer timeouts repeat the find
+IMPLICIT_WAIT = 1.0
+
+_IGNORED = (NoSuchElementException, StaleElementReferenceException)
+
+# driver → implicit wait (seconds) last sent to its session
+_implicit_waits = weakref.WeakKeyDictionary()
+
+
+def set_implicit_wait(driver, seconds: float) -> None:
+    """Set the session's implicit wait, skipping the call if unchanged."""
+    if _implicit_waits.get(driver) != seconds:
+        driver.implicitly_wait(seconds)
+        _implicit_waits[driver] = seconds
+
+
+def adopt_new_session(driver) -> None:
+    """Record that a new session starts with no implicit wait (the W3C default)."""
+    _implicit_waits[driver] = 0
+
+
+def intervals(initial: float = POLL_INITIAL, factor: float = POLL_FACTOR, maximum: float = POLL_MAX):
+    """Yield the backoff sleep intervals: initial, initial*factor, ... capped at maximum."""
+    interval = initial
+    while True:
+        yield interval
+        interval = min(interval * factor, maximum)
+
+
+def poll_until(condition, timeout: float, message: str = "", ignored=_IGNORED):
+    """
+    Call *condition* until it returns a truthy value and return that value.
+
+    The first check happens immediately; later ones back off from 50ms to
+    500ms.  Raises TimeoutException once *timeout* seconds have passed.
+    """
+    deadline = time.monotonic() + timeout
+    for interval in intervals():
+        try:
+            value = condition()
+            if value:
+                return value
+        except ignored:
+            pass
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutException(message or f"Condition not met within {timeout}s")
+        time.sleep(min(interval, remaining))
+
+
+def find_on_device(driver, locator, timeout: float):
+    """
+    Return the first element matching *locator*, letting the device poll
+    for up to *timeout* seconds.
+
+    Each find_element call waits up to IMPLICIT_WAIT on the device and is
+    repeated until *timeout* has passed; the last fraction of a second is
+    polled from the client with no implicit wait, so the call never
+    overruns its timeout.  Raises TimeoutException, like WebDriverWait,
+    when nothing appears.
+    """
+    deadline = time.monotonic() + timeout
+    pauses = intervals()
+    while True:
+        server_wait = IMPLICIT_WAIT if deadline - time.monotonic() >= IMPLICIT_WAIT else 0
+        set_implicit_wait(driver, server_wait)
+        try:
+            return driver.find_element(*locator)
+        except NoSuchElementException:
+            pass
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutException(f"{locator[0]}={locator[1]!r} not found within {timeout}s")
+        if not server_wait:
+            time.sleep(min(next(pauses), remaining))
+
+
+def find_all_now(driver, locator) -> list:
+    """Return every element matching *locator* right now, without waiting."""
+    set_implicit_wait(driver, 0)
+    return driver.find_elements(*locator)
+
+
+def screen_fingerprint(source) -> int:
+    """Fingerprint of a page source (see framework.hierarchy.fingerprint)."""
+    return fingerprint(parse_hierarchy(source))
+
+
+def wait_for_settled(driver, before: int, timeout: float = SETTLE_TIMEOUT):
+    """
+    Poll the hierarchy until it differs from the *before* fingerprint and
+    two consecutive snapshots agree, i.e. the transition has finished.
+
+    Returns the settled page source, or None if the screen did not change
+    and settle within *timeout*.
+    """
+    deadline = time.monotonic() + timeout
+    last = None
+    for interval in intervals():
+        source = driver.page_source
+        current = screen_fingerprint(source)
+        if current != before and current == last:
+            return source
+        last = current
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        time.sleep(min(interval, remaining))
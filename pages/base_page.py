@@ -5,82 +5,240 @@ BasePage — root class for all Page Objects.
 
 Uses AppiumBy + UiSelector (same pattern as the working demo tests)
 so locators are reliable on Compose-heavy UIs.
+
+Waiting follows framework/waits.py: element presence is waited for on the
+device (one find_element with the session's implicit wait), everything
+else is polled from the client with a short backoff, and the two never
+stack.
+
+Timeouts left as None are learned per locator from past runs
+(framework/timeouts.py); the class defaults are the upper bound.
+
+Taps that lead to a new element are followed by a wait for that element.
+Taps whose effect leaves nothing new to wait for (closing a drawer, Save
+refreshing the list, dismissing a dialog) go through transition(), which
+returns as soon as the hierarchy has changed and settled.
+
+Resolved elements are cached per session and locator until a command
+that can change the screen (framework/element_cache.py), so checking for
+an element and then tapping it, or filling a field twice, finds it once.
 """
 
+import time
+from collections import Counter
+
 from appium.webdriver.common.appiumby import AppiumBy
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+
+from framework.element_cache import ELEMENT_CACHE
+from framework.locators import HierarchySnapshot
+from framework.timeouts import LATENCIES
+from framework.waits import (
+    SETTLE_TIMEOUT,
+    find_all_now,
+    find_on_device,
+    intervals,
+    poll_until,
+    screen_fingerprint,
+    wait_for_settled,
+)
 
 
 class BasePage:
     """Common Appium actions shared by all Page Objects."""
 
     DEFAULT_TIMEOUT = 15
+    # Upper bound for visibility checks when no timeout is given
+    VISIBLE_TIMEOUT = 10
+    # From Android 8.0 (API 26) an empty EditText reports its hint as its text
+    HINT_AS_TEXT_MIN_VERSION = 8
+    # "keys": clear + send_keys through the focused field and soft keyboard;
+    # "replace": set field values directly (mobile: replaceElementValue).
+    # conftest.py sets it from --text-input.
+    TEXT_INPUT = "keys"
+
+    # Appium Inspector dump (under pages/xml/) the subclass's locators were
+    # taken from; used to validate them offline (python -m framework.locators).
+    XML_DUMP = None
 
     def __init__(self, driver):
         self.driver = driver
-        self.wait = WebDriverWait(driver, self.DEFAULT_TIMEOUT)
+
+    # ------------------------------------------------------------------
+    # Locator builders
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def text_locator(text: str) -> tuple:
+        """Locator for an element whose text is exactly *text*."""
+        return (AppiumBy.ANDROID_UIAUTOMATOR, f'new UiSelector().text("{text}")')
+
+    @staticmethod
+    def hint_locator(hint: str) -> tuple:
+        """Locator for an EditText whose hint is exactly *hint*."""
+        return (AppiumBy.XPATH, f'//android.widget.EditText[@hint="{hint}"]')
+
+    @staticmethod
+    def empty_field_locator(hint: str) -> tuple:
+        """
+        Locator for an empty EditText showing *hint* (Android 8+).
+
+        A UiSelector is resolved while UiAutomator2 walks the tree; the
+        XPath of hint_locator() first serialises the whole hierarchy.
+        """
+        return (AppiumBy.ANDROID_UIAUTOMATOR,
+                f'new UiSelector().className("android.widget.EditText").text("{hint}")')
 
     # ------------------------------------------------------------------
     # Low-level finders
     # ------------------------------------------------------------------
 
+    def find(self, locator, timeout: float = None, key=None):
+        """
+        Wait for and return a clickable element matched by *locator*.
+
+        The device waits for the element to appear; displayed/enabled are
+        then confirmed from the client.  Raises TimeoutException.  *key*
+        names the latency history entry when the locator itself varies.
+        An element already found on this screen is returned from the cache.
+        """
+        cached = ELEMENT_CACHE.get(self.driver, locator)
+        if cached is not None and (cached.clickable or cached.is_enabled()):
+            cached.clickable = True
+            return cached
+        timeout = self._budget(key or locator, timeout, self.DEFAULT_TIMEOUT)
+        start = time.monotonic()
+        deadline = start + timeout
+        element = find_on_device(self.driver, locator, timeout)
+        element = poll_until(
+            lambda: element if element.is_displayed() and element.is_enabled() else None,
+            max(deadline - time.monotonic(), 0),
+            f"{locator[0]}={locator[1]!r} not clickable within {timeout}s",
+        )
+        LATENCIES.record(key or locator, time.monotonic() - start)
+        return self._remember(locator, element, timeout, clickable=True)
+
+    def _remember(self, locator, element, timeout: float, clickable: bool = False):
+        """Cache *element* for *locator*; a stale copy is found again within *timeout*."""
+        element = ELEMENT_CACHE.put(self.driver, locator, element,
+                                    lambda: find_on_device(self.driver, locator, timeout))
+        element.clickable = getattr(element, "clickable", False) or clickable
+        return element
+
+    @staticmethod
+    def _budget(key, timeout, default) -> float:
+        """An explicit *timeout* wins; otherwise the learned one, capped at *default*."""
+        return timeout if timeout is not None else LATENCIES.timeout_for(key, default)
+
     def find_by_text(self, text: str):
         """Wait for and return an element matched by UiSelector text."""
-        return self.wait.until(
-            EC.element_to_be_clickable(
-                (AppiumBy.ANDROID_UIAUTOMATOR, f'new UiSelector().text("{text}")')
-            )
-        )
+        return self.find(self.text_locator(text))
 
     def find_by_accessibility_id(self, desc: str):
         """Wait for and return an element matched by content-desc."""
-        return self.wait.until(
-            EC.element_to_be_clickable((AppiumBy.ACCESSIBILITY_ID, desc))
-        )
+        return self.find((AppiumBy.ACCESSIBILITY_ID, desc))
 
     def find_by_hint(self, hint: str):
-        """Wait for and return an EditText matched by its hint attribute (XPath)."""
-        return self.wait.until(
-            EC.element_to_be_clickable(
-                (AppiumBy.XPATH, f'//android.widget.EditText[@hint="{hint}"]')
-            )
-        )
+        """
+        Wait for and return an EditText matched by its hint.
+
+        On Android 8+ an empty field is looked up with empty_field_locator()
+        first; the XPath on @hint is only used when that finds no single
+        usable field (it already holds text, or has not appeared yet).
+        """
+        locator = self.hint_locator(hint)
+        if self.hint_shown_as_text() and ELEMENT_CACHE.get(self.driver, locator) is None:
+            found = find_all_now(self.driver, self.empty_field_locator(hint))
+            if len(found) == 1 and found[0].is_displayed() and found[0].is_enabled():
+                return self._remember(locator, found[0], self.DEFAULT_TIMEOUT, clickable=True)
+        return self.find(locator)
+
+    def hint_shown_as_text(self) -> bool:
+        """True when the session's Android version reports hints as text."""
+        caps = self.driver.capabilities or {}
+        version = str(caps.get("platformVersion") or caps.get("appium:platformVersion") or "")
+        major = version.split(".")[0]
+        return major.isdigit() and int(major) >= self.HINT_AS_TEXT_MIN_VERSION
 
     def find_by_resource_id(self, resource_id: str):
         """Wait for and return an element matched by resource-id."""
-        return self.wait.until(
-            EC.element_to_be_clickable((AppiumBy.ID, resource_id))
-        )
+        return self.find((AppiumBy.ID, resource_id))
 
     # ------------------------------------------------------------------
     # Visibility checks
     # ------------------------------------------------------------------
 
-    def is_text_visible(self, text: str, timeout: int = 10) -> bool:
-        """Return True if an element with the given text is visible."""
+    def is_visible(self, locator, timeout: float = None, default: float = None, key=None) -> bool:
+        """
+        Return True if *locator* matches a displayed element.
+
+        Waits *timeout* seconds if given, else the learned budget capped at
+        *default* (VISIBLE_TIMEOUT when omitted).  An element cached for
+        this screen only needs its displayed state confirmed.
+        """
+        default = self.VISIBLE_TIMEOUT if default is None else default
+        timeout = self._budget(key or locator, timeout, default)
+        start = time.monotonic()
+        cached = ELEMENT_CACHE.get(self.driver, locator)
         try:
-            WebDriverWait(self.driver, timeout).until(
-                EC.visibility_of_element_located(
-                    (AppiumBy.ANDROID_UIAUTOMATOR, f'new UiSelector().text("{text}")')
-                )
-            )
-            return True
+            element = cached or find_on_device(self.driver, locator, timeout)
+            poll_until(element.is_displayed, max(start + timeout - time.monotonic(), 0))
         except TimeoutException:
             return False
+        if cached is None:
+            LATENCIES.record(key or locator, time.monotonic() - start)
+            self._remember(locator, element, timeout)
+        return True
+
+    def is_text_visible(self, text: str, timeout: int = None) -> bool:
+        """Return True if an element with the given text is visible."""
+        return self.is_visible(self.text_locator(text), timeout)
 
-    def is_accessibility_id_visible(self, desc: str, timeout: int = 10) -> bool:
+    def is_accessibility_id_visible(self, desc: str, timeout: int = None, default: int = None) -> bool:
         """Return True if an element with the given content-desc is visible."""
-        try:
-            WebDriverWait(self.driver, timeout).until(
-                EC.visibility_of_element_located(
-                    (AppiumBy.ACCESSIBILITY_ID, desc)
-                )
-            )
-            return True
-        except TimeoutException:
-            return False
+        return self.is_visible((AppiumBy.ACCESSIBILITY_ID, desc), timeout, default)
+
+    # ------------------------------------------------------------------
+    # Snapshot-backed batch checks
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> HierarchySnapshot:
+        """Fetch the current UI hierarchy once and index it for local lookups."""
+        return HierarchySnapshot.from_source(self.driver.page_source)
+
+    def visible_locators(self, locators, timeout: int = None) -> dict:
+        """
+        Return {locator: bool} telling which of *locators* are visible.
+
+        Each poll costs a single page_source fetch no matter how many
+        locators are asked about; polling stops as soon as all of them are
+        visible or *timeout* (default: the largest learned budget among
+        them) expires.
+        """
+        pending = list(dict.fromkeys(locators))
+        result = dict.fromkeys(pending, False)
+        if not pending:
+            return result
+        if timeout is None:
+            timeout = max(LATENCIES.timeout_for(loc, self.VISIBLE_TIMEOUT) for loc in pending)
+        start = time.monotonic()
+        deadline = start + timeout
+        for interval in intervals():
+            snap = self.snapshot()
+            for locator in pending:
+                result[locator] = snap.is_visible(locator)
+                if result[locator]:
+                    LATENCIES.record(locator, time.monotonic() - start)
+            pending = [loc for loc in pending if not result[loc]]
+            remaining = deadline - time.monotonic()
+            if not pending or remaining <= 0:
+                return result
+            time.sleep(min(interval, remaining))
+
+    def visible_texts(self, texts, timeout: int = None) -> dict:
+        """Return {text: bool} telling which of *texts* are visible."""
+        found = self.visible_locators([self.text_locator(t) for t in texts], timeout)
+        return {text: found[self.text_locator(text)] for text in texts}
 
     # ------------------------------------------------------------------
     # Actions
@@ -95,10 +253,71 @@ class BasePage:
         self.find_by_accessibility_id(desc).click()
 
     def type_into_hint(self, hint: str, text: str) -> None:
-        """Clear and type text into an EditText identified by its hint."""
+        """Replace the text of an EditText identified by its hint."""
         field = self.find_by_hint(hint)
-        field.clear()
-        field.send_keys(text)
+        if self.TEXT_INPUT == "replace":
+            self._replace_value(field, hint, text)
+        else:
+            field.clear()
+            field.send_keys(text)
+
+    def fill_fields(self, values: dict) -> None:
+        """
+        Set several EditTexts, given as {hint: text}, in one pass.
+
+        With TEXT_INPUT "replace" the screen's fields are matched to their
+        hints from one snapshot and one find_elements call, then each value
+        is set directly: no focus, no soft keyboard, no clear().  Fields the
+        snapshot cannot place are looked up one by one.
+        """
+        if self.TEXT_INPUT != "replace":
+            for hint, text in values.items():
+                self.type_into_hint(hint, text)
+            return
+        fields = self._fields_by_hint(values)
+        for hint, text in values.items():
+            self._replace_value(fields.get(hint) or self.find_by_hint(hint), hint, text)
+
+    def _fields_by_hint(self, hints) -> dict:
+        """{hint: element} for the *hints* whose field the current screen shows once."""
+        edit_text = (AppiumBy.CLASS_NAME, "android.widget.EditText")
+        nodes = self.snapshot().find_all(edit_text)
+        elements = find_all_now(self.driver, edit_text)
+        if len(nodes) != len(elements):
+            return {}       # screen changed in between; positions do not line up
+        counts = Counter(node.get("hint") for node in nodes)
+        found = {}
+        for node, element in zip(nodes, elements):
+            hint = node.get("hint")
+            if hint in hints and counts[hint] == 1:
+                found[hint] = self._remember(self.hint_locator(hint), element, self.DEFAULT_TIMEOUT)
+        return found
+
+    def _replace_value(self, field, hint: str, text: str) -> None:
+        """Set *field*'s text on the device; a stale field is found again once."""
+        try:
+            self.driver.execute_script("mobile: replaceElementValue",
+                                       {"elementId": field.id, "text": text})
+        except StaleElementReferenceException:
+            ELEMENT_CACHE.forget(self.driver)
+            self.driver.execute_script("mobile: replaceElementValue",
+                                       {"elementId": self.find_by_hint(hint).id, "text": text})
+
+    def transition(self, action, timeout: float = SETTLE_TIMEOUT, before: int = None) -> bool:
+        """
+        Run *action* and wait until the UI has changed and settled.
+
+        *before* is the fingerprint of the screen before the action
+        (framework.waits.screen_fingerprint); it is fetched when omitted.
+        Returns False if nothing changed within *timeout*.
+        """
+        if before is None:
+            before = screen_fingerprint(self.driver.page_source)
+        action()
+        settled = wait_for_settled(self.driver, before, timeout) is not None
+        if not settled:
+            print(f"[transition] UI did not change within {timeout}s")
+        return settled
 
     def press_back(self) -> None:
         """Press the Android hardware Back button."""
@@ -8,6 +8,8 @@ All locators use AppiumBy so they can be trivially updated.
 """
 
 from appium.webdriver.common.appiumby import AppiumBy
+from selenium.common.exceptions import TimeoutException
+from framework.waits import poll_until
 from pages.base_page import BasePage
 
 
@@ -21,6 +23,8 @@ class HomePage(BasePage):
         home.open_sidebar()       # opens the hamburger navigation drawer
     """
 
+    XML_DUMP = "home.xml"
+
     # ------------------------------------------------------------------
     # Locators — sourced from home.xml (Appium Inspector)
     # ------------------------------------------------------------------
@@ -50,7 +54,14 @@ class HomePage(BasePage):
     # ------------------------------------------------------------------
 
     def tap_fab(self) -> None:
-        """Tap the floating action button to open the add-task screen."""
+        """Tap the floating action button to open the add-task screen.
+
+        Nothing to do when the add-task screen is already open (a test
+        scheduled to start there, see framework/scheduling.py).
+        """
+        save = (AppiumBy.ACCESSIBILITY_ID, "Save")
+        if self.snapshot().is_visible(save):
+            return
         self.click_by_accessibility_id("Create new task")
 
     def is_home_screen_visible(self) -> bool:
@@ -59,26 +70,43 @@ class HomePage(BasePage):
 
     def is_task_in_list(self, task_title: str) -> bool:
         """Return True if a task with the given title appears in the list."""
-        return self.is_text_visible(task_title, timeout=5)
+        return self.is_visible(self.text_locator(task_title), default=5,
+                               key="HomePage.is_task_in_list")
+
+    def visible_tasks(self, titles, timeout: float = 5) -> list:
+        """
+        Return those of *titles* shown in the list, waiting up to *timeout*
+        seconds for the first one.  Which rows fit on screen depends on the
+        list's sort order, so callers should not expect a particular one.
+        """
+        def shown():
+            snap = self.snapshot()
+            return [t for t in titles if snap.is_visible(self.text_locator(t))]
+
+        try:
+            return poll_until(shown, timeout)
+        except TimeoutException:
+            return []
 
     def open_sidebar(self) -> None:
         """Tap the hamburger button to open the navigation drawer.
 
-        Defensive: if the sidebar is already open (e.g. left open by a
-        previous test), close it first so the hamburger is reachable.
+        Nothing to do when the sidebar is already open (left open by a
+        previous test, or a test scheduled to start there, see
+        framework/scheduling.py).
         """
-        if self.is_accessibility_id_visible("Close navigation menu", timeout=2):
-            self.click_by_accessibility_id("Close navigation menu")
-            import time; time.sleep(0.5)
-        self.driver.find_element(*self.HAMBURGER_BUTTON).click()
+        close = (AppiumBy.ACCESSIBILITY_ID, "Close navigation menu")
+        if self.snapshot().is_visible(close):
+            return
+        self.find(self.HAMBURGER_BUTTON).click()
 
     def tap_search_button(self) -> None:
         """Tap the Search button in the bottom app bar."""
-        self.driver.find_element(*self.SEARCH_BUTTON).click()
+        self.find(self.SEARCH_BUTTON).click()
 
     def tap_sort_button(self) -> None:
         """Tap the Sort button in the bottom app bar."""
-        self.driver.find_element(*self.SORT_BUTTON).click()
+        self.find(self.SORT_BUTTON).click()
 
     def is_empty_state_visible(self) -> bool:
         """Return True when the no-tasks empty-state text is shown."""
@@ -23,6 +23,8 @@ class SidebarPage(BasePage):
         sidebar.tap_today()
     """
 
+    XML_DUMP = "hamburger_sidebar.xml"
+
     # ------------------------------------------------------------------
     # Locators — sourced from hamburger_sidebar.xml (Appium Inspector)
     # ------------------------------------------------------------------
@@ -51,6 +53,12 @@ class SidebarPage(BasePage):
     # "Default list" row text (first local list)
     DEFAULT_LIST_TEXT = "Default list"
 
+    # Every navigation row above, for batch visibility checks
+    NAVIGATION_TEXTS = (
+        MY_TASKS_TEXT, TODAY_TEXT, RECENTLY_MODIFIED_TEXT, FILTERS_TEXT,
+        TAGS_TEXT, PLACES_TEXT, LOCAL_LISTS_TEXT, DEFAULT_LIST_TEXT,
+    )
+
     # Close navigation menu: content-desc="Close navigation menu"
     CLOSE_SIDEBAR = (AppiumBy.ACCESSIBILITY_ID, "Close navigation menu")
 
@@ -83,8 +91,18 @@ class SidebarPage(BasePage):
         self.click_by_text(self.DEFAULT_LIST_TEXT)
 
     def close_sidebar(self) -> None:
-        """Close the navigation drawer by tapping the close affordance."""
-        self.driver.find_element(*self.CLOSE_SIDEBAR).click()
+        """Close the navigation drawer and wait for it to finish sliding shut."""
+        self.transition(self.find(self.CLOSE_SIDEBAR).click)
+
+    def visible_entries(self, *texts) -> dict:
+        """
+        Return {text: bool} for several sidebar entries at once.
+
+        All entries are answered from one hierarchy snapshot per poll, so
+        checking N rows costs one page-source fetch rather than N searches.
+        Single entries are cheaper with the is_*_visible() checks below.
+        """
+        return self.visible_texts(texts or self.NAVIGATION_TEXTS)
 
     def is_today_visible(self) -> bool:
         """Return True if the 'Today' option is visible in the sidebar."""
@@ -20,6 +20,8 @@ class TaskPage(BasePage):
         task.save_task()
     """
 
+    XML_DUMP = "addTask.xml"
+
     # ------------------------------------------------------------------
     # Locators — sourced from addTask.xml (Appium Inspector)
     # ------------------------------------------------------------------
@@ -55,16 +57,29 @@ class TaskPage(BasePage):
     def enter_title(self, title: str) -> None:
         """Type *title* into the Task name field."""
         self.type_into_hint(self.TITLE_HINT, title)
-        self.hide_keyboard()
+        self._dismiss_typing_keyboard()
 
     def enter_description(self, text: str) -> None:
         """Type *text* into the Description field."""
         self.type_into_hint(self.DESCRIPTION_HINT, text)
-        self.hide_keyboard()
+        self._dismiss_typing_keyboard()
+
+    def fill(self, title: str, description: str = None) -> None:
+        """Set the title (and description) in one batch; see BasePage.fill_fields."""
+        values = {self.TITLE_HINT: title}
+        if description is not None:
+            values[self.DESCRIPTION_HINT] = description
+        self.fill_fields(values)
+        self._dismiss_typing_keyboard()
+
+    def _dismiss_typing_keyboard(self) -> None:
+        # Values set directly never bring the keyboard up.
+        if self.TEXT_INPUT != "replace":
+            self.hide_keyboard()
 
     def save_task(self) -> None:
-        """Tap the Save button to persist the task and return to home."""
-        self.driver.find_element(*self.SAVE_BUTTON).click()
+        """Tap Save and return once the home list has refreshed."""
+        self.transition(self.find(self.SAVE_BUTTON).click)
 
     def is_no_due_date_shown(self) -> bool:
         """Return True if the 'No due date' default row is visible."""
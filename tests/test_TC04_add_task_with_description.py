@@ -18,8 +18,7 @@ def test_add_task_with_description(driver):
     task = TaskPage(driver)
 
     home.tap_fab()
-    task.enter_title(task_title)
-    task.enter_description(task_desc)
+    task.fill(task_title, task_desc)
     task.save_task()
 
     assert home.is_task_in_list(task_title), \
@@ -6,10 +6,14 @@ WHEN   the user inspects the navigation menu
 THEN   a 'Today' option must be present and visible
 """
 
+import pytest
+
+from framework.navigation import SIDEBAR
 from pages.home_page import HomePage
 from pages.sidebar_page import SidebarPage
 
 
+@pytest.mark.start_screen(SIDEBAR)
 def test_sidebar_contains_today_option(driver):
     home = HomePage(driver)
     sidebar = SidebarPage(driver)
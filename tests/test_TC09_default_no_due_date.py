@@ -6,10 +6,14 @@ WHEN   the form is displayed for a brand-new task
 THEN   the due-date field must read 'No due date'
 """
 
+import pytest
+
+from framework.navigation import ADD_TASK
 from pages.home_page import HomePage
 from pages.task_page import TaskPage
 
 
+@pytest.mark.start_screen(ADD_TASK)
 def test_new_task_shows_no_due_date_by_default(driver):
     home = HomePage(driver)
     task = TaskPage(driver)
@@ -0,0 +1,23 @@
+"""
+TC11 — Tasks seeded in bulk show up in the home task list.
+
+GIVEN  200 tasks are written straight into the app's database
+WHEN   the app is relaunched to the home screen
+THEN   seeded tasks must be visible in the task list
+"""
+
+import pytest
+
+from framework.navigation import HOME
+from pages.home_page import HomePage
+
+
+@pytest.mark.start_screen(HOME, state="seeded")
+def test_seeded_tasks_appear_in_list(driver, seed_tasks):
+    titles = seed_tasks(200)
+
+    home = HomePage(driver)
+
+    # The rows on screen depend on the list's sort order: any seeded task will do
+    assert home.visible_tasks(titles), \
+        "Expected the seeded tasks to appear in the list after relaunch."
@@ -0,0 +1,2 @@
+# tests/unit/__init__.py
+# Makes `tests.unit` a Python package.
@@ -0,0 +1,14 @@
+"""
+tests/unit/conftest.py — Unit tests of the framework's pure logic.
+
+They need no device or Appium server, so the session-wide app setup of
+the root conftest.py is replaced by a no-op here.
+"""
+
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def setup_app_once():
+    """No app to warm up for unit tests."""
+    yield
@@ -0,0 +1,207 @@
+"""
+Unit tests — framework/async_driver.py connection pool and error mapping.
+"""
+
+import asyncio
+import gzip
+import json
+
+import pytest
+from selenium.common.exceptions import (
+    InvalidSelectorException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+)
+
+from framework.async_driver import AsyncConnectionPool, AsyncDriver
+from framework.fake_appium import FakeAppiumServer
+from pages.home_page import HomePage
+from pages.task_page import TaskPage
+
+
+def _reply(body: bytes, *headers: str) -> bytes:
+    head = "HTTP/1.1 200 OK\r\n" + "".join(f"{h}\r\n" for h in headers)
+    return head.encode() + b"\r\n" + body
+
+
+def _json(value) -> bytes:
+    return json.dumps({"value": value}).encode()
+
+
+class RawServer:
+    """
+    HTTP server on a random port; *respond(n)* gives the raw bytes sent for
+    the n-th request (0-based), or None to close the connection unanswered.
+    The connection is also closed after answering the requests in *close_after*.
+    """
+
+    def __init__(self, respond, delay: float = 0.0, close_after=()):
+        self.respond = respond
+        self.delay = delay
+        self.close_after = set(close_after)
+        self.requests = 0
+        self.active = self.peak = 0
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+
+    async def _serve(self, reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = [int(line.split(b":")[1]) for line in head.split(b"\r\n")
+                          if line.lower().startswith(b"content-length")]
+                await reader.readexactly(length[0] if length else 0)
+                n, self.requests = self.requests, self.requests + 1
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+                await asyncio.sleep(self.delay)
+                self.active -= 1
+                data = self.respond(n)
+                if data is None:
+                    break
+                writer.write(data)
+                await writer.drain()
+                if n in self.close_after:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        writer.close()
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_chunked_body_is_decoded():
+    body = _json("chunked")
+    chunks = b"".join(b"%x\r\n%s\r\n" % (len(body[i:i + 5]), body[i:i + 5])
+                      for i in range(0, len(body), 5)) + b"0\r\n\r\n"
+
+    async def scenario():
+        async with RawServer(lambda n: _reply(chunks, "Transfer-Encoding: chunked")) as server:
+            pool = AsyncConnectionPool()
+            result = await pool.request("GET", server.url + "/status")
+            await pool.close()
+            return result
+
+    assert _run(scenario()) == (200, body.decode())
+
+
+def test_gzip_body_is_decoded():
+    body = _json("x" * 2000)
+    zipped = gzip.compress(body)
+
+    async def scenario():
+        async with RawServer(lambda n: _reply(
+                zipped, "Content-Encoding: gzip", f"Content-Length: {len(zipped)}")) as server:
+            pool = AsyncConnectionPool()
+            result = await pool.request("GET", server.url + "/source")
+            await pool.close()
+            return result
+
+    assert _run(scenario()) == (200, body.decode())
+
+
+def test_closed_idle_connection_is_replaced_and_request_resent():
+    body = _json(None)
+    ok = _reply(body, f"Content-Length: {len(body)}")
+    # The first connection answers once and is then closed by the server.
+    replies = {0: ok, 1: None, 2: ok}
+
+    async def scenario():
+        async with RawServer(replies.get) as server:
+            pool = AsyncConnectionPool()
+            await pool.request("POST", server.url + "/session/s/back", {})
+            await asyncio.sleep(0.05)
+            status, _ = await pool.request("POST", server.url + "/session/s/back", {})
+            await pool.close()
+            return status, pool.opened, server.requests
+
+    assert _run(scenario()) == (200, 2, 3)
+
+
+def test_request_is_not_resent_after_a_partial_response():
+    body = _json(None)
+    ok = _reply(body, f"Content-Length: {len(body)}")
+    truncated = _reply(b'{"val', "Content-Length: 100")
+    replies = {0: ok, 1: truncated}
+
+    async def scenario():
+        async with RawServer(replies.get, close_after={1}) as server:
+            pool = AsyncConnectionPool()
+            await pool.request("POST", server.url + "/session/s/element/1/click", {})
+            with pytest.raises(asyncio.IncompleteReadError):
+                await pool.request("POST", server.url + "/session/s/element/1/click", {})
+            await pool.close()
+            return server.requests
+
+    assert _run(scenario()) == 2
+
+
+def test_connections_per_host_are_limited():
+    body = _json(None)
+    ok = _reply(body, f"Content-Length: {len(body)}")
+
+    async def scenario():
+        async with RawServer(lambda n: ok, delay=0.05) as server:
+            pool = AsyncConnectionPool(max_per_host=2)
+            await asyncio.gather(*(pool.request("GET", server.url + "/status") for _ in range(6)))
+            await pool.close()
+            return server.peak, pool.opened
+
+    assert _run(scenario()) == (2, 2)
+
+
+@pytest.fixture(scope="module")
+def fake():
+    with FakeAppiumServer(port=0) as server:
+        yield server
+
+
+def _on_fake(fake, check):
+    async def scenario():
+        pool = AsyncConnectionPool()
+        driver = await AsyncDriver.start(pool, fake.url, {"appium:forceAppLaunch": True})
+        try:
+            return await check(driver)
+        finally:
+            await driver.quit()
+            await pool.close()
+
+    return _run(scenario())
+
+
+def test_commands_return_values(fake):
+    async def check(driver):
+        fab = await driver.find_element(*HomePage.FAB)
+        return await fab.is_displayed(), await driver.page_source()
+
+    displayed, source = _on_fake(fake, check)
+    assert displayed is True
+    assert 'content-desc="Create new task"' in source
+
+
+@pytest.mark.parametrize("error, check", [
+    (NoSuchElementException, lambda d: d.find_element(*TaskPage.SAVE_BUTTON)),
+    (InvalidSelectorException, lambda d: d.find_element("css selector", "div")),
+])
+def test_error_responses_raise_selenium_exceptions(fake, error, check):
+    with pytest.raises(error):
+        _on_fake(fake, check)
+
+
+def test_stale_element_raises(fake):
+    async def check(driver):
+        fab = await driver.find_element(*HomePage.FAB)
+        await fab.click()
+        await fab.click()
+
+    with pytest.raises(StaleElementReferenceException):
+        _on_fake(fake, check)
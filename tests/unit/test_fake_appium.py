@@ -0,0 +1,128 @@
+"""
+Unit tests — framework/fake_appium.py W3C endpoints and HTTP behaviour.
+"""
+
+import gzip
+import http.client
+import json
+
+import pytest
+
+from framework.fake_appium import W3C_ELEMENT_KEY, FakeAppiumServer
+from pages.home_page import HomePage
+from pages.task_page import TaskPage
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FakeAppiumServer(port=0) as fake:
+        yield fake
+
+
+@pytest.fixture
+def client(server):
+    host, port = server._httpd.server_address[:2]
+    conn = http.client.HTTPConnection(host, port, timeout=5)
+    yield conn
+    conn.close()
+
+
+def _call(conn, method, path, body=None, headers=None):
+    """Send one command; returns (status, decoded JSON, response headers)."""
+    data = json.dumps(body).encode() if body is not None else None
+    conn.request(method, path, body=data, headers=dict(headers or {}))
+    response = conn.getresponse()
+    raw = response.read()
+    if response.getheader("Content-Encoding") == "gzip":
+        raw = gzip.decompress(raw)
+    return response.status, json.loads(raw), response
+
+
+@pytest.fixture
+def session(client):
+    # forceAppLaunch restarts the app on the home screen for every test.
+    caps = {"appium:forceAppLaunch": True}
+    status, payload, _ = _call(client, "POST", "/session", {"capabilities": {"alwaysMatch": caps}})
+    assert status == 200
+    return f"/session/{payload['value']['sessionId']}"
+
+
+def _find(client, session, locator):
+    by, value = locator
+    return _call(client, "POST", f"{session}/element", {"using": by, "value": value})
+
+
+def test_find_returns_a_w3c_element_reference(client, session):
+    status, payload, _ = _find(client, session, HomePage.FAB)
+    assert status == 200
+    assert W3C_ELEMENT_KEY in payload["value"]
+
+
+def test_find_of_a_missing_element_is_a_404(client, session):
+    status, payload, _ = _find(client, session, TaskPage.SAVE_BUTTON)
+    assert status == 404
+    assert payload["value"]["error"] == "no such element"
+
+
+def test_unsupported_locator_is_an_invalid_selector(client, session):
+    status, payload, _ = _find(client, session, ("css selector", "div"))
+    assert status == 400
+    assert payload["value"]["error"] == "invalid selector"
+
+
+def test_click_moves_between_screens(client, session):
+    _, found, _ = _find(client, session, HomePage.FAB)
+    element = found["value"][W3C_ELEMENT_KEY]
+    status, _, _ = _call(client, "POST", f"{session}/element/{element}/click", {})
+    assert status == 200
+    assert _find(client, session, TaskPage.SAVE_BUTTON)[0] == 200
+    # The old screen's references are stale now.
+    status, payload, _ = _call(client, "POST", f"{session}/element/{element}/click", {})
+    assert (status, payload["value"]["error"]) == (404, "stale element reference")
+
+
+def test_source_is_the_current_screen(client, session):
+    status, payload, _ = _call(client, "GET", f"{session}/source")
+    assert status == 200
+    assert 'content-desc="Create new task"' in payload["value"]
+
+
+def test_large_responses_are_gzipped_on_request(client, session):
+    _, plain, response = _call(client, "GET", f"{session}/source")
+    assert response.getheader("Content-Encoding") is None
+    _, zipped, response = _call(client, "GET", f"{session}/source",
+                                headers={"Accept-Encoding": "gzip"})
+    assert response.getheader("Content-Encoding") == "gzip"
+    assert zipped == plain
+
+
+def test_small_responses_are_not_gzipped(client, session):
+    _, _, response = _call(client, "GET", "/status", headers={"Accept-Encoding": "gzip"})
+    assert response.getheader("Content-Encoding") is None
+
+
+def test_connections_are_kept_alive(server, client, session):
+    before = server.connections
+    for _ in range(5):
+        assert _call(client, "GET", f"{session}/source")[0] == 200
+    assert server.connections == before
+
+
+def test_unknown_command_and_session(client, session):
+    status, payload, _ = _call(client, "GET", f"{session}/nope")
+    assert (status, payload["value"]["error"]) == (404, "unknown command")
+    status, payload, _ = _call(client, "GET", "/session/missing/source")
+    assert (status, payload["value"]["error"]) == (404, "invalid session id")
+
+
+def test_handler_bugs_are_a_500_unknown_error(server, client, session, monkeypatch):
+    def broken():
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(server.device, "page_source", broken)
+    status, payload, _ = _call(client, "GET", f"{session}/source")
+    assert status == 500
+    assert payload["value"]["error"] == "unknown error"
+    assert "RuntimeError: boom" in payload["value"]["message"]
+    # The connection is still usable afterwards.
+    assert _call(client, "GET", "/status")[0] == 200
@@ -0,0 +1,201 @@
+"""
+Unit tests — framework/impact.py change mapping and test selection.
+"""
+
+import subprocess
+import textwrap
+
+from framework import impact
+
+PAGE = textwrap.dedent('''\
+    from pages.base_page import BasePage
+
+
+    class DemoPage(BasePage):
+        """A page."""
+
+        # Title field
+        TITLE = "Title"
+
+        SAVE = "Save"
+
+        def enter_title(self, text):
+            self.type_into(self.TITLE, text)
+
+        def save(self):
+            self.click(self.SAVE)
+''')
+BASE = textwrap.dedent('''\
+    class BasePage:
+        def type_into(self, hint, text):
+            pass
+
+        def click(self, locator):
+            pass
+''')
+TEST = textwrap.dedent('''\
+    from pages.demo_page import DemoPage
+
+
+    def test_title(driver):
+        page = DemoPage(driver)
+        page.enter_title("x")
+
+
+    def test_save(driver):
+        DemoPage(driver).save()
+''')
+
+
+NAVIGATION = textwrap.dedent('''\
+    HOME = "home"
+    DEMO = "demo"
+
+
+    def _open(driver):
+        DemoPage(driver).save()
+
+
+    SCREENS = (
+        Screen(DEMO, (DemoPage.TITLE,)),
+        Screen(HOME, ()),
+    )
+    EDGES = (
+        Edge(HOME, DEMO, 1.0, "open", _open),
+        Edge(DEMO, HOME, 1.0, "back", lambda driver: None),
+        Edge(None, HOME, 6.0, "restart", lambda driver: None),
+    )
+''')
+CONFTEST = textwrap.dedent('''\
+    import pytest
+
+
+    @pytest.fixture
+    def demo(driver):
+        return DemoPage(driver)
+
+
+    @pytest.fixture
+    def ready(driver):
+        DemoPage(driver).enter_title("")
+''')
+ROUTED = textwrap.dedent('''\
+    import pytest
+
+    from framework.navigation import DEMO
+
+
+    @pytest.mark.start_screen(DEMO)
+    def test_on_demo(driver):
+        pass
+
+
+    def test_on_home(demo):
+        pass
+
+
+    def test_unit():
+        pass
+''')
+
+
+def _index() -> impact.PageIndex:
+    return impact.PageIndex({"pages/demo_page.py": PAGE, "pages/base_page.py": BASE})
+
+
+def test_members_at_maps_lines_to_members():
+    index = _index()
+    path = "pages/demo_page.py"
+    assert index.members_at(path, {13}) == ({("DemoPage", "enter_title")}, False)
+    # A comment or blank line above a member belongs to that member
+    assert index.members_at(path, {6, 7}) == ({("DemoPage", "TITLE")}, False)
+    assert index.members_at(path, {9}) == ({("DemoPage", "SAVE")}, False)
+
+
+def test_members_at_class_header_and_module_code():
+    index = _index()
+    path = "pages/demo_page.py"
+    everything = {("DemoPage", name) for name in ("TITLE", "SAVE", "enter_title", "save")}
+    assert index.members_at(path, {4, 5}) == (everything, False)
+    assert index.members_at(path, {1}) == (set(), True)
+
+
+def test_references_follow_instances_and_closure():
+    index = _index()
+    tree = impact.ast.parse(TEST)
+    title, save = (node for node in tree.body if isinstance(node, impact.ast.FunctionDef))
+    used = index.closure(index.references(title))
+    assert ("DemoPage", "enter_title") in used
+    assert ("DemoPage", "TITLE") in used            # through self.TITLE
+    assert ("BasePage", "type_into") in used        # inherited, via self
+    assert ("DemoPage", "save") not in used
+    assert ("DemoPage", "save") in index.closure(index.references(save))
+
+
+def _git(root, *args) -> str:
+    return subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+                          cwd=root, check=True, capture_output=True, text=True).stdout
+
+
+def _repo(tmp_path):
+    for path, text in {"pages/demo_page.py": PAGE, "pages/base_page.py": BASE,
+                       "tests/test_demo.py": TEST, "conftest.py": ""}.items():
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(text)
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "base")
+    return tmp_path
+
+
+def test_changed_lines_both_sides_and_untracked(tmp_path):
+    root = _repo(tmp_path)
+    page = root / "pages/demo_page.py"
+    lines = page.read_text().splitlines(keepends=True)
+    lines[12] = lines[12].replace("text)", "text.strip())")       # edit line 13
+    del lines[9:11]                                               # drop SAVE (10-11)
+    page.write_text("".join(lines))
+    (root / "pages/new_page.py").write_text("")
+    changes = impact.changed_lines("HEAD", root)
+    old, new = changes["pages/demo_page.py"]
+    assert old == {10, 11, 13}
+    assert new == {11}
+    assert changes["pages/new_page.py"] == (set(), {0})
+
+
+def test_analyse_selects_tests_using_changed_members(tmp_path):
+    root = _repo(tmp_path)
+    page = root / "pages/demo_page.py"
+    page.write_text(page.read_text().replace('TITLE = "Title"', 'TITLE = "Task title"'))
+    result = impact.analyse("HEAD", root, recorded=root / "missing.json")
+    assert result["all"] is None
+    assert result["changed"] == {("DemoPage", "TITLE")}
+    assert set(result["tests"]) == {"tests/test_demo.py::test_title"}
+
+
+def test_analyse_falls_back_to_every_test(tmp_path):
+    root = _repo(tmp_path)
+    (root / "conftest.py").write_text("# changed\n")
+    assert impact.analyse("HEAD", root, recorded=root / "missing.json")["all"] == "conftest.py"
+    _git(root, "checkout", "-q", "conftest.py")
+    (root / "README.md").write_text("docs only\n")
+    result = impact.analyse("HEAD", root, recorded=root / "missing.json")
+    assert result["all"] is None and result["tests"] == {}
+
+
+def test_fixtures_and_routes_only_count_for_tests_driving_the_app(tmp_path):
+    for path, text in {"pages/demo_page.py": PAGE, "pages/base_page.py": BASE,
+                       "tests/test_routed.py": ROUTED, "conftest.py": CONFTEST,
+                       "framework/navigation.py": NAVIGATION}.items():
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(text)
+    deps = impact.dependency_map(_index(), tmp_path, recorded=tmp_path / "missing.json")
+    on_demo, on_home, unit = (deps[f"tests/test_routed.py::{name}"]
+                              for name in ("test_on_demo", "test_on_home", "test_unit"))
+    fixture_member = ("DemoPage", "enter_title")            # referenced by conftest.py
+    assert fixture_member in on_demo and fixture_member in on_home
+    # The demo screen's marker and the edge leading there only count for
+    # the test that starts on it.
+    assert {("DemoPage", "TITLE"), ("DemoPage", "save")} <= on_demo
+    assert ("DemoPage", "save") not in on_home
+    assert unit == set()
@@ -0,0 +1,144 @@
+"""
+Unit tests — framework/hierarchy.py parsing and the offline locator engine
+of framework/locators.py, against the Appium Inspector dumps in pages/xml/.
+"""
+
+import io
+
+import pytest
+from appium.webdriver.common.appiumby import AppiumBy
+
+from framework.hierarchy import fingerprint, parse_hierarchy
+from framework.locators import XML_DIR, HierarchySnapshot, LocatorError, validate_page_objects
+
+UI = AppiumBy.ANDROID_UIAUTOMATOR
+XPATH = AppiumBy.XPATH
+
+SMALL = b"""<?xml version='1.0' encoding='UTF-8'?>
+<hierarchy rotation="0">
+  <android.widget.FrameLayout class="android.widget.FrameLayout" bounds="[0,0][100,200]">
+    <android.widget.TextView class="android.widget.TextView" text="Shown" displayed="true"
+                             bounds="[10,20][30,60]" />
+    <android.widget.TextView class="android.widget.TextView" text="Hidden" displayed="false" />
+  </android.widget.FrameLayout>
+</hierarchy>"""
+
+
+@pytest.fixture(scope="module")
+def dumps():
+    return {name: HierarchySnapshot.from_file(XML_DIR / name)
+            for name in ("home.xml", "addTask.xml", "hamburger_sidebar.xml")}
+
+
+# ----------------------------------------------------------------------
+# Hierarchy parsing
+# ----------------------------------------------------------------------
+
+def test_parse_accepts_every_source_type():
+    expected = [(n.tag, n.attrib) for n in parse_hierarchy(SMALL)]
+    for source in (SMALL.decode(), io.BytesIO(SMALL), [SMALL[:50], SMALL[50:]]):
+        assert [(n.tag, n.attrib) for n in parse_hierarchy(source)] == expected
+    assert [n.tag for n in parse_hierarchy(SMALL)] == [
+        "hierarchy", "android.widget.FrameLayout", "android.widget.TextView", "android.widget.TextView"]
+
+
+def test_nodes_expose_tree_attributes_and_bounds():
+    root, frame, shown, hidden = parse_hierarchy(SMALL)
+    assert shown.parent is frame and frame.children == [shown, hidden]
+    assert shown.text == "Shown" and shown.get("missing", "-") == "-"
+    assert shown.has("displayed") and not frame.has("displayed")
+    assert shown.bounds == (10, 20, 30, 60) and shown.center == (20, 40)
+    assert hidden.bounds is None and hidden.center is None
+    assert hidden.is_true("displayed") is False
+
+
+def test_parse_shares_layouts_and_values(dumps):
+    nodes = dumps["home.xml"].elements
+    assert nodes[0].get("package") is nodes[1].get("package")
+    assert len({id(n._schema) for n in nodes}) < len(nodes)
+
+
+def test_fingerprint_tracks_visible_changes():
+    nodes = parse_hierarchy(SMALL)
+    assert fingerprint(nodes) == fingerprint(parse_hierarchy(SMALL))
+    assert fingerprint(nodes) != fingerprint(parse_hierarchy(SMALL.replace(b"Shown", b"Other")))
+    # Focus changes are not something the user sees
+    assert fingerprint(nodes) == fingerprint(parse_hierarchy(
+        SMALL.replace(b'text="Shown"', b'text="Shown" focused="true"')))
+
+
+# ----------------------------------------------------------------------
+# Locator engine
+# ----------------------------------------------------------------------
+
+@pytest.mark.parametrize("dump, locator, count", [
+    ("home.xml", (AppiumBy.ACCESSIBILITY_ID, "Create new task"), 1),
+    ("home.xml", (AppiumBy.ACCESSIBILITY_ID, "More options"), 2),
+    ("home.xml", (AppiumBy.ID, "org.tasks:id/fab"), 1),
+    ("home.xml", (AppiumBy.ID, "fab"), 1),                      # bare id gets the package
+    ("home.xml", (AppiumBy.ID, "org.tasks:id/missing"), 0),
+    ("home.xml", (AppiumBy.CLASS_NAME, "android.widget.ImageButton"), 2),
+    ("home.xml", (UI, 'new UiSelector().text("My Tasks")'), 1),
+    ("home.xml", (UI, 'new UiSelector().textContains("tasks here")'), 1),
+    ("home.xml", (UI, 'new UiSelector().textStartsWith("My")'), 1),
+    ("home.xml", (UI, 'new UiSelector().descriptionMatches("S.*")'), 2),
+    ("home.xml", (UI, 'new UiSelector().description("Search")'), 1),
+    ("home.xml", (UI, 'new UiSelector().resourceId("org.tasks:id/menu_sort")'), 1),
+    ("home.xml", (UI, 'new UiSelector().className("android.widget.ImageButton").instance(1)'), 1),
+    ("home.xml", (UI, 'new UiSelector().className("android.widget.ImageButton").instance(2)'), 0),
+    ("home.xml", (UI, 'new UiSelector().clickable(true).description("Sort")'), 1),
+    ("home.xml", (XPATH, '//*[@content-desc="Search"]'), 1),
+    ("home.xml", (XPATH, "//android.widget.ImageButton"), 2),
+    ("home.xml", (XPATH, '//*[contains(@resource-id, "menu_")]'), 3),
+    ("home.xml", (XPATH, '//*[@text="My Tasks" or @content-desc="Sort"]'), 2),
+    ("home.xml", (XPATH, '//*[starts-with(@resource-id, "org.tasks:id/menu") '
+                         'and not(@content-desc="Sort")]'), 2),
+    ("home.xml", (XPATH, "/hierarchy/*"), 1),
+    ("home.xml", (XPATH, '//*[@resource-id="org.tasks:id/fab"]/..'), 1),
+    ("home.xml", (XPATH, "//*[@content-desc][@content-desc!=\"Sort\"]"), 5),
+    ("addTask.xml", (UI, 'new UiSelector().text("No due date")'), 1),
+    ("addTask.xml", (AppiumBy.CLASS_NAME, "android.widget.EditText"), 2),
+])
+def test_locator_matches(dumps, dump, locator, count):
+    assert len(dumps[dump].find_all(locator)) == count
+
+
+def test_positional_predicates_count_siblings(dumps):
+    snap = dumps["home.xml"]
+    every = snap.find_all((XPATH, "//*"))
+    assert len(every) == len(snap.nodes)       # <hierarchy> is an element too
+    first_children = snap.find_all((XPATH, "//*[1]"))[1:]       # after <hierarchy>
+    assert first_children and all(node.parent.children[0] is node for node in first_children)
+    last_children = snap.find_all((XPATH, "//*[last()]"))[1:]
+    assert last_children and all(node.parent.children[-1] is node for node in last_children)
+
+
+def test_results_are_in_document_order(dumps):
+    snap = dumps["home.xml"]
+    found = snap.find_all((XPATH, '//*[@content-desc="Sort" or @content-desc="Search"]'))
+    positions = [snap.elements.index(node) for node in found]
+    assert positions == sorted(positions)
+
+
+def test_visibility_uses_displayed():
+    snap = HierarchySnapshot.from_source(SMALL)
+    assert snap.is_visible((UI, 'new UiSelector().text("Shown")'))
+    assert not snap.is_visible((UI, 'new UiSelector().text("Hidden")'))
+    assert snap.find((UI, 'new UiSelector().text("Nothing")')) is None
+
+
+@pytest.mark.parametrize("locator", [
+    (UI, 'new UiSelector().text("a").childSelector(new UiSelector())'),
+    (UI, 'new UiScrollable(new UiSelector())'),
+    (XPATH, "android.widget.TextView"),                 # relative
+    (XPATH, '//*[@text="a"'),                           # unterminated
+    ("css selector", "div"),
+])
+def test_unsupported_locators_raise(locator):
+    with pytest.raises(LocatorError):
+        HierarchySnapshot.from_source(SMALL).find_all(locator)
+
+
+def test_every_page_object_locator_resolves():
+    missing = [(page, name) for page, name, _, count in validate_page_objects() if not count]
+    assert missing == []
@@ -0,0 +1,84 @@
+"""
+Unit tests — framework/lockfile.py cross-process lock files.
+"""
+
+import multiprocessing
+import os
+import subprocess
+import sys
+
+import pytest
+
+from framework import lockfile
+
+
+def _dead_pid() -> int:
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def test_lock_is_exclusive(tmp_path):
+    path = tmp_path / "device.lock"
+    assert lockfile.try_lock(path)
+    assert not lockfile.try_lock(path)
+    lockfile.unlock(path)
+    assert lockfile.try_lock(path)
+
+
+def test_stale_lock_is_reclaimed(tmp_path):
+    path = tmp_path / "device.lock"
+    path.write_text(str(_dead_pid()))
+    assert lockfile.is_stale(path)
+    assert lockfile.try_lock(path)
+    assert path.read_text() == str(os.getpid())
+
+
+def test_half_written_lock_is_not_stale(tmp_path):
+    path = tmp_path / "device.lock"
+    path.write_text("")
+    assert not lockfile.is_stale(path)
+    assert not lockfile.try_lock(path)
+
+
+def test_abandoned_reclaim_guard_is_dropped(tmp_path, monkeypatch):
+    path = tmp_path / "device.lock"
+    path.write_text(str(_dead_pid()))
+    (tmp_path / "device.lock.reclaim").touch()
+    assert not lockfile.try_lock(path)          # guard looks live
+    monkeypatch.setattr(lockfile, "ABANDONED_RECLAIM_AGE", -1.0)
+    assert not lockfile.try_lock(path)          # guard dropped on this attempt
+    assert lockfile.try_lock(path)
+
+
+def test_held_times_out(tmp_path):
+    path = tmp_path / "history.lock"
+    assert lockfile.try_lock(path)
+    with pytest.raises(TimeoutError):
+        with lockfile.held(path, timeout=0.1, poll=0.01):
+            pass
+
+
+def _race(path, start, done, results):
+    start.wait()
+    results.put(lockfile.try_lock(path))
+    done.wait()                     # stay alive so the winner's lock is not stale
+
+
+def test_one_winner_when_workers_reclaim_the_same_stale_lock(tmp_path):
+    path = tmp_path / "device.lock"
+    for _ in range(5):
+        path.write_text(str(_dead_pid()))
+        start, done = multiprocessing.Event(), multiprocessing.Event()
+        results = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=_race, args=(path, start, done, results))
+                   for _ in range(8)]
+        for worker in workers:
+            worker.start()
+        start.set()
+        won = [results.get() for _ in workers]
+        done.set()
+        for worker in workers:
+            worker.join()
+        assert sum(won) == 1
+        lockfile.unlock(path)
@@ -0,0 +1,64 @@
+"""
+Unit tests — framework/prewarm.py session hand-off and replacement.
+"""
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from framework.prewarm import SessionPrewarmer
+
+
+class _Session:
+    def __init__(self, device):
+        self.device = device
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+def _prewarmer():
+    return SessionPrewarmer([lambda: _Session("a"), lambda: _Session("b")],
+                            prepare=lambda d: None)
+
+
+def _warming(warm) -> int:
+    return sum(slot.future is not None for slot in warm._slots)
+
+
+def test_unusable_session_is_replaced():
+    warm = _prewarmer()
+    failures = []
+
+    def reset(d):
+        if not failures:
+            failures.append(d)
+            raise WebDriverException("instrumentation crashed")
+
+    d = warm.acquire(timeout=5, reset=reset)
+    assert d is not failures[0]
+    warm.close()
+    assert failures[0].quit_called
+    assert warm.stats["discarded"] == 1
+
+
+def test_other_reset_errors_free_the_device_and_propagate():
+    warm = _prewarmer()
+
+    def reset(d):
+        raise AssertionError("navigation failed")
+
+    with pytest.raises(AssertionError):
+        warm.acquire(timeout=5, reset=reset)
+    # Both devices are warming up again; none is left leased
+    assert [slot.driver for slot in warm._slots] == [None, None]
+    assert _warming(warm) == 2
+    warm.close()
+    assert warm.stats["discarded"] == 1
+
+
+def test_release_of_an_unknown_session_is_a_value_error():
+    warm = _prewarmer()
+    with pytest.raises(ValueError):
+        warm.release(_Session("x"))
+    warm.close()
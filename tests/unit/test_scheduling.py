@@ -0,0 +1,72 @@
+"""
+Unit tests — framework/scheduling.py test ordering and reset-cost estimates.
+"""
+
+from framework.navigation import ADD_TASK, HOME, SIDEBAR
+from framework.scheduling import (
+    _FULL_RESET_COST,
+    DEFAULT_STATE,
+    Start,
+    estimate,
+    schedule,
+    transition_cost,
+    uses_app,
+)
+
+
+class _Item:
+    def __init__(self, nodeid: str, screen: str, state: str = DEFAULT_STATE,
+                 fixturenames=("driver",)):
+        self.nodeid = nodeid
+        self.start = Start(screen, state)
+        self.fixturenames = list(fixturenames)
+
+    def __repr__(self) -> str:
+        return self.nodeid
+
+
+def _start(item) -> Start:
+    return item.start
+
+
+def test_schedule_groups_by_state_then_cheapest_screen():
+    items = [
+        _Item("sidebar_a", SIDEBAR),
+        _Item("seeded", HOME, state="seeded"),
+        _Item("home_a", HOME),
+        _Item("add_task", ADD_TASK),
+        _Item("home_b", HOME),
+        _Item("sidebar_b", SIDEBAR),
+    ]
+    ordered = [item.nodeid for item in schedule(items, start=_start)]
+    # Home first, then the sidebar (tied with the editor, collected first),
+    # then the editor; other states last; collection order within a bucket.
+    assert ordered == ["home_a", "home_b", "sidebar_a", "sidebar_b", "add_task", "seeded"]
+
+
+def test_transition_cost_light_and_full():
+    home, sidebar = Start(HOME, DEFAULT_STATE), Start(SIDEBAR, DEFAULT_STATE)
+    assert transition_cost(home, home) == 0
+    assert transition_cost(home, sidebar) == 1.0
+    assert transition_cost(sidebar, Start(ADD_TASK, DEFAULT_STATE)) == 2.0
+    # No previous test, a state change or a full reset: relaunch, then walk
+    assert transition_cost(None, sidebar) == _FULL_RESET_COST + 1.0
+    assert transition_cost(home, Start(HOME, "seeded")) == _FULL_RESET_COST
+    assert transition_cost(home, sidebar, light=False) == _FULL_RESET_COST + 1.0
+
+
+def test_estimate_sums_transitions_in_order():
+    items = [_Item("a", SIDEBAR), _Item("b", HOME), _Item("c", SIDEBAR)]
+    assert estimate(items, light=True, start=_start) == _FULL_RESET_COST + 1.0 + 1.0 + 1.0
+    assert estimate(items, light=False, start=_start) == 3 * _FULL_RESET_COST + 2.0
+
+
+def test_schedule_lowers_the_estimated_cost():
+    items = [_Item("a", SIDEBAR), _Item("b", HOME), _Item("c", SIDEBAR), _Item("d", ADD_TASK)]
+    scheduled = schedule(items, start=_start)
+    assert estimate(scheduled, light=True, start=_start) < estimate(items, light=True, start=_start)
+
+
+def test_only_tests_driving_the_app_are_scheduled():
+    assert uses_app(_Item("tests/test_TC06.py::t", SIDEBAR))
+    assert not uses_app(_Item("tests/unit/test_waits.py::t", HOME, fixturenames=("tmp_path",)))
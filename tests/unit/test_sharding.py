@@ -0,0 +1,60 @@
+"""
+Unit tests — framework/sharding.py shard parsing, estimates and the split.
+"""
+
+import json
+
+import pytest
+
+from framework.sharding import (
+    DEFAULT_DURATION,
+    MAX_SAMPLES,
+    estimates,
+    parse_shard,
+    shard_loads,
+    split,
+    update_history,
+)
+
+
+def test_parse_shard():
+    assert parse_shard("2/3") == (2, 3)
+    assert parse_shard(" 1 / 1 ") == (1, 1)
+    for bad in ("0/3", "4/3", "3", "a/b", ""):
+        with pytest.raises(ValueError):
+            parse_shard(bad)
+
+
+def test_estimates_use_median_and_fall_back_to_median_known_test():
+    history = {"a": [1.0, 9.0, 2.0], "b": [4.0], "c": [10.0]}
+    assert estimates(["a", "b", "c", "new"], history) == {"a": 2.0, "b": 4.0, "c": 10.0, "new": 4.0}
+    assert estimates(["new"], {}) == {"new": DEFAULT_DURATION}
+
+
+def test_split_is_longest_first_and_keeps_collection_order():
+    history = {"t1": [1.0], "t2": [8.0], "t3": [3.0], "t4": [5.0], "t5": [2.0]}
+    shards = split(["t1", "t2", "t3", "t4", "t5"], history, 2)
+    # 8 → A, 5 → B, 3 → B (5 < 8), 2 → A (8 = 8, lower shard first), 1 → B
+    assert shards == [["t2", "t5"], ["t1", "t3", "t4"]]
+    assert shard_loads(shards, history) == [10.0, 9.0]
+
+
+def test_split_covers_every_test_once_and_is_deterministic():
+    nodeids = [f"t{i}" for i in range(23)]
+    history = {n: [float(i % 7 + 1)] for i, n in enumerate(nodeids)}
+    shards = split(nodeids, history, 4)
+    assert sorted(n for tests in shards for n in tests) == sorted(nodeids)
+    assert split(nodeids, history, 4) == shards
+    loads = shard_loads(shards, history)
+    assert max(loads) - min(loads) <= max(history[n][0] for n in nodeids)
+
+
+def test_more_shards_than_tests_leaves_shards_empty():
+    assert split(["a", "b"], {}, 3) == [["a"], ["b"], []]
+
+
+def test_update_history_keeps_the_latest_samples(tmp_path):
+    path = tmp_path / "durations.json"
+    for i in range(MAX_SAMPLES + 2):
+        update_history(path, {"a": float(i)})
+    assert json.loads(path.read_text())["a"] == [float(i) for i in range(2, MAX_SAMPLES + 2)]
@@ -0,0 +1,66 @@
+"""
+Unit tests — framework/timeouts.py learned per-locator timeouts.
+"""
+
+import json
+
+from framework.timeouts import MIN_SAMPLES, LatencyHistory, percentile
+
+LOCATOR = ("accessibility id", "Create new task")
+
+
+def _history(tmp_path, samples, env="local") -> LatencyHistory:
+    history = LatencyHistory()
+    history.load(tmp_path / "latencies.json", env=env)
+    for seconds in samples:
+        history.record(LOCATOR, seconds)
+    return history
+
+
+def test_percentile_is_nearest_rank():
+    samples = [float(i) for i in range(1, 21)]       # 1..20
+    assert percentile(samples, 0.95) == 19.0
+    assert percentile(samples, 0.5) == 10.0
+    assert percentile([3.0], 0.95) == 3.0
+
+
+def test_default_until_enough_samples(tmp_path):
+    history = _history(tmp_path, [0.2] * (MIN_SAMPLES - 1))
+    assert history.timeout_for(LOCATOR, default=15) == 15
+
+
+def test_learned_timeout_is_p95_times_margin_plus_slack(tmp_path):
+    history = _history(tmp_path, [0.5] * 19 + [2.0])
+    # p95 of 20 samples is the 19th smallest: 0.5 → 0.5 * 2 + 1
+    assert history.timeout_for(LOCATOR, default=15) == 2.0
+
+
+def test_learned_timeout_is_bounded(tmp_path):
+    fast = _history(tmp_path, [0.0] * MIN_SAMPLES)
+    assert fast.timeout_for(LOCATOR, default=15) == 1.0       # MIN_TIMEOUT
+    slow = _history(tmp_path, [20.0] * MIN_SAMPLES)
+    assert slow.timeout_for(LOCATOR, default=15) == 15        # never above the default
+
+
+def test_disabled_history_keeps_defaults(tmp_path):
+    history = _history(tmp_path, [0.1] * MIN_SAMPLES)
+    history.enabled = False
+    assert history.timeout_for(LOCATOR, default=15) == 15
+
+
+def test_environments_are_separate(tmp_path):
+    _history(tmp_path, [0.1] * MIN_SAMPLES, env="local").save()
+    ci = LatencyHistory()
+    ci.load(tmp_path / "latencies.json", env="ci")
+    assert ci.samples(LOCATOR) == []
+    assert ci.timeout_for(LOCATOR, default=15) == 15
+
+
+def test_save_merges_samples_of_concurrent_processes(tmp_path):
+    first = _history(tmp_path, [0.1, 0.2])
+    second = _history(tmp_path, [0.3])      # loaded before first saved
+    first.save()
+    second.save()
+    saved = json.loads((tmp_path / "latencies.json").read_text())
+    assert sorted(saved["local"]["accessibility id=Create new task"]) == [0.1, 0.2, 0.3]
+    assert not (tmp_path / "latencies.json.lock").exists()
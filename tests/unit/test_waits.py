@@ -0,0 +1,53 @@
+"""
+Unit tests — framework/waits.py device-side finds.
+"""
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
+from framework.waits import IMPLICIT_WAIT, adopt_new_session, find_on_device
+
+LOCATOR = ("accessibility id", "Create new task")
+
+
+class FakeDriver:
+    """Counts implicitly_wait() calls; finds succeed after *misses* tries."""
+
+    def __init__(self, misses=0):
+        self.misses = misses
+        self.implicit_calls = []
+        self.finds = 0
+
+    def implicitly_wait(self, seconds):
+        self.implicit_calls.append(seconds)
+
+    def find_element(self, by, value):
+        self.finds += 1
+        if self.finds <= self.misses:
+            raise NoSuchElementException(value)
+        return "element"
+
+
+@pytest.mark.parametrize("timeout", [1.5, 3.0, 7.2, 15])
+def test_budgets_share_one_implicit_wait(timeout):
+    driver = FakeDriver()
+    adopt_new_session(driver)
+    for _ in range(3):
+        assert find_on_device(driver, LOCATOR, timeout) == "element"
+    assert driver.implicit_calls == [IMPLICIT_WAIT]
+
+
+def test_short_budget_polls_without_implicit_wait():
+    driver = FakeDriver(misses=2)
+    adopt_new_session(driver)
+    assert find_on_device(driver, LOCATOR, 0.5) == "element"
+    assert driver.implicit_calls == []
+    assert driver.finds == 3
+
+
+def test_miss_raises_timeout_within_budget():
+    driver = FakeDriver(misses=1000)
+    adopt_new_session(driver)
+    with pytest.raises(TimeoutException):
+        find_on_device(driver, LOCATOR, 0.2)
+    assert driver.implicit_calls == []